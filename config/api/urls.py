@@ -19,9 +19,11 @@ urlpatterns = [
     # Itineraries
     path("itineraries/", itinerary_api.itinerary_list, name="api_itinerary_list"),
     path("itineraries/create/", itinerary_api.itinerary_create, name="api_itinerary_create"),
+    path("itineraries/create/stream/", itinerary_api.itinerary_create_stream, name="api_itinerary_create_stream"),
     path("itineraries/preview/", itinerary_api.itinerary_preview, name="api_itinerary_preview"),
     path("itineraries/save-pending/", itinerary_api.itinerary_save_pending, name="api_itinerary_save_pending"),
     path("itineraries/<int:pk>/", itinerary_api.itinerary_detail, name="api_itinerary_detail"),
+    path("itineraries/<int:pk>/days/regenerate/", itinerary_api.itinerary_regenerate_days, name="api_itinerary_regenerate_days"),
 
     # Flights
     path("flights/chat/", flights_api.flight_chat, name="api_flight_chat"),
@@ -15,3 +15,4 @@ class CarRentalResultAdmin(admin.ModelAdmin):
     list_display = ("car_name", "car_type", "price_per_day", "rental_company", "location", "search")
     list_filter = ("car_type", "rental_company")
     search_fields = ("car_name", "rental_company", "location")
+    readonly_fields = ("raw_data",)
@@ -6,7 +6,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from .models import CarRentalResult, CarRentalSearch
+from core.conditional import revalidate, version_etag
+from core.db_router import read_from_replica
+
+from .models import CarRentalResult, CarRentalResultPayload, CarRentalSearch
 from .serializers import CarRentalListingSerializer, CarRentalQuerySerializer
 from .services import CarRentalSearchError, search_car_rentals_natural
 
@@ -54,8 +57,8 @@ def car_search(request):
             pickup_date=params.pickup_date or None,
             dropoff_date=params.dropoff_date or None,
         )
-        for listing in listings:
-            CarRentalResult.objects.create(
+        results = CarRentalResult.objects.bulk_create(
+            CarRentalResult(
                 search=search_obj,
                 car_name=listing.car_name,
                 car_type=listing.car_type,
@@ -66,8 +69,13 @@ def car_search(request):
                 availability=listing.availability,
                 listing_url=listing.listing_url,
                 source=listing.source,
-                raw_data=listing.raw_data,
             )
+            for listing in listings
+        )
+        CarRentalResultPayload.objects.bulk_create(
+            CarRentalResultPayload(result=result, data=listing.raw_data)
+            for result, listing in zip(results, listings)
+        )
         search_id = search_obj.pk
 
     return Response({
@@ -84,15 +92,24 @@ def car_search(request):
     })
 
 
+def _search_validators(request, pk: int):
+    created_at = CarRentalSearch.objects.filter(pk=pk, user=request.user).values_list("created_at", flat=True).first()
+    if created_at is None:
+        return None
+    return version_etag("cars", pk, created_at.isoformat()), created_at
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@read_from_replica
+@revalidate(_search_validators)
 def car_detail(request, pk: int):
     try:
         search_obj = CarRentalSearch.objects.get(pk=pk, user=request.user)
     except CarRentalSearch.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
-    results = list(search_obj.results.values(
+    results = list(search_obj.fetched_results().values(
         "id", "car_name", "car_type", "price_per_day", "price_display",
         "rental_company", "location", "availability", "listing_url", "source",
     ))
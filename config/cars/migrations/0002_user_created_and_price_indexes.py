@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carrentalresult',
+            index=models.Index(fields=['search', 'price_per_day'], name='carresult_search_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carrentalsearch',
+            index=models.Index(fields=['user', '-created_at'], name='carsearch_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.partitions import partition_result_table
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0003_result_payloads'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='carrentalresultpayload',
+            name='result',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='payload', serialize=False, to='cars.carrentalresult'),
+        ),
+        partition_result_table("cars.CarRentalResult"),
+    ]
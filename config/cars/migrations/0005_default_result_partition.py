@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from core.partitions import add_default_partition
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0004_partition_results_by_month'),
+    ]
+
+    operations = [
+        add_default_partition("cars.CarRentalResult"),
+    ]
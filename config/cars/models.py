@@ -1,8 +1,10 @@
 from django.conf import settings
 from django.db import models
 
+from core.partitions import SearchResultsMixin
 
-class CarRentalSearch(models.Model):
+
+class CarRentalSearch(SearchResultsMixin, models.Model):
     """Stores a user's car rental search query and parsed parameters."""
 
     user = models.ForeignKey(
@@ -25,6 +27,7 @@ class CarRentalSearch(models.Model):
     class Meta:
         ordering = ["-created_at"]
         db_table = "core_carrentalsearch"
+        indexes = [models.Index(fields=["user", "-created_at"], name="carsearch_user_created_idx")]
 
     def __str__(self) -> str:
         return f"Car rental: {self.location} ({self.created_at:%Y-%m-%d})"
@@ -47,12 +50,37 @@ class CarRentalResult(models.Model):
     availability = models.CharField(max_length=100, blank=True)
     listing_url = models.URLField(max_length=500, blank=True)
     source = models.CharField(max_length=100, blank=True)
-    raw_data = models.JSONField(default=dict)
     fetched_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["price_per_day"]
         db_table = "core_carrentalresult"
+        indexes = [models.Index(fields=["search", "price_per_day"], name="carresult_search_price_idx")]
 
     def __str__(self) -> str:
         return f"{self.car_name} - {self.price_display}"
+
+    @property
+    def raw_data(self) -> dict:
+        """Full extracted car rental listing; loaded on demand from :class:`CarRentalResultPayload`."""
+        try:
+            return self.payload.data
+        except CarRentalResultPayload.DoesNotExist:
+            return {}
+
+
+class CarRentalResultPayload(models.Model):
+    """Raw car rental listing payload, kept out of the narrow, frequently scanned result table."""
+
+    result = models.OneToOneField(
+        CarRentalResult,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        # No database FK: the result table is partitioned on PostgreSQL.
+        db_constraint=False,
+        related_name="payload",
+    )
+    data = models.JSONField(default=dict)
+
+    def __str__(self) -> str:
+        return f"Payload for {self.result_id}"
@@ -2,29 +2,34 @@ from __future__ import annotations
 
 import json
 import logging
-import re
-import time
 from dataclasses import dataclass, field
 from datetime import date
-from urllib.parse import urlparse
 
-import requests
-from bs4 import BeautifulSoup
 from django.conf import settings
-from django.core.exceptions import ImproperlyConfigured
 
-LOGGER = logging.getLogger(__name__)
+from core.gazetteer import canonical_location
+from core.listing_search import (
+    GENERIC_NAME_TOKENS,
+    PIPELINE_QUERY_VARIANTS,
+    TARGET_LISTINGS,
+    ListingSearchError,
+    ListingVertical,
+    extract_json_object,
+    get_openai_client,
+    search_listings,
+)
 
-MAX_AGENT_ITERATIONS = 10
-TARGET_LISTINGS = 20
-SCRAPE_MAX_CHARS = 15_000
-SCRAPE_TIMEOUT = 10
-SEARCH_PAUSE = 1.5  # seconds between Google searches to avoid rate-limiting
+LOGGER = logging.getLogger(__name__)
 
-USER_AGENT = (
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-    "AppleWebKit/537.36 (KHTML, like Gecko) "
-    "Chrome/120.0.0.0 Safari/537.36"
+PREFERRED_DOMAINS = (
+    "kayak.com",
+    "expedia.com",
+    "priceline.com",
+    "rentalcars.com",
+    "enterprise.com",
+    "hertz.com",
+    "budget.com",
+    "turo.com",
 )
 
 
@@ -55,259 +60,104 @@ class CarRentalListing:
     raw_data: dict = field(default_factory=dict)
 
 
-class CarRentalSearchError(Exception):
+class CarRentalSearchError(ListingSearchError):
     """Raised when car rental search fails."""
 
 
 # ---------------------------------------------------------------------------
-# Helpers
+# Listing search vertical
 # ---------------------------------------------------------------------------
 
-def _get_openai_client():
-    api_key = getattr(settings, "OPENAI_API_KEY", None)
-    if not api_key:
-        raise ImproperlyConfigured("OPENAI_API_KEY is not configured.")
-    try:
-        from openai import OpenAI
-    except ImportError as exc:
-        raise CarRentalSearchError(
-            "OpenAI SDK is not installed. Add 'openai' to your dependencies."
-        ) from exc
-    return OpenAI(api_key=api_key)
-
-
-def _extract_json_object(text: str) -> dict:
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        match = re.search(r"\{[\s\S]*\}", text)
-        if not match:
-            raise ValueError("No JSON object found in response.")
-        return json.loads(match.group(0))
-
-
-def _extract_json_array(text: str) -> list:
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        match = re.search(r"\[[\s\S]*\]", text)
-        if not match:
-            raise ValueError("No JSON array found in response.")
-        return json.loads(match.group(0))
-
-
-# ---------------------------------------------------------------------------
-# Tool definitions for OpenAI function calling
-# ---------------------------------------------------------------------------
-
-TOOLS = [
-    {
-        "type": "function",
-        "function": {
-            "name": "search_google",
-            "description": (
-                "Search Google for car rental listings. Returns a list of top result "
-                "URLs and snippets. Use specific queries including location, car type, "
-                "and dates to find relevant rental pages."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The Google search query string",
-                    }
-                },
-                "required": ["query"],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "scrape_page",
-            "description": (
-                "Fetch a web page and return its cleaned text content. Use this to "
-                "read the content of car rental listing pages found via search."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": "The URL to fetch and parse",
-                    }
-                },
-                "required": ["url"],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "extract_car_listings",
-            "description": (
-                "Extract structured car rental listing data from raw page text. "
-                "Returns a JSON array of car rental objects with price, car details, "
-                "and links. Use this after scraping a page to get structured data."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "raw_text": {
-                        "type": "string",
-                        "description": "The raw text content from a scraped page",
-                    },
-                    "source_url": {
-                        "type": "string",
-                        "description": "The URL the text was scraped from",
-                    },
-                },
-                "required": ["raw_text", "source_url"],
-            },
-        },
-    },
-]
-
-
-# ---------------------------------------------------------------------------
-# Tool implementations
-# ---------------------------------------------------------------------------
-
-def _tool_search_google(query: str) -> list[dict]:
-    """Search Google and return top results."""
-    try:
-        from googlesearch import search as gsearch
-    except ImportError as exc:
-        raise CarRentalSearchError(
-            "googlesearch-python is not installed."
-        ) from exc
-
-    LOGGER.info("Google search: %s", query)
-    results = []
-    try:
-        for url in gsearch(query, num_results=10):
-            results.append({
-                "url": url,
-                "title": "",
-                "snippet": "",
-            })
-            time.sleep(0.2)  # small pause between result fetches
-    except Exception as exc:
-        LOGGER.warning("Google search error: %s", exc)
-        return [{"error": f"Search failed: {exc}"}]
-
-    time.sleep(SEARCH_PAUSE)
-    return results
-
-
-def _tool_scrape_page(url: str) -> str:
-    """Fetch and parse a web page, returning cleaned text."""
-    LOGGER.info("Scraping: %s", url)
-    try:
-        resp = requests.get(
-            url,
-            timeout=SCRAPE_TIMEOUT,
-            headers={"User-Agent": USER_AGENT},
-        )
-        resp.raise_for_status()
-    except requests.RequestException as exc:
-        LOGGER.warning("Scrape failed for %s: %s", url, exc)
-        return f"Error fetching page: {exc}"
+AGENT_PROMPT = (
+    "You are a car rental search agent. Your goal is to find exactly 20 car rental "
+    "listings matching the user's criteria.\n\n"
+    "Strategy:\n"
+    "1. Use search_google to find car rental pages (try sites like Kayak, Expedia, "
+    "Priceline, Rentalcars.com, Turo, Enterprise, Hertz, Budget, etc.)\n"
+    "2. Use scrape_page to fetch promising result pages\n"
+    "3. Use extract_car_listings to pull structured data from the scraped content\n"
+    "4. Keep searching and scraping until you have accumulated 20 listings\n"
+    "5. If a page fails to scrape or yields no results, try the next one\n"
+    "6. Vary your search queries to cover different rental companies and aggregators\n\n"
+    "Important: Call tools one step at a time. Search first, then scrape results, "
+    "then extract listings. Repeat until you have enough listings."
+)
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+EXTRACTION_FIELDS = (
+    '- "car_name": string (e.g. "Toyota Camry 2023")\n'
+    '- "car_type": string (e.g. "Sedan", "SUV", "Compact", "Minivan")\n'
+    '- "price_per_day": number (USD, e.g. 65.0)\n'
+    '- "price_display": string (e.g. "$65/day")\n'
+    '- "rental_company": string (e.g. "Enterprise", "Hertz")\n'
+    '- "location": string (pickup location)\n'
+    '- "availability": string (dates or "Available" if not specified)\n'
+)
 
-    # Remove non-content elements
-    for tag in soup(["script", "style", "nav", "footer", "header", "noscript"]):
-        tag.decompose()
 
-    text = soup.get_text(separator="\n", strip=True)
-    return text[:SCRAPE_MAX_CHARS]
+def _listing_defaults(item: dict) -> dict:
+    return {
+        "availability": "",
+        "location": "",
+        "rental_company": "",
+        "car_type": "",
+        "price_display": f"${item['price_per_day']}/day",
+    }
 
 
-def _tool_extract_car_listings(
-    raw_text: str, source_url: str, client, model: str
-) -> list[dict]:
-    """Use OpenAI to extract structured car listings from raw page text."""
-    domain = urlparse(source_url).netloc
+NAME_STOPWORDS = GENERIC_NAME_TOKENS | {"or", "similar", "car", "rental"}
 
-    system_prompt = (
-        "You are a data extraction assistant. Extract car rental listing information "
-        "from the provided text. Return ONLY a JSON array of objects. Each object must have:\n"
-        '- "car_name": string (e.g. "Toyota Camry 2023")\n'
-        '- "car_type": string (e.g. "Sedan", "SUV", "Compact", "Minivan")\n'
-        '- "price_per_day": number (USD, e.g. 65.0)\n'
-        '- "price_display": string (e.g. "$65/day")\n'
-        '- "rental_company": string (e.g. "Enterprise", "Hertz")\n'
-        '- "location": string (pickup location)\n'
-        '- "availability": string (dates or "Available" if not specified)\n'
-        '- "listing_url": string (direct link if found in text, otherwise "")\n'
-        f'- "source": "{domain}"\n\n'
-        "If you cannot extract valid listings from the text, return an empty array [].\n"
-        "Return ONLY the JSON array, no other text."
-    )
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            max_tokens=4096,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": raw_text[:SCRAPE_MAX_CHARS]},
-            ],
-        )
-    except Exception as exc:
-        LOGGER.warning("Extract listings failed: %s", exc)
-        return []
+def _rental_company(item: dict) -> str:
+    return item.get("rental_company", "")
 
-    result_text = response.choices[0].message.content or ""
 
-    try:
-        listings = _extract_json_array(result_text)
-    except (ValueError, json.JSONDecodeError):
-        LOGGER.warning("Could not parse extracted listings JSON")
-        return []
-
-    # Validate each listing has required fields
-    valid = []
-    for item in listings:
-        if not isinstance(item, dict):
-            continue
-        if item.get("car_name") and item.get("price_per_day"):
-            # Ensure source and listing_url are populated
-            item.setdefault("source", domain)
-            item.setdefault("listing_url", source_url)
-            item.setdefault("availability", "")
-            item.setdefault("location", "")
-            item.setdefault("rental_company", "")
-            item.setdefault("car_type", "")
-            item.setdefault("price_display", f"${item['price_per_day']}/day")
-            valid.append(item)
-
-    return valid
+def _build_user_message(params: CarRentalSearchParams) -> str:
+    parts = [f"Find car rentals in {params.location}."]
+    if params.car_type:
+        parts.append(f"Car type: {params.car_type}.")
+    if params.max_price_per_day:
+        parts.append(f"Budget: under ${params.max_price_per_day}/day.")
+    if params.pickup_date:
+        parts.append(f"Pickup date: {params.pickup_date}.")
+    if params.dropoff_date:
+        parts.append(f"Dropoff date: {params.dropoff_date}.")
+    parts.append(f"Find {TARGET_LISTINGS} car rental listings with prices and details.")
+    return " ".join(parts)
 
 
-# ---------------------------------------------------------------------------
-# Dispatch tool calls
-# ---------------------------------------------------------------------------
+def _build_search_queries(params: CarRentalSearchParams) -> list[str]:
+    """Derive a handful of distinct Google queries from the search params."""
+    dates = " ".join(d for d in (params.pickup_date, params.dropoff_date) if d)
+    kind = f"{params.car_type} " if params.car_type else ""
+    budget = f" under ${params.max_price_per_day:g} per day" if params.max_price_per_day else ""
 
-def _dispatch_tool(name: str, input_data: dict, client, model: str):
-    """Execute a tool call and return the result as a string."""
-    if name == "search_google":
-        results = _tool_search_google(input_data["query"])
-        return json.dumps(results)
-    elif name == "scrape_page":
-        return _tool_scrape_page(input_data["url"])
-    elif name == "extract_car_listings":
-        listings = _tool_extract_car_listings(
-            input_data["raw_text"],
-            input_data["source_url"],
-            client,
-            model,
-        )
-        return json.dumps(listings)
-    else:
-        return json.dumps({"error": f"Unknown tool: {name}"})
+    variants = [
+        f"{kind}car rental {params.location} {dates}{budget}".strip(),
+        f"{params.location} {kind}car hire prices kayak {dates}".strip(),
+        f"cheap {kind}rental cars {params.location} rentalcars.com{budget}",
+        f"{params.location} {kind}car rental deals expedia {dates}".strip(),
+        f"{params.location} airport {kind}car rental enterprise hertz",
+    ]
+    return list(dict.fromkeys(" ".join(v.split()) for v in variants))[:PIPELINE_QUERY_VARIANTS]
+
+
+CAR_VERTICAL = ListingVertical(
+    name="car",
+    subject="car rental",
+    search_hint="location, car type, and dates",
+    agent_prompt=AGENT_PROMPT,
+    extraction_fields=EXTRACTION_FIELDS,
+    required_fields=("car_name", "price_per_day"),
+    defaults=_listing_defaults,
+    name_field="car_name",
+    price_field="price_per_day",
+    block_key=_rental_company,
+    build_user_message=_build_user_message,
+    build_search_queries=_build_search_queries,
+    preferred_domains=PREFERRED_DOMAINS,
+    name_stopwords=NAME_STOPWORDS,
+    error=CarRentalSearchError,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -316,7 +166,7 @@ def _dispatch_tool(name: str, input_data: dict, client, model: str):
 
 def parse_car_rental_query(query: str) -> CarRentalSearchParams:
     """Use OpenAI to extract structured car rental params from natural language."""
-    client = _get_openai_client()
+    client = get_openai_client(CarRentalSearchError)
     model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
     today = date.today().isoformat()
 
@@ -351,7 +201,7 @@ def parse_car_rental_query(query: str) -> CarRentalSearchParams:
     LOGGER.info("Parse response: %s", raw_text)
 
     try:
-        data = _extract_json_object(raw_text)
+        data = extract_json_object(raw_text)
     except (ValueError, json.JSONDecodeError) as exc:
         raise CarRentalSearchError(
             f"Could not parse car rental parameters: {exc}"
@@ -365,7 +215,7 @@ def parse_car_rental_query(query: str) -> CarRentalSearchParams:
             max_price = None
 
     return CarRentalSearchParams(
-        location=data.get("location", ""),
+        location=canonical_location(data.get("location") or ""),
         car_type=data.get("car_type", ""),
         max_price_per_day=max_price,
         pickup_date=data.get("pickup_date", ""),
@@ -374,112 +224,17 @@ def parse_car_rental_query(query: str) -> CarRentalSearchParams:
 
 
 # ---------------------------------------------------------------------------
-# Agent loop
+# Search
 # ---------------------------------------------------------------------------
 
 def search_car_rentals(params: CarRentalSearchParams) -> list[CarRentalListing]:
-    """Run the OpenAI agent loop to find car rental listings."""
-    client = _get_openai_client()
-    model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
+    """Find car rental listings with the shared listing search engine."""
+    return _build_listings(search_listings(CAR_VERTICAL, params))
 
-    system_prompt = (
-        "You are a car rental search agent. Your goal is to find exactly 20 car rental "
-        "listings matching the user's criteria.\n\n"
-        "Strategy:\n"
-        "1. Use search_google to find car rental pages (try sites like Kayak, Expedia, "
-        "Priceline, Rentalcars.com, Turo, Enterprise, Hertz, Budget, etc.)\n"
-        "2. Use scrape_page to fetch promising result pages\n"
-        "3. Use extract_car_listings to pull structured data from the scraped content\n"
-        "4. Keep searching and scraping until you have accumulated 20 listings\n"
-        "5. If a page fails to scrape or yields no results, try the next one\n"
-        "6. Vary your search queries to cover different rental companies and aggregators\n\n"
-        "Important: Call tools one step at a time. Search first, then scrape results, "
-        "then extract listings. Repeat until you have enough listings."
-    )
-
-    # Build user message from params
-    parts = [f"Find car rentals in {params.location}."]
-    if params.car_type:
-        parts.append(f"Car type: {params.car_type}.")
-    if params.max_price_per_day:
-        parts.append(f"Budget: under ${params.max_price_per_day}/day.")
-    if params.pickup_date:
-        parts.append(f"Pickup date: {params.pickup_date}.")
-    if params.dropoff_date:
-        parts.append(f"Dropoff date: {params.dropoff_date}.")
-    parts.append(f"Find {TARGET_LISTINGS} car rental listings with prices and details.")
-
-    user_message = " ".join(parts)
-    LOGGER.info("Agent user message: %s", user_message)
-
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_message},
-    ]
-    all_listings: list[dict] = []
-
-    for iteration in range(MAX_AGENT_ITERATIONS):
-        LOGGER.info("Agent iteration %d, listings so far: %d", iteration + 1, len(all_listings))
 
-        try:
-            response = client.chat.completions.create(
-                model=model,
-                max_tokens=4096,
-                messages=messages,
-                tools=TOOLS,
-            )
-        except Exception as exc:
-            LOGGER.error("Agent API call failed: %s", exc)
-            break
-
-        message = response.choices[0].message
-
-        # Append the assistant message to conversation history
-        messages.append(message)
-
-        # If no tool calls, the agent decided to stop
-        if not message.tool_calls:
-            LOGGER.info("Agent stopped (no tool calls)")
-            break
-
-        # Execute each tool call and build results
-        for tc in message.tool_calls:
-            input_data = json.loads(tc.function.arguments)
-            LOGGER.info("Tool call: %s(%s)", tc.function.name, json.dumps(input_data)[:200])
-            result_str = _dispatch_tool(tc.function.name, input_data, client, model)
-
-            # If this was an extract call, accumulate listings
-            if tc.function.name == "extract_car_listings":
-                try:
-                    extracted = json.loads(result_str)
-                    if isinstance(extracted, list):
-                        all_listings.extend(extracted)
-                        LOGGER.info("Extracted %d listings (total: %d)", len(extracted), len(all_listings))
-                except (json.JSONDecodeError, TypeError):
-                    pass
-
-            messages.append({
-                "role": "tool",
-                "tool_call_id": tc.id,
-                "content": result_str[:SCRAPE_MAX_CHARS],
-            })
-
-        if len(all_listings) >= TARGET_LISTINGS:
-            LOGGER.info("Reached target of %d listings", TARGET_LISTINGS)
-            break
-
-    # Deduplicate by (car_name, rental_company, price_per_day)
-    seen = set()
+def _build_listings(all_listings: list[dict]) -> list[CarRentalListing]:
     unique: list[CarRentalListing] = []
     for item in all_listings:
-        key = (
-            item.get("car_name", ""),
-            item.get("rental_company", ""),
-            item.get("price_per_day", 0),
-        )
-        if key in seen:
-            continue
-        seen.add(key)
         try:
             listing = CarRentalListing(
                 car_name=item.get("car_name", "Unknown"),
@@ -9,7 +9,7 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from .forms import CarRentalSearchForm
-from .models import CarRentalResult, CarRentalSearch
+from .models import CarRentalResult, CarRentalResultPayload, CarRentalSearch
 from .serializers import CarRentalListingSerializer, CarRentalQuerySerializer
 from .services import CarRentalSearchError, search_car_rentals_natural
 
@@ -42,8 +42,8 @@ def car_rental_search(request):
                         pickup_date=params.pickup_date or None,
                         dropoff_date=params.dropoff_date or None,
                     )
-                    for listing in listings:
-                        CarRentalResult.objects.create(
+                    results = CarRentalResult.objects.bulk_create(
+                        CarRentalResult(
                             search=search_obj,
                             car_name=listing.car_name,
                             car_type=listing.car_type,
@@ -54,8 +54,13 @@ def car_rental_search(request):
                             availability=listing.availability,
                             listing_url=listing.listing_url,
                             source=listing.source,
-                            raw_data=listing.raw_data,
                         )
+                        for listing in listings
+                    )
+                    CarRentalResultPayload.objects.bulk_create(
+                        CarRentalResultPayload(result=result, data=listing.raw_data)
+                        for result, listing in zip(results, listings)
+                    )
                     return redirect("cars:detail", pk=search_obj.pk)
 
                 # Anonymous: render results inline
@@ -74,7 +79,7 @@ def car_rental_search(request):
 def car_rental_results(request, pk: int):
     """Display saved car rental search results."""
     search_obj = get_object_or_404(CarRentalSearch, pk=pk, user=request.user)
-    results = search_obj.results.all()
+    results = search_obj.fetched_results()
 
     return render(request, "cars/results.html", {
         "search": search_obj,
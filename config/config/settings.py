@@ -70,6 +70,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.db_router.PrimaryStickinessMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -103,6 +104,24 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Gunicorn worker processes (gunicorn reads WEB_CONCURRENCY itself). Every worker
+# holds its own connections, so per-worker limits are derived from it.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "2"))
+# Postgres connections the web tier may hold in total, across all workers.
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "20"))
+# "true" gives each worker a psycopg 3 connection pool; otherwise connections are
+# kept open for DB_CONN_MAX_AGE seconds (0 closes them after every request).
+DB_POOL = os.getenv("DB_POOL", "true").lower() == "true"
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
+
+def _check_pooled_connection(conn):
+    # Run the pool's liveness probe before handing out a connection.
+    from psycopg_pool import ConnectionPool
+
+    ConnectionPool.check_connection(conn)
+
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -113,6 +132,33 @@ DATABASES = {
         "PORT": os.getenv("POSTGRES_PORT", os.getenv("PGPORT", "5432")),
     }
 }
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": 1,
+            "max_size": max(2, DB_MAX_CONNECTIONS // max(1, WEB_CONCURRENCY)),
+            "timeout": 10,
+            "max_idle": 5 * 60,
+            "check": _check_pooled_connection,
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Optional streaming replica. Views decorated with core.db_router.read_from_replica
+# read from it, except for clients that wrote within READ_REPLICA_STICKY_SECONDS.
+READ_REPLICA_DATABASE = None
+READ_REPLICA_STICKY_SECONDS = int(os.getenv("READ_REPLICA_STICKY_SECONDS", "15"))
+if os.getenv("POSTGRES_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.getenv("POSTGRES_REPLICA_HOST"),
+        "PORT": os.getenv("POSTGRES_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+    READ_REPLICA_DATABASE = "replica"
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
 
 
 # Password validation
@@ -187,6 +233,18 @@ CSRF_COOKIE_HTTPONLY = False
 CSRF_COOKIE_SAMESITE = "Lax"
 SESSION_COOKIE_SAMESITE = "Lax"
 
+# Shared cache for sessions, generated plans and event lookups. Without REDIS_URL
+# each process keeps its own local-memory cache.
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}}
+
+# Sessions are cached with write-through to the database when the cache is shared,
+# and database-only otherwise. Values larger than SESSION_REFERENCE_THRESHOLD
+# characters (chat history, pending plans) are stored by reference (core.sessions).
+SESSION_ENGINE = "core.sessions.cached_db" if REDIS_URL else "core.sessions.db"
+SESSION_REFERENCE_THRESHOLD = int(os.getenv("SESSION_REFERENCE_THRESHOLD", "2048"))
+
 # DRF — session auth + JSON renderer by default
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
@@ -202,10 +260,32 @@ OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_DESTINATION_MODEL = os.getenv("OPENAI_DESTINATION_MODEL", "gpt-4o-mini")
 TICKETMASTER_API_KEY = os.getenv("TICKETMASTER_API_KEY")
 
+# Saved itineraries serve stored events; older than this (seconds) triggers a background refresh.
+ITINERARY_EVENTS_TTL = int(os.getenv("ITINERARY_EVENTS_TTL", str(6 * 60 * 60)))
+
+# Generated plans are reused for equivalent requests (same places, length, month,
+# style and preferences) for this many seconds; requests can opt out with "fresh".
+ITINERARY_PLAN_CACHE_TTL = int(os.getenv("ITINERARY_PLAN_CACHE_TTL", str(7 * 24 * 60 * 60)))
+
+# Hotel/car listing search: "pipeline" runs a scripted search -> scrape -> extract
+# pass and falls back to the tool-calling agent loop; "agent" always uses the agent.
+LISTING_SEARCH_MODE = os.getenv("LISTING_SEARCH_MODE", "pipeline")
+
+# purge_search_history deletes flight/hotel/car searches (and their results) older
+# than this many days; searches saved on a trip keep their rows.
+SEARCH_HISTORY_RETENTION_DAYS = int(os.getenv("SEARCH_HISTORY_RETENTION_DAYS", "90"))
+
 
 # Logging configuration to capture full outbound/inbound API I/O
 # In production (e.g., EC2 with DEBUG=false), default to ERROR-only logging unless overridden
 LOG_LEVEL = "DEBUG" if DEBUG else os.getenv("DJANGO_LOG_LEVEL", "ERROR")
+# Handlers below run on a background thread fed by a bounded queue (core.log);
+# records beyond LOG_QUEUE_SIZE pending ones are dropped instead of blocking requests.
+LOGGING_CONFIG = "core.log.configure_logging"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Fraction of API request/response payloads that are logged, and their size cap in characters.
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "1.0" if DEBUG else "0.1"))
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "4000"))
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
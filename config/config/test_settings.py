@@ -4,5 +4,15 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": ":memory:",
-    }
+    },
+    # Stand-in for a read replica; routing to it is enabled per test with
+    # override_settings(READ_REPLICA_DATABASE="replica").
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
 }
+READ_REPLICA_DATABASE = None
+
+# Keep test runs from writing api.log into the repository.
+LOGGING = {**LOGGING, "handlers": {**LOGGING["handlers"], "api_file": {"class": "logging.NullHandler"}}}  # noqa: F405
@@ -1,4 +1,14 @@
+from django.contrib import admin
+
+from .models import ScrapeDomainStat
+
 # Admin registrations have been moved to dedicated apps:
 #   - ItineraryAdmin → itinerary/admin.py
 #   - FlightSearchAdmin, FlightResultAdmin → flights/admin.py
 #   - CarRentalSearchAdmin, CarRentalResultAdmin → cars/admin.py
+
+
+@admin.register(ScrapeDomainStat)
+class ScrapeDomainStatAdmin(admin.ModelAdmin):
+    list_display = ("domain", "scrape_attempts", "scrape_failures", "listings_extracted", "last_scraped_at")
+    search_fields = ("domain",)
@@ -0,0 +1,82 @@
+"""Read-replica routing with read-your-writes stickiness.
+
+Views opt in with :func:`read_from_replica`. While such a view handles a GET,
+reads go to ``settings.READ_REPLICA_DATABASE``; everything else keeps using
+the primary. :class:`PrimaryStickinessMiddleware` marks clients that just
+wrote with a short-lived cookie, and their reads stay on the primary until it
+expires, so users always see their own changes despite replication lag. A
+write inside a replica-reading view also moves that view's remaining reads
+back to the primary.
+"""
+from __future__ import annotations
+
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+PIN_PRIMARY_COOKIE = "db_pin_primary"
+STICKY_SECONDS = 15
+
+_read_alias: ContextVar[str | None] = ContextVar("read_alias", default=None)
+_wrote: ContextVar[bool] = ContextVar("wrote", default=False)
+
+
+def _replica_alias() -> str | None:
+    return getattr(settings, "READ_REPLICA_DATABASE", None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        _read_alias.set(None)
+        _wrote.set(True)
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+
+def read_from_replica(view):
+    """Serve the view's reads from the replica unless the client wrote recently."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = _replica_alias()
+        if not alias or request.method not in ("GET", "HEAD") or PIN_PRIMARY_COOKIE in request.COOKIES:
+            return view(request, *args, **kwargs)
+        token = _read_alias.set(alias)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    return wrapper
+
+
+class PrimaryStickinessMiddleware:
+    """Pin a client's reads to the primary for a short window after it writes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            wrote = _wrote.get()
+        finally:
+            _wrote.reset(token)
+
+        if _replica_alias() and (wrote or request.method not in ("GET", "HEAD", "OPTIONS")):
+            response.set_cookie(
+                PIN_PRIMARY_COOKIE,
+                "1",
+                max_age=getattr(settings, "READ_REPLICA_STICKY_SECONDS", STICKY_SECONDS),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
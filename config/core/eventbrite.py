@@ -9,6 +9,8 @@ from typing import Any, NamedTuple
 import requests
 from django.conf import settings
 
+from .log import LogPayload, log_payload
+
 LOGGER = logging.getLogger(__name__)
 
 COUNTRY_ALIASES = {
@@ -158,7 +160,7 @@ def _normalize_destinations(destination_text: str, trip_start: date, trip_end: d
         return heuristic
 
     raw_text = _extract_output_text(response)
-    LOGGER.info("OpenAI normalization raw response: %s", raw_text)
+    LOGGER.info("OpenAI normalization raw response: %s", LogPayload(raw_text))
 
     try:
         segments = _extract_json_array(raw_text)
@@ -399,7 +401,7 @@ def _fetch_city_events(
     LOGGER.info(
         "Ticketmaster request params for %s: %s",
         destination,
-        json.dumps(params, ensure_ascii=False),
+        LogPayload(params),
     )
 
     try:
@@ -410,12 +412,13 @@ def _fetch_city_events(
         return []
 
     data = response.json()
-    LOGGER.info(
-        "Ticketmaster raw response for %s (status %s): %s",
-        destination,
-        response.status_code,
-        json.dumps(data, ensure_ascii=False),
-    )
+    if log_payload(LOGGER, logging.INFO):
+        LOGGER.info(
+            "Ticketmaster raw response for %s (status %s): %s",
+            destination,
+            response.status_code,
+            LogPayload(data),
+        )
     tm_events = (data.get("_embedded") or {}).get("events", [])
 
     events: list[dict[str, Any]] = []
@@ -0,0 +1,173 @@
+"""Offline gazetteer for resolving city, region and country names without an LLM.
+
+The data ships with the app under ``core/data/gazetteer``:
+
+* ``countries.tsv`` - ISO 3166-1 alpha-2 code, name and aliases
+* ``admin1.tsv``    - first-level subdivisions (US states, Canadian provinces, ...)
+* ``cities.tsv``    - city name, aliases, country, admin1 code, population,
+  latitude/longitude and primary airport (IATA)
+
+Countries and subdivisions are small and loaded into dicts. The city file is
+memory-mapped; only a ``normalized name -> row offsets`` index is kept in
+memory, and rows are parsed on demand. Exact lookups are dict hits and prefix
+lookups use a sorted key list.
+"""
+from __future__ import annotations
+
+import mmap
+import re
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+DATA_DIR = Path(__file__).resolve().parent / "data" / "gazetteer"
+
+_TOKEN_ALIASES = {"saint": "st", "sainte": "ste", "mount": "mt"}
+
+
+class City(NamedTuple):
+    name: str
+    country: str  # ISO 3166-1 alpha-2
+    admin1: str  # first-level subdivision code ("IL", "ON", "NSW"), "" when not tracked
+    population: int
+    latitude: float
+    longitude: float
+    airport: str  # primary IATA airport code, "" when unknown
+
+
+def normalize_name(text: str) -> str:
+    """Accent-folded, lower-case, punctuation-free form used as the lookup key."""
+    folded = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    folded = folded.lower().replace("'", "").replace(".", " ")
+    tokens = re.findall(r"[a-z0-9]+", folded)
+    return " ".join(_TOKEN_ALIASES.get(token, token) for token in tokens)
+
+
+def _data_lines(path: Path):
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip() and not line.startswith("#"):
+                yield line.rstrip("\n").split("\t")
+
+
+class Gazetteer:
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self._countries: dict[str, str] = {}
+        self.country_names: dict[str, str] = {}
+        for row in _data_lines(data_dir / "countries.tsv"):
+            code, name = row[0], row[1]
+            aliases = row[2].split("|") if len(row) > 2 and row[2] else []
+            self.country_names[code] = name
+            for alias in (code, name, *aliases):
+                self._countries.setdefault(normalize_name(alias), code)
+
+        self._admin1: dict[tuple[str, str], str] = {}
+        for country, code, name in _data_lines(data_dir / "admin1.tsv"):
+            self._admin1[(country, normalize_name(code))] = code
+            self._admin1[(country, normalize_name(name))] = code
+
+        with (data_dir / "cities.tsv").open("rb") as handle:
+            self._rows = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index: dict[str, list[int]] = {}
+        offset = 0
+        for raw_line in iter(self._rows.readline, b""):
+            if raw_line.strip() and not raw_line.startswith(b"#"):
+                name, aliases = raw_line.decode("utf-8").split("\t", 2)[:2]
+                for key in {normalize_name(n) for n in (name, *aliases.split("|")) if n}:
+                    self._index.setdefault(key, []).append(offset)
+            offset += len(raw_line)
+        self._keys = sorted(self._index)
+
+    # -- countries and subdivisions -------------------------------------------
+
+    def country_code(self, text: str) -> str | None:
+        """ISO alpha-2 code for a country name, alias or code."""
+        return self._countries.get(normalize_name(text))
+
+    def admin1_code(self, country: str, text: str) -> str | None:
+        """Subdivision code for a state/province name or code within ``country``."""
+        return self._admin1.get((country, normalize_name(text)))
+
+    # -- cities ---------------------------------------------------------------
+
+    def _row(self, offset: int) -> City:
+        end = self._rows.find(b"\n", offset)
+        fields = self._rows[offset:end if end != -1 else None].decode("utf-8").split("\t")
+        return City(
+            name=fields[0],
+            country=fields[2],
+            admin1=fields[3],
+            population=int(fields[4] or 0),
+            latitude=float(fields[5]),
+            longitude=float(fields[6]),
+            airport=fields[7] if len(fields) > 7 else "",
+        )
+
+    def cities(self, name: str) -> list[City]:
+        """All cities called ``name`` (or with that alias), most populous first."""
+        offsets = self._index.get(normalize_name(name), [])
+        return sorted((self._row(o) for o in offsets), key=lambda c: -c.population)
+
+    def prefix(self, text: str, limit: int = 10) -> list[City]:
+        """Cities whose name or alias starts with ``text``, most populous first."""
+        key = normalize_name(text)
+        if not key:
+            return []
+        offsets: set[int] = set()
+        for i in range(bisect_left(self._keys, key), len(self._keys)):
+            if not self._keys[i].startswith(key):
+                break
+            offsets.update(self._index[self._keys[i]])
+        return sorted((self._row(o) for o in offsets), key=lambda c: -c.population)[:limit]
+
+    def _matches(self, city: City, qualifier: str) -> bool:
+        if self.country_code(qualifier) == city.country:
+            return True
+        return bool(city.admin1) and self.admin1_code(city.country, qualifier) == city.admin1
+
+    def candidates(self, text: str) -> list[City]:
+        """Cities matching "City[, region][, country]" text, most populous first.
+
+        Every qualifier after the city name must match the city's country or
+        subdivision. Without commas, trailing words are tried as qualifiers
+        ("Paris France", "Portland Maine").
+        """
+        parts = [part.strip() for part in (text or "").split(",") if part.strip()]
+        if not parts:
+            return []
+        splits = [(parts[0], parts[1:])]
+        if len(parts) == 1:
+            words = parts[0].split()
+            for k in range(1, min(3, len(words) - 1) + 1):
+                splits.append((" ".join(words[:-k]), [" ".join(words[-k:])]))
+
+        for name, qualifiers in splits:
+            found = [c for c in self.cities(name) if all(self._matches(c, q) for q in qualifiers)]
+            if found:
+                return found
+        return []
+
+    def resolve(self, text: str) -> City | None:
+        """Best (most populous) city for ``text``, or ``None`` if it isn't known."""
+        found = self.candidates(text)
+        return found[0] if found else None
+
+    def display_name(self, city: City) -> str:
+        """Short label: ``Chicago, IL`` for US cities, ``Paris, France`` elsewhere."""
+        if city.country == "US" and city.admin1:
+            return f"{city.name}, {city.admin1}"
+        return f"{city.name}, {self.country_names.get(city.country, city.country)}"
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer, loaded on first use."""
+    return Gazetteer()
+
+
+def canonical_location(text: str) -> str:
+    """Rewrite a free-text location as "City, ST" / "City, Country" when the gazetteer knows it."""
+    city = get_gazetteer().resolve(text)
+    return get_gazetteer().display_name(city) if city else text
@@ -0,0 +1,824 @@
+"""Vertical-agnostic listing search engine shared by the hotel and car rental searches.
+
+A vertical describes *what* to look for with a :class:`ListingVertical` (prompts,
+listing schema, dedupe key, query builders). This module owns *how*: the Google
+search / scrape / extract tools, the pooled HTTP session, result caches, the
+scripted pipeline, the tool-calling agent loop, context compaction and the
+per-domain yield stats.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import cached_property
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from requests.adapters import HTTPAdapter
+
+from .log import LogPayload
+from .models import ScrapeDomainStat
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_AGENT_ITERATIONS = 10
+TARGET_LISTINGS = 20
+SCRAPE_MAX_CHARS = 15_000
+SCRAPE_TIMEOUT = 10
+SEARCH_PAUSE = 1.5  # seconds between Google searches to avoid rate-limiting
+CONTEXT_TOKEN_BUDGET = 12_000  # rough cap on the prompt resent every agent iteration
+CHARS_PER_TOKEN = 4
+
+# Scripted pipeline mode (no orchestration LLM)
+PIPELINE_QUERY_VARIANTS = 3
+PIPELINE_MAX_PAGES = 6
+PIPELINE_WORKERS = 4
+EARLY_STOP_DRY_EXTRACTS = 2  # stop after this many extracts in a row add nothing new
+
+# Near-duplicate detection across sources
+DUPLICATE_NAME_SIMILARITY = 0.8
+TOKEN_TYPO_SIMILARITY = 0.8  # "lutetia" / "lutecia", "centre" / "center"
+# Words that never tell two listings apart; verticals extend them in their name_stopwords.
+GENERIC_NAME_TOKENS = frozenset({"the", "and", "a", "an", "of", "at", "by", "de", "la", "le"})
+
+SEARCH_CACHE_TTL = 60 * 60
+SCRAPE_CACHE_TTL = 15 * 60
+EXTRACT_CACHE_TTL = 15 * 60
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+class ListingSearchError(Exception):
+    """Base class for listing search failures; each vertical subclasses it."""
+
+
+@dataclass(frozen=True)
+class ListingVertical:
+    """Everything the engine needs to know about one kind of listing."""
+
+    name: str  # short identifier, e.g. "hotel"; used in tool names and cache keys
+    subject: str  # human wording for prompts, e.g. "car rental"
+    search_hint: str  # what good search queries should include
+    agent_prompt: str
+    extraction_fields: str  # the field list shown to the extraction model
+    required_fields: tuple[str, ...]
+    defaults: Callable[[dict], dict]  # fallback values for a valid extracted item
+    name_field: str  # field compared when looking for near-duplicates
+    price_field: str  # the lowest price wins when duplicates are merged
+    block_key: Callable[[dict], str]  # only listings in the same block are compared; "" = unknown
+    build_user_message: Callable[[Any], str]
+    build_search_queries: Callable[[Any], list[str]]
+    preferred_domains: tuple[str, ...] = ()
+    name_stopwords: frozenset[str] = frozenset()
+    error: type[Exception] = ListingSearchError
+
+    @property
+    def extract_tool(self) -> str:
+        return f"extract_{self.name}_listings"
+
+    @cached_property
+    def tools(self) -> list[dict]:
+        """OpenAI function-calling schema for the agent loop."""
+        return [
+            {
+                "type": "function",
+                "function": {
+                    "name": "search_google",
+                    "description": (
+                        f"Search Google for {self.subject} listings. Returns a list of top result "
+                        f"URLs and snippets. Use specific queries including {self.search_hint} "
+                        f"to find relevant {self.subject} pages."
+                    ),
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "The Google search query string",
+                            }
+                        },
+                        "required": ["query"],
+                    },
+                },
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "scrape_page",
+                    "description": (
+                        "Fetch a web page and return its cleaned text content. Use this to "
+                        f"read the content of {self.subject} listing pages found via search."
+                    ),
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "url": {
+                                "type": "string",
+                                "description": "The URL to fetch and parse",
+                            }
+                        },
+                        "required": ["url"],
+                    },
+                },
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": self.extract_tool,
+                    "description": (
+                        f"Extract structured {self.subject} listing data from raw page text. "
+                        f"Returns a JSON array of {self.subject} objects with price, details, "
+                        "and links. Use this after scraping a page to get structured data."
+                    ),
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "raw_text": {
+                                "type": "string",
+                                "description": "The raw text content from a scraped page",
+                            },
+                            "source_url": {
+                                "type": "string",
+                                "description": "The URL the text was scraped from",
+                            },
+                        },
+                        "required": ["raw_text", "source_url"],
+                    },
+                },
+            },
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def get_openai_client(error: type[Exception] = ListingSearchError):
+    api_key = getattr(settings, "OPENAI_API_KEY", None)
+    if not api_key:
+        raise ImproperlyConfigured("OPENAI_API_KEY is not configured.")
+    try:
+        from openai import OpenAI
+    except ImportError as exc:
+        raise error(
+            "OpenAI SDK is not installed. Add 'openai' to your dependencies."
+        ) from exc
+    return OpenAI(api_key=api_key)
+
+
+def extract_json_object(text: str) -> dict:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        match = re.search(r"\{[\s\S]*\}", text)
+        if not match:
+            raise ValueError("No JSON object found in response.")
+        return json.loads(match.group(0))
+
+
+def extract_json_array(text: str) -> list:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        match = re.search(r"\[[\s\S]*\]", text)
+        if not match:
+            raise ValueError("No JSON array found in response.")
+        return json.loads(match.group(0))
+
+
+def _cache_key(prefix: str, *parts: str) -> str:
+    digest = hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+    return f"listing-search:{prefix}:{digest}"
+
+
+def _domain(url: str) -> str:
+    netloc = urlparse(url).netloc.lower()
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+def _build_http_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=PIPELINE_WORKERS * 4, pool_maxsize=PIPELINE_WORKERS * 2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+# One keep-alive connection pool per process, shared by every vertical.
+_HTTP = _build_http_session()
+
+
+# ---------------------------------------------------------------------------
+# Tools
+# ---------------------------------------------------------------------------
+
+def search_google(query: str, error: type[Exception] = ListingSearchError) -> list[dict]:
+    """Search Google and return top results (cached per query)."""
+    key = _cache_key("google", query)
+    cached = cache.get(key)
+    if cached is not None:
+        LOGGER.info("Google search (cached): %s", query)
+        return cached
+
+    try:
+        from googlesearch import search as gsearch
+    except ImportError as exc:
+        raise error("googlesearch-python is not installed.") from exc
+
+    LOGGER.info("Google search: %s", query)
+    results = []
+    try:
+        for url in gsearch(query, num_results=10):
+            results.append({"url": url, "title": "", "snippet": ""})
+            time.sleep(0.2)  # small pause between result fetches
+    except Exception as exc:
+        LOGGER.warning("Google search error: %s", exc)
+        return [{"error": f"Search failed: {exc}"}]
+
+    time.sleep(SEARCH_PAUSE)
+    cache.set(key, results, SEARCH_CACHE_TTL)
+    return results
+
+
+def scrape_page(url: str) -> str:
+    """Fetch and parse a web page, returning cleaned text (cached per URL)."""
+    key = _cache_key("scrape", url)
+    cached = cache.get(key)
+    if cached is not None:
+        LOGGER.info("Scraping (cached): %s", url)
+        return cached
+
+    LOGGER.info("Scraping: %s", url)
+    try:
+        resp = _HTTP.get(url, timeout=SCRAPE_TIMEOUT)
+        resp.raise_for_status()
+    except requests.RequestException as exc:
+        LOGGER.warning("Scrape failed for %s: %s", url, exc)
+        return f"Error fetching page: {exc}"
+
+    soup = BeautifulSoup(resp.text, "html.parser")
+
+    # Remove non-content elements
+    for tag in soup(["script", "style", "nav", "footer", "header", "noscript"]):
+        tag.decompose()
+
+    text = soup.get_text(separator="\n", strip=True)[:SCRAPE_MAX_CHARS]
+    cache.set(key, text, SCRAPE_CACHE_TTL)
+    return text
+
+
+def extract_listings(
+    vertical: ListingVertical, raw_text: str, source_url: str, client, model: str
+) -> list[dict]:
+    """Use OpenAI to extract structured listings from raw page text."""
+    raw_text = raw_text[:SCRAPE_MAX_CHARS]
+    key = _cache_key("extract", vertical.name, source_url, raw_text)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    domain = urlparse(source_url).netloc
+
+    system_prompt = (
+        f"You are a data extraction assistant. Extract {vertical.subject} listing information "
+        "from the provided text. Return ONLY a JSON array of objects. Each object must have:\n"
+        f"{vertical.extraction_fields}"
+        '- "listing_url": string (direct link if found in text, otherwise "")\n'
+        f'- "source": "{domain}"\n\n'
+        "If you cannot extract valid listings from the text, return an empty array [].\n"
+        "Return ONLY the JSON array, no other text."
+    )
+
+    try:
+        response = client.chat.completions.create(
+            model=model,
+            max_tokens=4096,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": raw_text},
+            ],
+        )
+    except Exception as exc:
+        LOGGER.warning("Extract %s listings failed: %s", vertical.name, exc)
+        return []
+
+    result_text = response.choices[0].message.content or ""
+
+    try:
+        listings = extract_json_array(result_text)
+    except (ValueError, json.JSONDecodeError):
+        LOGGER.warning("Could not parse extracted %s listings JSON", vertical.name)
+        return []
+
+    # Validate each listing has required fields
+    valid = []
+    for item in listings:
+        if not isinstance(item, dict):
+            continue
+        if all(item.get(name) for name in vertical.required_fields):
+            item.setdefault("source", domain)
+            item.setdefault("listing_url", source_url)
+            for name, value in vertical.defaults(item).items():
+                item.setdefault(name, value)
+            valid.append(item)
+
+    cache.set(key, valid, EXTRACT_CACHE_TTL)
+    return valid
+
+
+# ---------------------------------------------------------------------------
+# Yield tracking
+# ---------------------------------------------------------------------------
+
+def _scrape_failed(text: str) -> bool:
+    return not text or text.startswith("Error fetching page")
+
+
+def _timed_scrape(url: str) -> tuple[str, int]:
+    started = time.monotonic()
+    text = scrape_page(url)
+    return text, int((time.monotonic() - started) * 1000)
+
+
+def _scrape_with_stats(url: str) -> str:
+    """Scrape ``url`` for the agent, skipping domains with a poor track record."""
+    domain = _domain(url)
+    if domain in ScrapeDomainStat.low_yield_domains([domain]):
+        LOGGER.info("Skipping low-yield domain %s", domain)
+        return (
+            f"Skipped {url}: {domain} has repeatedly failed or returned no listings. "
+            "Try a different site."
+        )
+    text, latency_ms = _timed_scrape(url)
+    ScrapeDomainStat.record_scrape(domain, not _scrape_failed(text), latency_ms)
+    return text
+
+
+# ---------------------------------------------------------------------------
+# Near-duplicate detection
+# ---------------------------------------------------------------------------
+
+def normalize_tokens(text) -> tuple[str, ...]:
+    """Lower-case, accent-folded alphanumeric tokens of ``text``."""
+    folded = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode()
+    return tuple(re.findall(r"[a-z0-9]+", folded.lower()))
+
+
+def name_similarity(a: frozenset[str], b: frozenset[str], generic: frozenset[str] = GENERIC_NAME_TOKENS) -> float:
+    """Similarity of two normalized names in [0, 1].
+
+    Token order and ``generic`` words are ignored ("the lutetia" / "lutetia").
+    Every other token of one name must be in the other, or be a misspelling of
+    one of its tokens ("lutetia" / "lutecia"). A token that tells the names
+    apart (an area, sub-brand or model word, as in "novotel centre" / "novotel
+    est" or "mustang" / "mustang convertible") makes them different listings
+    and scores 0, however close the characters are.
+    """
+    if not a or not b:
+        return 0.0
+    only_a = sorted(a - b - generic)
+    only_b = sorted(b - a - generic)
+    if len(only_a) != len(only_b):
+        return 0.0
+    ratios = []
+    for token in only_a:
+        scored = [(SequenceMatcher(None, token, other).ratio(), other) for other in only_b]
+        ratio, match = max(scored)
+        if ratio < TOKEN_TYPO_SIMILARITY:
+            return 0.0
+        only_b.remove(match)
+        ratios.append(ratio)
+    shared = len((a & b) - generic)
+    if not shared and not ratios:
+        return 1.0  # the names differ in generic words only
+    return (shared + sum(ratios)) / (shared + len(ratios))
+
+
+def _price(item: dict, field_name: str) -> float:
+    try:
+        return float(item.get(field_name))
+    except (TypeError, ValueError):
+        return float("inf")
+
+
+class ListingIndex:
+    """Near-duplicate index over extracted listings.
+
+    Listings are blocked by ``vertical.block_key`` (a listing with an unknown
+    block is compared against every block) and matched on token-normalized
+    names. Duplicates are merged into the first-seen slot, keeping the cheapest
+    offer and filling its blank fields from the other copies.
+    """
+
+    def __init__(
+        self,
+        vertical: ListingVertical,
+        area: str = "",
+        threshold: float = DUPLICATE_NAME_SIMILARITY,
+    ):
+        self.vertical = vertical
+        self.threshold = threshold
+        # The searched city/area shows up in many names ("Hotel Lutetia Paris").
+        self._ignored = vertical.name_stopwords | set(normalize_tokens(area))
+        self.listings: list[dict] = []
+        self._names: list[frozenset[str]] = []
+        self._blocks: dict[str, list[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self.listings)
+
+    def _signature(self, item: dict) -> tuple[frozenset[str], str]:
+        block = " ".join(normalize_tokens(self.vertical.block_key(item)))
+        tokens = normalize_tokens(item.get(self.vertical.name_field))
+        ignored = self._ignored | set(block.split())
+        name = frozenset(t for t in tokens if t not in ignored) or frozenset(tokens)
+        return name, block
+
+    def _candidates(self, block: str):
+        if not block:
+            return range(len(self.listings))
+        return self._blocks.get(block, []) + self._blocks.get("", [])
+
+    def _find(self, name: frozenset[str], block: str) -> int | None:
+        best, best_score = None, self.threshold
+        for index in self._candidates(block):
+            score = name_similarity(name, self._names[index])
+            if score >= best_score:
+                best, best_score = index, score
+        return best
+
+    def add(self, item: dict) -> bool:
+        """Index ``item``; return True if it is a new listing, False if it was merged."""
+        name, block = self._signature(item)
+        match = self._find(name, block)
+        if match is None:
+            self._blocks[block].append(len(self.listings))
+            self.listings.append(dict(item))
+            self._names.append(name)
+            return True
+
+        kept, other = self.listings[match], item
+        if _price(other, self.vertical.price_field) < _price(kept, self.vertical.price_field):
+            kept, other = dict(other), kept
+        for key, value in other.items():
+            if value not in (None, "") and kept.get(key) in (None, ""):
+                kept[key] = value
+        self.listings[match] = kept
+        return False
+
+    def add_all(self, items: list[dict]) -> int:
+        """Index ``items`` and return how many were new listings."""
+        return sum(self.add(item) for item in items)
+
+
+def unique_listings(vertical: ListingVertical, items: list[dict], area: str = "") -> list[dict]:
+    """Merge near-duplicate listings, keeping the best price per property."""
+    index = ListingIndex(vertical, area)
+    index.add_all(items)
+    return index.listings
+
+
+# ---------------------------------------------------------------------------
+# Conversation compaction
+# ---------------------------------------------------------------------------
+
+def _message_to_dict(message) -> dict:
+    """Convert an SDK assistant message into a plain dict we can rewrite later."""
+    data = {"role": "assistant", "content": message.content or ""}
+    if message.tool_calls:
+        data["tool_calls"] = [
+            {
+                "id": tc.id,
+                "type": "function",
+                "function": {"name": tc.function.name, "arguments": tc.function.arguments},
+            }
+            for tc in message.tool_calls
+        ]
+    return data
+
+
+def _estimate_tokens(messages: list[dict]) -> int:
+    chars = 0
+    for msg in messages:
+        chars += len(msg.get("content") or "")
+        for tc in msg.get("tool_calls") or []:
+            chars += len(tc["function"].get("arguments") or "")
+    return chars // CHARS_PER_TOKEN
+
+
+def _compact_tool_call_arguments(tool_call: dict) -> bool:
+    """Drop the echoed page text from an extract call. Returns True if anything changed."""
+    try:
+        args = json.loads(tool_call["function"].get("arguments") or "{}")
+    except json.JSONDecodeError:
+        return False
+    raw_text = args.get("raw_text")
+    if not isinstance(raw_text, str) or raw_text.startswith("[compacted"):
+        return False
+    args["raw_text"] = f"[compacted: {len(raw_text)} chars]"
+    tool_call["function"]["arguments"] = json.dumps(args)
+    return True
+
+
+def _compact_extracted_scrape(
+    messages: list[dict],
+    scrape_call_id: str | None,
+    extract_call_id: str,
+    source_url: str,
+    listing_count: int,
+) -> None:
+    """Replace a scrape's raw text (and its echo in the extract call) with a stub."""
+    for msg in messages:
+        if msg.get("role") == "tool" and scrape_call_id and msg.get("tool_call_id") == scrape_call_id:
+            msg["content"] = f"[compacted] Scraped {source_url}, extracted {listing_count} listings."
+        for tc in msg.get("tool_calls") or []:
+            if tc.get("id") == extract_call_id:
+                _compact_tool_call_arguments(tc)
+
+
+def _enforce_token_budget(
+    messages: list[dict], current_turn: int, budget: int = CONTEXT_TOKEN_BUDGET
+) -> None:
+    """Stub out the oldest tool payloads until the history fits in ``budget`` tokens.
+
+    The system prompt, the user request and everything from ``current_turn``
+    onwards (the latest assistant message and its tool results) are kept intact
+    so a fresh scrape is still available for the next extract call.
+    """
+    for msg in messages[2:current_turn]:
+        if _estimate_tokens(messages) <= budget:
+            return
+        if msg.get("role") == "tool":
+            content = msg.get("content") or ""
+            if len(content) > 200 and not content.startswith("[compacted"):
+                msg["content"] = f"[compacted: {len(content)} chars of earlier tool output omitted]"
+        for tc in msg.get("tool_calls") or []:
+            _compact_tool_call_arguments(tc)
+
+
+# ---------------------------------------------------------------------------
+# Scripted pipeline
+# ---------------------------------------------------------------------------
+
+def _rank_candidate_urls(
+    results: list[dict],
+    preferred_domains: tuple[str, ...] = (),
+    limit: int = PIPELINE_MAX_PAGES,
+    skip_domains: set[str] = frozenset(),
+) -> list[str]:
+    """Keep the best-placed URL per domain, preferring known listing sites."""
+    best_by_domain: dict[str, tuple[int, str]] = {}
+    for position, result in enumerate(results):
+        url = result.get("url")
+        if not url:
+            continue
+        domain = _domain(url)
+        if domain in skip_domains:
+            continue
+        if domain and domain not in best_by_domain:
+            best_by_domain[domain] = (position, url)
+
+    def sort_key(item):
+        domain, (position, _url) = item
+        preferred = next(
+            (i for i, d in enumerate(preferred_domains) if domain == d or domain.endswith("." + d)),
+            len(preferred_domains),
+        )
+        return (preferred, position)
+
+    ranked = sorted(best_by_domain.items(), key=sort_key)
+    return [url for _domain_name, (_position, url) in ranked[:limit]]
+
+
+def _run_pipeline(vertical: ListingVertical, params, client, model: str) -> list[dict]:
+    """Search, then scrape and extract the top pages concurrently without an orchestrating LLM."""
+    queries = vertical.build_search_queries(params)[:PIPELINE_QUERY_VARIANTS]
+    results: list[dict] = []
+    for query in queries:
+        results.extend(search_google(query, vertical.error))
+
+    candidate_domains = {_domain(r["url"]) for r in results if r.get("url")}
+    low_yield = ScrapeDomainStat.low_yield_domains(candidate_domains)
+    if low_yield:
+        LOGGER.info("Pipeline skipping low-yield domains: %s", sorted(low_yield))
+    urls = _rank_candidate_urls(results, vertical.preferred_domains, skip_domains=low_yield)
+    LOGGER.info("Pipeline scraping %d candidate pages: %s", len(urls), urls)
+    if not urls:
+        return []
+
+    collected: list[dict] = []
+    index = ListingIndex(vertical, getattr(params, "location", ""))
+    dry_extracts = 0
+    pool = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS)
+    try:
+        # Workers only do network/LLM I/O; stats are written from this thread.
+        pending = {pool.submit(_timed_scrape, url): ("scrape", url) for url in urls}
+        while pending and len(index) < TARGET_LISTINGS and dry_extracts < EARLY_STOP_DRY_EXTRACTS:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if len(index) >= TARGET_LISTINGS or dry_extracts >= EARLY_STOP_DRY_EXTRACTS:
+                    break
+                step, url = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    LOGGER.warning("Pipeline %s failed for %s: %s", step, url, exc)
+                    continue
+                if step == "scrape":
+                    text, latency_ms = result
+                    ScrapeDomainStat.record_scrape(_domain(url), not _scrape_failed(text), latency_ms)
+                    if not _scrape_failed(text):
+                        extract = pool.submit(extract_listings, vertical, text, url, client, model)
+                        pending[extract] = ("extract", url)
+                else:
+                    ScrapeDomainStat.record_extract(_domain(url), len(result))
+                    new_count = index.add_all(result)
+                    dry_extracts = 0 if new_count else dry_extracts + 1
+                    collected.extend(result)
+                    LOGGER.info(
+                        "Pipeline extracted %d listings from %s (%d new, %d unique)",
+                        len(result), url, new_count, len(index),
+                    )
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if dry_extracts >= EARLY_STOP_DRY_EXTRACTS:
+        LOGGER.info("Pipeline stopped early: %d extracts in a row added nothing", dry_extracts)
+    return collected
+
+
+# ---------------------------------------------------------------------------
+# Agent loop
+# ---------------------------------------------------------------------------
+
+def _dispatch_tool(vertical: ListingVertical, name: str, input_data: dict, client, model: str) -> str:
+    """Execute a tool call and return the result as a string."""
+    if name == "search_google":
+        results = search_google(input_data["query"], vertical.error)
+        return json.dumps(results)
+    elif name == "scrape_page":
+        return _scrape_with_stats(input_data["url"])
+    elif name == vertical.extract_tool:
+        listings = extract_listings(
+            vertical,
+            input_data["raw_text"],
+            input_data["source_url"],
+            client,
+            model,
+        )
+        ScrapeDomainStat.record_extract(_domain(input_data["source_url"]), len(listings))
+        return json.dumps(listings)
+    else:
+        return json.dumps({"error": f"Unknown tool: {name}"})
+
+
+def _run_agent_loop(vertical: ListingVertical, params, client, model: str) -> list[dict]:
+    """Run the OpenAI agent loop and return the raw extracted listings."""
+    user_message = vertical.build_user_message(params)
+    LOGGER.info("Agent user message: %s", user_message)
+
+    messages = [
+        {"role": "system", "content": vertical.agent_prompt},
+        {"role": "user", "content": user_message},
+    ]
+    all_listings: list[dict] = []
+    scrape_call_ids: dict[str, str] = {}
+    index = ListingIndex(vertical, getattr(params, "location", ""))
+    dry_extracts = 0
+
+    for iteration in range(MAX_AGENT_ITERATIONS):
+        LOGGER.info(
+            "Agent iteration %d, listings so far: %d, prompt ~%d tokens",
+            iteration + 1,
+            len(all_listings),
+            _estimate_tokens(messages),
+        )
+
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                max_tokens=4096,
+                messages=messages,
+                tools=vertical.tools,
+            )
+        except Exception as exc:
+            LOGGER.error("Agent API call failed: %s", exc)
+            break
+
+        message = response.choices[0].message
+
+        # Append the assistant message to conversation history
+        current_turn = len(messages)
+        messages.append(_message_to_dict(message))
+
+        # If no tool calls, the agent decided to stop
+        if not message.tool_calls:
+            LOGGER.info("Agent stopped (no tool calls)")
+            break
+
+        # Execute each tool call and build results
+        for tc in message.tool_calls:
+            input_data = json.loads(tc.function.arguments)
+            LOGGER.info("Tool call: %s(%s)", tc.function.name, LogPayload(tc.function.arguments, max_chars=200))
+            result_str = _dispatch_tool(vertical, tc.function.name, input_data, client, model)
+
+            if tc.function.name == "scrape_page":
+                scrape_call_ids[input_data.get("url", "")] = tc.id
+
+            # If this was an extract call, accumulate listings and compact the scrape
+            if tc.function.name == vertical.extract_tool:
+                try:
+                    extracted = json.loads(result_str)
+                    if isinstance(extracted, list):
+                        all_listings.extend(extracted)
+                        new_count = index.add_all(extracted)
+                        dry_extracts = 0 if new_count else dry_extracts + 1
+                        LOGGER.info(
+                            "Extracted %d listings (%d new, %d unique)",
+                            len(extracted), new_count, len(index),
+                        )
+                        source_url = input_data.get("source_url", "")
+                        _compact_extracted_scrape(
+                            messages,
+                            scrape_call_ids.pop(source_url, None),
+                            tc.id,
+                            source_url,
+                            len(extracted),
+                        )
+                        # The model only needs the tally; listings are collected here.
+                        result_str = (
+                            f"Extracted {len(extracted)} listings from {source_url}, "
+                            f"{new_count} of them new (unique so far: {len(index)})."
+                        )
+                except (json.JSONDecodeError, TypeError):
+                    pass
+
+            messages.append({
+                "role": "tool",
+                "tool_call_id": tc.id,
+                "content": result_str[:SCRAPE_MAX_CHARS],
+            })
+
+        _enforce_token_budget(messages, current_turn)
+
+        if len(index) >= TARGET_LISTINGS:
+            LOGGER.info("Reached target of %d listings", TARGET_LISTINGS)
+            break
+
+        if dry_extracts >= EARLY_STOP_DRY_EXTRACTS:
+            LOGGER.info("Stopping early: %d extracts in a row added no new listings", dry_extracts)
+            break
+
+    return all_listings
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def search_listings(vertical: ListingVertical, params) -> list[dict]:
+    """Find up to ``TARGET_LISTINGS`` unique listings for ``params``.
+
+    ``LISTING_SEARCH_MODE = "pipeline"`` (the default) runs the scripted
+    search/scrape/extract pipeline and only falls back to the agent loop when it
+    comes back empty; ``"agent"`` always uses the agent loop.
+    """
+    client = get_openai_client(vertical.error)
+    model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
+    started = time.monotonic()
+
+    items: list[dict] = []
+    if getattr(settings, "LISTING_SEARCH_MODE", "pipeline") == "pipeline":
+        items = _run_pipeline(vertical, params, client, model)
+        if not items:
+            LOGGER.info("Pipeline found no %s listings; falling back to agent loop", vertical.subject)
+    if not items:
+        items = _run_agent_loop(vertical, params, client, model)
+
+    unique = unique_listings(vertical, items, getattr(params, "location", ""))[:TARGET_LISTINGS]
+    LOGGER.info(
+        "%s search finished in %.1fs: %d raw, %d unique listings",
+        vertical.subject.capitalize(),
+        time.monotonic() - started,
+        len(items),
+        len(unique),
+    )
+    return unique
@@ -0,0 +1,128 @@
+"""Non-blocking logging: records are queued and written by a background thread.
+
+``LOGGING_CONFIG`` points at :func:`configure_logging`, which applies
+``settings.LOGGING`` as usual and then moves each configured logger's
+handlers behind a bounded in-memory queue. A :class:`~logging.handlers.QueueListener`
+thread formats the records and does the console/file I/O, so request threads
+only pay for an enqueue; when the queue is full, records are dropped rather
+than blocking the request.
+
+Large API payloads are logged through :class:`LogPayload`, which defers
+``json.dumps`` to the listener and caps the output size, behind a
+:func:`log_payload` check that skips disabled levels and samples the rest::
+
+    if log_payload(LOGGER):
+        LOGGER.debug("OpenAI response: %s", LogPayload(response.model_dump()))
+"""
+from __future__ import annotations
+
+import atexit
+import copy
+import json
+import logging
+import logging.config
+import queue
+import random
+from datetime import date
+from decimal import Decimal
+from logging.handlers import QueueHandler, QueueListener
+
+from django.conf import settings
+
+QUEUE_SIZE = 10_000
+PAYLOAD_SAMPLE_RATE = 1.0
+PAYLOAD_MAX_CHARS = 4000
+
+# Argument types that are safe to format later on the listener thread.
+_DEFERRABLE_ARGS = (str, bytes, int, float, bool, type(None), date, Decimal)
+
+_listeners: list[QueueListener] = []
+
+
+class LogPayload:
+    """A logging argument that serializes ``value`` only when formatted, truncated to ``max_chars``.
+
+    The value is formatted on the listener thread, so only pass payloads that
+    are not mutated after logging (API requests and responses).
+    """
+
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value, max_chars: int | None = None):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        value = self.value
+        text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+        limit = self.max_chars or getattr(settings, "LOG_PAYLOAD_MAX_CHARS", PAYLOAD_MAX_CHARS)
+        if len(text) > limit:
+            text = f"{text[:limit]}... [{len(text) - limit} more chars]"
+        return text
+
+
+def log_payload(logger: logging.Logger, level: int = logging.DEBUG) -> bool:
+    """Whether to log a payload at ``level`` this time: the level is enabled and the call is sampled."""
+    if not logger.isEnabledFor(level):
+        return False
+    return random.random() < getattr(settings, "LOG_PAYLOAD_SAMPLE_RATE", PAYLOAD_SAMPLE_RATE)
+
+
+def _deferrable(value) -> bool:
+    if isinstance(value, tuple):
+        return all(_deferrable(item) for item in value)
+    return isinstance(value, (*_DEFERRABLE_ARGS, LogPayload))
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Enqueue records without formatting them; drop them if the queue is full."""
+
+    dropped = 0
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        args = record.args
+        if args and not (isinstance(args, tuple) and _deferrable(args)):
+            # Mutable arguments could change before the listener gets to them.
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(config: dict) -> None:
+    """``LOGGING_CONFIG`` callable: apply ``config``, then serve its loggers' handlers from a listener thread."""
+    stop_listeners()
+    logging.config.dictConfig(config)
+
+    names = list(config.get("loggers", {}))
+    loggers = [logging.getLogger(name) for name in names]
+    if "root" in config:
+        loggers.append(logging.getLogger())
+
+    queued: dict[tuple[logging.Handler, ...], QueueHandler] = {}
+    for logger in loggers:
+        targets = tuple(logger.handlers)
+        if not targets:
+            continue
+        if targets not in queued:
+            records = queue.Queue(getattr(settings, "LOG_QUEUE_SIZE", QUEUE_SIZE))
+            listener = QueueListener(records, *targets, respect_handler_level=True)
+            listener.start()
+            _listeners.append(listener)
+            queued[targets] = NonBlockingQueueHandler(records)
+        logger.handlers = [queued[targets]]
+
+
+def stop_listeners() -> None:
+    """Write out queued records and stop the listener threads."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(stop_listeners)
@@ -0,0 +1,68 @@
+"""Load test for per-request database connection overhead.
+
+Replays ``--requests`` request cycles in-process: ``request_started``, one
+query, ``request_finished``. These are the signals Django uses to open and
+close connections around every HTTP request. The run is done twice: once
+with connection reuse disabled (``CONN_MAX_AGE=0``, no pool), which is how
+the app behaved before pooling, and once with the configured settings. For
+each run the command reports how many Postgres backends served the requests
+and the per-request latency.
+"""
+from __future__ import annotations
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = "Compare per-request Postgres connection overhead with and without connection reuse."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Request cycles per run.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to test.")
+
+    def handle(self, *args, requests, database, **options):
+        connection = connections[database]
+        if connection.vendor != "postgresql":
+            raise CommandError("The connection benchmark needs a PostgreSQL database.")
+        if requests < 1:
+            raise CommandError("--requests must be positive.")
+
+        configured = connection.settings_dict
+        unpooled = {
+            **configured,
+            "CONN_MAX_AGE": 0,
+            "OPTIONS": {key: value for key, value in configured["OPTIONS"].items() if key != "pool"},
+        }
+        try:
+            runs = [
+                ("no reuse", self._run(connection, unpooled, requests)),
+                ("configured", self._run(connection, configured, requests)),
+            ]
+        finally:
+            connection.close()
+            connection.settings_dict = configured
+
+        self.stdout.write(f"{'mode':<12}{'backends':>10}{'mean ms':>10}{'p95 ms':>10}")
+        for mode, (backends, timings) in runs:
+            p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+            self.stdout.write(f"{mode:<12}{backends:>10}{statistics.mean(timings):>10.2f}{p95:>10.2f}")
+
+    def _run(self, connection, settings_dict, requests) -> tuple[int, list[float]]:
+        connection.close()
+        connection.settings_dict = settings_dict
+        backends: set[int] = set()
+        timings: list[float] = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_backend_pid()")
+                backends.add(cursor.fetchone()[0])
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - started) * 1000)
+        return len(backends), timings
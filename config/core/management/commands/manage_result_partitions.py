@@ -0,0 +1,63 @@
+"""Create upcoming monthly result partitions and drop expired ones (PostgreSQL).
+
+Run daily: it creates partitions ``--months-ahead`` months in advance so
+inserts never miss a partition, and with ``--retain-months`` it drops whole
+months older than that in one statement each instead of deleting rows.
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from cars.models import CarRentalResult, CarRentalResultPayload
+from core.partitions import MONTHS_AHEAD, add_months, drop_partitions_before, ensure_partitions, is_partitioned
+from flights.models import FlightResult, FlightResultPayload
+from hotels.models import HotelResult, HotelResultPayload
+
+PARTITIONED_RESULTS = (
+    (FlightResult, FlightResultPayload),
+    (HotelResult, HotelResultPayload),
+    (CarRentalResult, CarRentalResultPayload),
+)
+
+
+class Command(BaseCommand):
+    help = "Create future monthly partitions of the result tables and drop expired months."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead", type=int, default=MONTHS_AHEAD, help="Create partitions this many months ahead."
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=None,
+            help="Drop partitions for months before the current month minus this many months.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database alias to manage.")
+
+    def handle(self, *args, months_ahead, retain_months, database, **options):
+        if months_ahead < 0 or (retain_months is not None and retain_months < 0):
+            raise CommandError("--months-ahead and --retain-months cannot be negative.")
+        connection = connections[database]
+
+        for result_model, payload_model in PARTITIONED_RESULTS:
+            table = result_model._meta.db_table
+            if not is_partitioned(connection, table):
+                self.stdout.write(f"{table} is not partitioned; skipping.")
+                continue
+            with transaction.atomic(using=database):
+                created = ensure_partitions(connection, table, months_ahead=months_ahead)
+            dropped = []
+            if retain_months is not None:
+                cutoff = add_months(date.today().replace(day=1), -retain_months)
+                with transaction.atomic(using=database):
+                    dropped = drop_partitions_before(
+                        connection, table, cutoff, payload_table=payload_model._meta.db_table
+                    )
+            for name in created:
+                self.stdout.write(f"Created partition {name}")
+            for name in dropped:
+                self.stdout.write(f"Dropped partition {name}")
@@ -0,0 +1,92 @@
+"""Delete old flight, hotel and car search history in bounded batches.
+
+Searches created more than ``--days`` ago are deleted together with their
+results and raw result payloads. Searches attached to a trip are kept with
+their results; only the raw provider payloads of those results are dropped.
+Every batch is deleted in its own short transaction so no lock is held for
+the whole run.
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from cars.models import CarRentalResult, CarRentalResultPayload, CarRentalSearch
+from flights.models import FlightResult, FlightResultPayload, FlightSearch
+from hotels.models import HotelResult, HotelResultPayload, HotelSearch
+from trips.models import Trip
+
+RETENTION_DAYS = 90
+BATCH_SIZE = 500
+
+# (search, result, raw payload model, Trip field pointing at the search)
+SEARCH_HISTORY = (
+    (FlightSearch, FlightResult, FlightResultPayload, "flight_search"),
+    (HotelSearch, HotelResult, HotelResultPayload, "hotel_search"),
+    (CarRentalSearch, CarRentalResult, CarRentalResultPayload, "car_rental_search"),
+)
+
+
+class Command(BaseCommand):
+    help = "Delete flight, hotel and car searches older than the retention period, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "SEARCH_HISTORY_RETENTION_DAYS", RETENTION_DAYS),
+            help="Delete searches created more than this many days ago.",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Searches deleted per transaction.")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between batches.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted without deleting.")
+
+    def handle(self, *args, days, batch_size, sleep, dry_run, **options):
+        if days < 1 or batch_size < 1:
+            raise CommandError("--days and --batch-size must be positive.")
+        cutoff = timezone.now() - timedelta(days=days)
+
+        reclaimed: Counter[str] = Counter()
+        for search_model, result_model, payload_model, trip_field in SEARCH_HISTORY:
+            old = search_model.objects.filter(created_at__lt=cutoff)
+            on_trip = Exists(Trip.objects.filter(**{trip_field: OuterRef("pk")}))
+            expired = old.exclude(on_trip)
+            payloads = payload_model.objects.filter(result__search__in=old.filter(on_trip))
+
+            if dry_run:
+                reclaimed[search_model._meta.label] += expired.count()
+                reclaimed[result_model._meta.label] += result_model.objects.filter(search__in=expired).count()
+                reclaimed[payload_model._meta.label] += (
+                    payload_model.objects.filter(result__search__in=expired).count() + payloads.count()
+                )
+                continue
+
+            reclaimed.update(self._delete_in_batches(expired, batch_size, sleep))
+            reclaimed.update(self._delete_in_batches(payloads, batch_size, sleep))
+
+        verb = "Would delete" if dry_run else "Deleted"
+        for label, count in sorted(reclaimed.items()):
+            self.stdout.write(f"{verb} {count} {label} rows")
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {sum(reclaimed.values())} rows older than {days} days."
+        ))
+
+    def _delete_in_batches(self, queryset, batch_size, sleep) -> Counter[str]:
+        deleted: Counter[str] = Counter()
+        model = queryset.model
+        while True:
+            pks = list(queryset.order_by("pk").values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return deleted
+            with transaction.atomic():
+                _, counts = model.objects.filter(pk__in=pks).delete()
+            deleted.update({label: count for label, count in counts.items() if count})
+            if sleep:
+                time.sleep(sleep)
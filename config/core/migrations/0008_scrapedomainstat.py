@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_remove_moved_models"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScrapeDomainStat",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("domain", models.CharField(max_length=255, unique=True)),
+                ("scrape_attempts", models.PositiveIntegerField(default=0)),
+                ("scrape_failures", models.PositiveIntegerField(default=0)),
+                ("total_latency_ms", models.PositiveBigIntegerField(default=0)),
+                ("extract_attempts", models.PositiveIntegerField(default=0)),
+                ("listings_extracted", models.PositiveIntegerField(default=0)),
+                ("last_scraped_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={"ordering": ["domain"]},
+        ),
+    ]
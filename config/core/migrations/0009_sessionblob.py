@@ -0,0 +1,20 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_scrapedomainstat"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SessionBlob",
+            fields=[
+                ("key", models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ("data", models.TextField()),
+                ("touched_at", models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
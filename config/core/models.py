@@ -1,4 +1,104 @@
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+
 # Models have been moved to dedicated apps:
 #   - Itinerary  → itinerary/models.py
 #   - FlightSearch, FlightResult → flights/models.py
 #   - CarRentalSearch, CarRentalResult → cars/models.py
+
+
+class ScrapeDomainStat(models.Model):
+    """Running scrape/extract yield for a listing site, shared by the hotel and car agents."""
+
+    MIN_SAMPLES = 4
+    MIN_SUCCESS_RATE = 0.3
+    MIN_LISTINGS_PER_SCRAPE = 0.5
+    RETRY_AFTER = timedelta(days=7)  # give skipped sites another chance after this long
+
+    domain = models.CharField(max_length=255, unique=True)
+    scrape_attempts = models.PositiveIntegerField(default=0)
+    scrape_failures = models.PositiveIntegerField(default=0)
+    total_latency_ms = models.PositiveBigIntegerField(default=0)
+    extract_attempts = models.PositiveIntegerField(default=0)
+    listings_extracted = models.PositiveIntegerField(default=0)
+    last_scraped_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["domain"]
+
+    def __str__(self) -> str:
+        return f"{self.domain} ({self.success_rate:.0%} ok, {self.listings_per_scrape:.1f}/scrape)"
+
+    @property
+    def success_rate(self) -> float:
+        if not self.scrape_attempts:
+            return 1.0
+        return 1 - self.scrape_failures / self.scrape_attempts
+
+    @property
+    def avg_latency_ms(self) -> float:
+        if not self.scrape_attempts:
+            return 0.0
+        return self.total_latency_ms / self.scrape_attempts
+
+    @property
+    def listings_per_scrape(self) -> float:
+        successes = self.scrape_attempts - self.scrape_failures
+        if not successes:
+            return 0.0
+        return self.listings_extracted / successes
+
+    @property
+    def is_low_yield(self) -> bool:
+        """True once enough samples show the site is blocked or yields almost nothing."""
+        if self.scrape_attempts < self.MIN_SAMPLES:
+            return False
+        return (
+            self.success_rate < self.MIN_SUCCESS_RATE
+            or self.listings_per_scrape < self.MIN_LISTINGS_PER_SCRAPE
+        )
+
+    @classmethod
+    def record_scrape(cls, domain: str, ok: bool, latency_ms: int) -> None:
+        if not domain:
+            return
+        cls.objects.get_or_create(domain=domain)
+        cls.objects.filter(domain=domain).update(
+            scrape_attempts=F("scrape_attempts") + 1,
+            scrape_failures=F("scrape_failures") + (0 if ok else 1),
+            total_latency_ms=F("total_latency_ms") + max(0, int(latency_ms)),
+            last_scraped_at=timezone.now(),
+        )
+
+    @classmethod
+    def record_extract(cls, domain: str, listing_count: int) -> None:
+        if not domain:
+            return
+        cls.objects.get_or_create(domain=domain)
+        cls.objects.filter(domain=domain).update(
+            extract_attempts=F("extract_attempts") + 1,
+            listings_extracted=F("listings_extracted") + max(0, listing_count),
+        )
+
+    @classmethod
+    def low_yield_domains(cls, domains) -> set[str]:
+        """Return the subset of ``domains`` that should currently be skipped."""
+        recent = cls.objects.filter(
+            domain__in=set(domains),
+            last_scraped_at__gte=timezone.now() - cls.RETRY_AFTER,
+        )
+        return {stat.domain for stat in recent if stat.is_low_yield}
+
+
+class SessionBlob(models.Model):
+    """A large session value (or a chunk of one) stored by content hash; see ``core.sessions``."""
+
+    key = models.CharField(max_length=40, primary_key=True)
+    data = models.TextField()
+    touched_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self) -> str:
+        return f"{self.key} ({len(self.data)} chars)"
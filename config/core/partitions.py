@@ -0,0 +1,232 @@
+"""Monthly range partitions of search result tables by ``fetched_at``.
+
+On PostgreSQL the flight, hotel and car result tables are declaratively
+partitioned by month (``<table>_pYYYY_MM``). ``ensure_partitions`` creates
+the partitions for the coming months ahead of time (the container entrypoint
+and the daily maintenance job both run it); ``drop_partitions_before``
+detaches and drops whole months, which is instant compared to deleting rows.
+A DEFAULT partition (``<table>_default``) catches rows for months nobody
+created yet, so inserts never fail; ``ensure_partitions`` moves such rows into
+their month's partition once it exists. Other databases keep plain tables
+and every helper here is a no-op for them.
+
+Results are written seconds after their search, so
+:meth:`SearchResultsMixin.fetched_results` bounds ``fetched_at`` to a short
+window after ``created_at``; the planner then only reads the search's month.
+"""
+from __future__ import annotations
+
+import re
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.db import models
+
+MONTHS_AHEAD = 3
+RESULTS_FETCH_WINDOW = timedelta(hours=1)
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+class SearchResultsMixin(models.Model):
+    """For search models whose ``results`` live in a partitioned table."""
+
+    class Meta:
+        abstract = True
+
+    def fetched_results(self):
+        """This search's results, bounded to the partition they were written to."""
+        return self.results.filter(
+            fetched_at__gte=self.created_at,
+            fetched_at__lt=self.created_at + RESULTS_FETCH_WINDOW,
+        )
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def _bound(month: date) -> str:
+    return f"'{datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()}'"
+
+
+def is_partitioned(connection, table: str) -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [table])
+        return cursor.fetchone() is not None
+
+
+def partitions(connection, table: str) -> dict[date, str]:
+    """Existing monthly partitions of ``table`` by first day of the month."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits"
+            " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+            " WHERE pg_inherits.inhparent = to_regclass(%s)",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    found = {}
+    for name in names:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            found[date(int(match[1]), int(match[2]), 1)] = name
+    return found
+
+
+def ensure_default_partition(connection, table: str) -> None:
+    """Create ``table``'s DEFAULT partition if it is missing."""
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {quote(default_partition_name(table))} PARTITION OF {quote(table)} DEFAULT"
+        )
+
+
+def ensure_partitions(connection, table: str, months_ahead: int = MONTHS_AHEAD, first: date | None = None) -> list[str]:
+    """Create missing partitions from ``first`` (default: this month) through ``months_ahead`` months on.
+
+    Rows the DEFAULT partition holds for a new month are moved into it before
+    it is attached. Run inside a transaction.
+    """
+    if not is_partitioned(connection, table):
+        return []
+    ensure_default_partition(connection, table)
+    quote = connection.ops.quote_name
+    default = quote(default_partition_name(table))
+    existing = partitions(connection, table)
+    month = month_start(first or date.today())
+    last = add_months(month_start(date.today()), months_ahead)
+    created = []
+    with connection.cursor() as cursor:
+        while month <= last:
+            if month not in existing:
+                name = partition_name(table, month)
+                low, high = _bound(month), _bound(add_months(month, 1))
+                cursor.execute(
+                    f"CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                )
+                cursor.execute(
+                    f"WITH moved AS (DELETE FROM {default} WHERE fetched_at >= {low} AND fetched_at < {high}"
+                    f" RETURNING *) INSERT INTO {quote(name)} SELECT * FROM moved"
+                )
+                cursor.execute(
+                    f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} FOR VALUES FROM ({low}) TO ({high})"
+                )
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+
+def drop_partitions_before(connection, table: str, month: date, payload_table: str | None = None) -> list[str]:
+    """Detach and drop every partition of ``table`` for months before ``month``.
+
+    Rows of those months left in the DEFAULT partition are deleted too.
+    Payload rows of the dropped results are removed by id range, since the
+    payload table cannot hold a foreign key to the partitioned table.
+    """
+    if not is_partitioned(connection, table):
+        return []
+    quote = connection.ops.quote_name
+    dropped = []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(default_partition_name(table))} WHERE fetched_at < {_bound(month_start(month))}"
+            " RETURNING id"
+        )
+        stale_ids = [row[0] for row in cursor.fetchall()]
+        if payload_table and stale_ids:
+            cursor.execute(f"DELETE FROM {quote(payload_table)} WHERE result_id = ANY(%s)", [stale_ids])
+        for partition_month, name in sorted(partitions(connection, table).items()):
+            if partition_month >= month_start(month):
+                continue
+            cursor.execute(f"SELECT min(id), max(id) FROM {quote(name)}")
+            low, high = cursor.fetchone()
+            cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}")
+            cursor.execute(f"DROP TABLE {quote(name)}")
+            if payload_table and low is not None:
+                cursor.execute(
+                    f"DELETE FROM {quote(payload_table)} AS payload WHERE result_id BETWEEN %s AND %s"
+                    f" AND NOT EXISTS (SELECT 1 FROM {quote(table)} WHERE id = payload.result_id)",
+                    [low, high],
+                )
+            dropped.append(name)
+    return dropped
+
+
+def _rebuild(schema_editor, model, partitioned: bool) -> None:
+    """Recreate ``model``'s table (partitioned or plain) and copy its rows across."""
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    table = model._meta.db_table
+    old = f"{table}_old"
+    search_field = model._meta.get_field("search")
+    search_table = search_field.related_model._meta.db_table
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+        cursor.execute(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS"
+            f" INCLUDING IDENTITY)" + (" PARTITION BY RANGE (fetched_at)" if partitioned else "")
+        )
+        primary_key = "id, fetched_at" if partitioned else "id"
+        cursor.execute(f"ALTER TABLE {quote(table)} ADD PRIMARY KEY ({primary_key})")
+        if partitioned:
+            cursor.execute(f"SELECT min(fetched_at) FROM {quote(old)}")
+            oldest = cursor.fetchone()[0]
+            ensure_default_partition(connection, table)
+            ensure_partitions(connection, table, first=oldest.date() if oldest else None)
+        cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), coalesce(max(id), 0) + 1, false) FROM {quote(table)}",
+            [table],
+        )
+        cursor.execute(f"DROP TABLE {quote(old)} CASCADE")
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ADD FOREIGN KEY ({quote(search_field.column)})"
+            f" REFERENCES {quote(search_table)} (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+        cursor.execute(f"CREATE INDEX ON {quote(table)} ({quote(search_field.column)})")
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+
+
+def add_default_partition(model_label: str):
+    """``RunPython`` operation adding the DEFAULT partition to an already partitioned result table."""
+    from django.db import migrations
+
+    def forwards(apps, schema_editor):
+        table = apps.get_model(model_label)._meta.db_table
+        if is_partitioned(schema_editor.connection, table):
+            ensure_default_partition(schema_editor.connection, table)
+
+    return migrations.RunPython(forwards, migrations.RunPython.noop)
+
+
+def partition_result_table(model_label: str):
+    """``RunPython`` operation converting a result table to monthly partitions on PostgreSQL."""
+    from django.db import migrations
+
+    def forwards(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            _rebuild(schema_editor, apps.get_model(model_label), partitioned=True)
+
+    def backwards(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            _rebuild(schema_editor, apps.get_model(model_label), partitioned=False)
+
+    return migrations.RunPython(forwards, backwards)
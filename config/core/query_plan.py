@@ -0,0 +1,36 @@
+"""Helpers for asserting that hot queries are served by indexes.
+
+``plan_problems(queryset)`` runs EXPLAIN for the queryset on its database and
+returns the steps that read a whole table or sort rows outside an index.
+SQLite (the test database) and PostgreSQL plans are understood.
+"""
+from __future__ import annotations
+
+import re
+
+from django.db import connections
+from django.db.models import QuerySet
+
+# SQLite: "SCAN core_itinerary" without an index, "USE TEMP B-TREE FOR ORDER BY".
+_SQLITE_FULL_SCAN = re.compile(r"\bSCAN (\w+)\b(?! USING (?:COVERING )?INDEX)")
+_SQLITE_SORT = re.compile(r"USE TEMP B-TREE FOR (?:ORDER BY|RIGHT PART OF ORDER BY)")
+# PostgreSQL: plan nodes like "Seq Scan on core_itinerary" and "Sort" / "Incremental Sort".
+_POSTGRES_FULL_SCAN = re.compile(r"\bSeq Scan on (\w+)")
+_POSTGRES_SORT = re.compile(r"(?:->|^)\s*(?:Incremental )?Sort\b", re.MULTILINE)
+
+
+def plan_problems(queryset: QuerySet) -> list[str]:
+    """EXPLAIN ``queryset`` and describe each sequential scan or explicit sort in its plan."""
+    vendor = connections[queryset.db].vendor
+    plan = queryset.explain()
+    if vendor == "sqlite":
+        full_scan, sort = _SQLITE_FULL_SCAN, _SQLITE_SORT
+    elif vendor == "postgresql":
+        full_scan, sort = _POSTGRES_FULL_SCAN, _POSTGRES_SORT
+    else:
+        raise NotImplementedError(f"Query plan checks are not implemented for {vendor}.")
+
+    problems = [f"sequential scan of {table}" for table in full_scan.findall(plan)]
+    if sort.search(plan):
+        problems.append("sort outside an index")
+    return [f"{problem}:\n{plan}" for problem in problems]
@@ -2,11 +2,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import logging
-import json
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 
+from .log import LogPayload, log_payload
 from .models import Itinerary
 
 
@@ -484,19 +484,19 @@ def generate_itinerary(payload: ItineraryRequest) -> tuple[str, str]:
         )
 
         # Log full outbound payload to OpenAI
-        LOGGER.debug(
-            "OpenAI request: %s",
-            json.dumps(
-                {
-                    "model": model,
-                    "input": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": prompt},
-                    ],
-                },
-                ensure_ascii=False,
-            ),
-        )
+        if log_payload(LOGGER):
+            LOGGER.debug(
+                "OpenAI request: %s",
+                LogPayload(
+                    {
+                        "model": model,
+                        "input": [
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": prompt},
+                        ],
+                    }
+                ),
+            )
 
         response = client.responses.create(
             model=model,
@@ -509,16 +509,17 @@ def generate_itinerary(payload: ItineraryRequest) -> tuple[str, str]:
         raise ItineraryGenerationError(str(exc)) from exc
 
     # Log raw inbound response from OpenAI
-    try:
-        if hasattr(response, "model_dump"):
-            response_payload = response.model_dump()
-        elif hasattr(response, "to_dict"):
-            response_payload = response.to_dict()  # type: ignore[attr-defined]
-        else:
-            response_payload = str(response)
-        LOGGER.debug("OpenAI response: %s", json.dumps(response_payload, ensure_ascii=False))
-    except Exception:  # pragma: no cover - logging must not break flow
-        LOGGER.debug("OpenAI response (unserializable): %r", response)
+    if log_payload(LOGGER):
+        try:
+            if hasattr(response, "model_dump"):
+                response_payload = response.model_dump()
+            elif hasattr(response, "to_dict"):
+                response_payload = response.to_dict()  # type: ignore[attr-defined]
+            else:
+                response_payload = str(response)
+            LOGGER.debug("OpenAI response: %s", LogPayload(response_payload))
+        except Exception:  # pragma: no cover - logging must not break flow
+            LOGGER.debug("OpenAI response (unserializable): %r", response)
 
     itinerary_text = getattr(response, "output_text", None)
     if not itinerary_text:
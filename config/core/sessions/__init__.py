@@ -0,0 +1,203 @@
+"""Session engines whose per-request cost does not grow with conversation length.
+
+Flight chat history and pending itineraries make some session values large.
+The engines here (``core.sessions.db`` and ``core.sessions.cached_db``) keep
+values whose JSON exceeds ``SESSION_REFERENCE_THRESHOLD`` characters out of
+the session row: they are written once as content-addressed
+:class:`~core.models.SessionBlob` rows, fronted by the cache, and the session
+only holds a small reference. Lists are split into fixed-size chunks, so
+appending a chat turn writes one new chunk instead of the whole history.
+
+References are resolved lazily when a value is read, so requests that only
+touch small keys never load the large ones. A session whose data did not
+actually change is not written back, even when ``modified`` is set.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from core.models import SessionBlob
+
+LOGGER = logging.getLogger(__name__)
+
+REFERENCE_THRESHOLD = 2048
+CHUNK_ITEMS = 16
+REF_KEY = "__session_ref__"
+BLOB_CACHE_PREFIX = "core.sessions.blob:"
+# Referenced blobs are re-stamped at most this often; unstamped ones are purged by clearsessions.
+TOUCH_INTERVAL = timedelta(days=1)
+
+_NOT_GIVEN = object()
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _is_ref(value) -> bool:
+    return isinstance(value, dict) and REF_KEY in value
+
+
+class ReferenceSessionMixin:
+    """Store large session values by reference and skip saves of unchanged data."""
+
+    _fingerprint = None
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._known_blobs: set[str] = set()
+
+    @property
+    def _blob_cache(self):
+        return caches[settings.SESSION_CACHE_ALIAS]
+
+    @property
+    def _threshold(self) -> int:
+        return getattr(settings, "SESSION_REFERENCE_THRESHOLD", REFERENCE_THRESHOLD)
+
+    # Reads resolve references in place, without marking the session modified.
+
+    def __getitem__(self, key):
+        return self._resolved(key)
+
+    def get(self, key, default=None):
+        return self._resolved(key) if key in self._session else default
+
+    def pop(self, key, default=_NOT_GIVEN):
+        if key in self._session:
+            value = self._resolved(key)
+            del self[key]
+            return value
+        if default is _NOT_GIVEN:
+            raise KeyError(key)
+        return default
+
+    def setdefault(self, key, value):
+        if key in self._session:
+            return self._resolved(key)
+        return super().setdefault(key, value)
+
+    def values(self):
+        return [self._resolved(key) for key in list(self._session)]
+
+    def items(self):
+        return [(key, self._resolved(key)) for key in list(self._session)]
+
+    def _resolved(self, key):
+        session = self._session
+        value = session[key]
+        if isinstance(value, dict):
+            value = session[key] = self._unpack(value)
+        return value
+
+    def _unpack(self, value):
+        if _is_ref(value):
+            return self._load_ref(value)
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if isinstance(item, dict):
+                    value[key] = self._unpack(item)
+        return value
+
+    def _load_ref(self, ref):
+        keys = ref[REF_KEY]
+        texts = self._fetch_blobs(keys)
+        missing = [key for key in keys if key not in texts]
+        if missing:
+            LOGGER.warning("Session %s references missing blobs %s", self.session_key, missing)
+            return [] if ref.get("chunked") else None
+        if ref.get("chunked"):
+            return [item for key in keys for item in json.loads(texts[key])]
+        return json.loads(texts[keys[0]])
+
+    def _fetch_blobs(self, keys) -> dict[str, str]:
+        cache = self._blob_cache
+        cached = cache.get_many([BLOB_CACHE_PREFIX + key for key in keys])
+        found = {cache_key[len(BLOB_CACHE_PREFIX):]: text for cache_key, text in cached.items()}
+        missing = [key for key in keys if key not in found]
+        if missing:
+            loaded = dict(SessionBlob.objects.filter(key__in=missing).values_list("key", "data"))
+            cache.set_many({BLOB_CACHE_PREFIX + key: text for key, text in loaded.items()}, settings.SESSION_COOKIE_AGE)
+            found.update(loaded)
+        self._known_blobs.update(found)
+        return found
+
+    # Saving
+
+    def load(self):
+        data = super().load()
+        self._fingerprint = self._digest(data)
+        return data
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        refs = self._pack(data)
+        fingerprint = self._digest(data)
+        if fingerprint == self._fingerprint and not must_create and not settings.SESSION_SAVE_EVERY_REQUEST:
+            return
+        super().save(must_create)
+        self._fingerprint = fingerprint
+        if refs:
+            SessionBlob.objects.filter(key__in=refs, touched_at__lt=timezone.now() - TOUCH_INTERVAL).update(
+                touched_at=timezone.now()
+            )
+
+    @classmethod
+    def clear_expired(cls):
+        super().clear_expired()
+        cutoff = timezone.now() - timedelta(seconds=settings.SESSION_COOKIE_AGE) - TOUCH_INTERVAL
+        SessionBlob.objects.filter(touched_at__lt=cutoff).delete()
+
+    @staticmethod
+    def _digest(data) -> str:
+        return hashlib.sha1(_dumps(data).encode("utf-8")).hexdigest()
+
+    def _pack(self, data) -> set[str]:
+        """Replace large values in ``data`` by references, writing new blobs; return all referenced keys."""
+        blobs: dict[str, str] = {}
+        refs: set[str] = set()
+        for key, value in data.items():
+            data[key] = self._pack_value(value, blobs, refs)
+        new = {key: text for key, text in blobs.items() if key not in self._known_blobs}
+        if new:
+            SessionBlob.objects.bulk_create(
+                [SessionBlob(key=key, data=text) for key, text in new.items()], ignore_conflicts=True
+            )
+            self._blob_cache.set_many(
+                {BLOB_CACHE_PREFIX + key: text for key, text in new.items()}, settings.SESSION_COOKIE_AGE
+            )
+            self._known_blobs.update(new)
+        return refs
+
+    def _pack_value(self, value, blobs, refs):
+        if _is_ref(value):
+            refs.update(value[REF_KEY])
+            return value
+        if isinstance(value, dict):
+            return {key: self._pack_value(item, blobs, refs) for key, item in value.items()}
+        if isinstance(value, list):
+            chunks = [_dumps(value[start:start + CHUNK_ITEMS]) for start in range(0, len(value), CHUNK_ITEMS)]
+            if sum(map(len, chunks)) > self._threshold:
+                return self._reference(chunks, blobs, refs, chunked=True)
+        elif isinstance(value, str) and len(value) > self._threshold:
+            return self._reference([_dumps(value)], blobs, refs, chunked=False)
+        return value
+
+    @staticmethod
+    def _reference(texts, blobs, refs, chunked: bool) -> dict:
+        keys = []
+        for text in texts:
+            key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+            blobs[key] = text
+            keys.append(key)
+        refs.update(keys)
+        return {REF_KEY: keys, "chunked": chunked}
@@ -0,0 +1,12 @@
+"""Cached sessions with write-through to the database and large values stored by reference.
+
+Only use this engine with a cache shared by every worker (see ``REDIS_URL``);
+with a per-process cache, workers would serve each other stale sessions.
+"""
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+from . import ReferenceSessionMixin
+
+
+class SessionStore(ReferenceSessionMixin, CachedDBStore):
+    pass
@@ -0,0 +1,8 @@
+"""Database-backed sessions with large values stored by reference (see :mod:`core.sessions`)."""
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+from . import ReferenceSessionMixin
+
+
+class SessionStore(ReferenceSessionMixin, DBStore):
+    pass
@@ -1,5 +1,468 @@
-# Tests have been moved to dedicated apps:
+# Most tests live in the dedicated apps:
 #   - Itinerary tests → itinerary/tests.py
 #
 # Run all tests with:
 #   python config/manage.py test itinerary users
+
+import logging
+import queue
+import threading
+from datetime import date, timedelta
+from io import StringIO
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from cars.models import CarRentalResult, CarRentalSearch
+from flights.models import FlightResult, FlightResultPayload, FlightSearch
+from hotels.models import HotelResult, HotelResultPayload, HotelSearch
+from itinerary.models import Itinerary
+from trips.models import Trip
+
+from .db_router import PIN_PRIMARY_COOKIE
+from .gazetteer import canonical_location, get_gazetteer
+from .log import LogPayload, NonBlockingQueueHandler, configure_logging, log_payload, stop_listeners
+from .models import SessionBlob
+from .partitions import add_months, default_partition_name, partition_name
+from .query_plan import plan_problems
+from .sessions import CHUNK_ITEMS, REF_KEY, TOUCH_INTERVAL
+from .sessions.cached_db import SessionStore as CachedSessionStore
+from .sessions.db import SessionStore
+
+
+class GazetteerTests(SimpleTestCase):
+    def setUp(self):
+        self.gazetteer = get_gazetteer()
+
+    def test_country_names_aliases_and_codes(self):
+        self.assertEqual(self.gazetteer.country_code("United Kingdom"), "GB")
+        self.assertEqual(self.gazetteer.country_code("uk"), "GB")
+        self.assertEqual(self.gazetteer.country_code("Côte d'Ivoire"), "CI")
+        self.assertEqual(self.gazetteer.country_code("jp"), "JP")
+        self.assertIsNone(self.gazetteer.country_code("Atlantis"))
+
+    def test_qualifiers_pick_between_same_named_cities(self):
+        self.assertEqual(self.gazetteer.resolve("Paris").country, "FR")
+        self.assertEqual(self.gazetteer.resolve("Paris, TX").country, "US")
+        self.assertEqual(self.gazetteer.resolve("Portland, Maine").admin1, "ME")
+        self.assertEqual(self.gazetteer.resolve("Portland Maine").admin1, "ME")
+        self.assertEqual(self.gazetteer.resolve("Vancouver, CA").admin1, "BC")
+        self.assertEqual(self.gazetteer.resolve("Atlanta, Georgia").country, "US")
+        self.assertEqual(self.gazetteer.resolve("Tbilisi, Georgia").country, "GE")
+        self.assertIsNone(self.gazetteer.resolve("Paris, Germany"))
+
+    def test_aliases_and_accents(self):
+        self.assertEqual(self.gazetteer.resolve("NYC").name, "New York")
+        self.assertEqual(self.gazetteer.resolve("sao paulo").name, "Sao Paulo")
+        self.assertEqual(self.gazetteer.resolve("Saint Louis").name, "St. Louis")
+        self.assertEqual(self.gazetteer.resolve("Bombay").airport, "BOM")
+
+    def test_prefix_lookup_orders_by_population(self):
+        names = [city.name for city in self.gazetteer.prefix("san", limit=3)]
+        self.assertEqual(names, ["Santiago", "San Antonio", "San Diego"])
+        self.assertEqual(self.gazetteer.prefix(""), [])
+
+    def test_canonical_location(self):
+        self.assertEqual(canonical_location("chicago"), "Chicago, IL")
+        self.assertEqual(canonical_location("Lisboa"), "Lisbon, Portugal")
+        self.assertEqual(canonical_location("downtown somewhere"), "downtown somewhere")
+
+
+class HotQueryPlanTests(TestCase):
+    """Per-user history and per-search results must be read through indexes, not scans + sorts."""
+
+    USERS = 40
+    ROWS_PER_USER = 5
+    RESULTS_PER_SEARCH = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        users = User.objects.bulk_create(User(username=f"traveller{n}") for n in range(cls.USERS))
+        cls.user = users[0]
+        per_user = [(user, n) for user in users for n in range(cls.ROWS_PER_USER)]
+
+        Itinerary.objects.bulk_create(
+            Itinerary(user=user, destination=f"City {n}", start_date=date(2025, 1, 1), end_date=date(2025, 1, 3))
+            for user, n in per_user
+        )
+        flights = FlightSearch.objects.bulk_create(
+            FlightSearch(user=user, origin_airport="JFK", destination_airport="LHR", departure_date=date(2025, 1, 1))
+            for user, n in per_user
+        )
+        hotels = HotelSearch.objects.bulk_create(HotelSearch(user=user, location="Paris") for user, n in per_user)
+        cars = CarRentalSearch.objects.bulk_create(CarRentalSearch(user=user, location="Denver") for user, n in per_user)
+        Trip.objects.bulk_create(Trip(user=user, title=f"Trip {n}") for user, n in per_user)
+
+        prices = range(cls.RESULTS_PER_SEARCH)
+        FlightResult.objects.bulk_create(
+            FlightResult(search=search, airline="BA", departure_time="9:00", arrival_time="21:00",
+                         duration="7h", price_cents=50_000 + p)
+            for search in flights for p in prices
+        )
+        HotelResult.objects.bulk_create(
+            HotelResult(search=search, hotel_name=f"Hotel {p}", price_per_night=Decimal(100 + p), price_display="$")
+            for search in hotels for p in prices
+        )
+        CarRentalResult.objects.bulk_create(
+            CarRentalResult(search=search, car_name=f"Car {p}", car_type="SUV", price_per_day=Decimal(40 + p),
+                            price_display="$", rental_company="Hertz", location="Denver")
+            for search in cars for p in prices
+        )
+        cls.flight_search, cls.hotel_search, cls.car_search = flights[0], hotels[0], cars[0]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assertIndexed(self, queryset):
+        problems = plan_problems(queryset)
+        self.assertEqual(problems, [], "\n\n".join(problems))
+
+    def test_user_history_lists_use_user_created_indexes(self):
+        self.assertIndexed(Itinerary.objects.filter(user=self.user).only("id", "destination", "created_at")[:20])
+        self.assertIndexed(FlightSearch.objects.filter(user=self.user))
+        self.assertIndexed(HotelSearch.objects.filter(user=self.user))
+        self.assertIndexed(CarRentalSearch.objects.filter(user=self.user))
+        self.assertIndexed(
+            Trip.objects.filter(user=self.user).select_related("itinerary", "flight_search", "car_rental_search")
+        )
+
+    def test_cursor_pages_use_user_created_index(self):
+        newest = Itinerary.objects.filter(user=self.user).first()
+        self.assertIndexed(Itinerary.objects.filter(user=self.user, created_at__lt=newest.created_at)[:20])
+
+    def test_search_results_use_search_price_indexes(self):
+        self.assertIndexed(self.flight_search.results.all())
+        self.assertIndexed(self.hotel_search.results.all())
+        self.assertIndexed(self.car_search.results.all())
+        self.assertIndexed(self.flight_search.fetched_results())
+        self.assertIndexed(self.hotel_search.fetched_results())
+        self.assertIndexed(self.car_search.fetched_results())
+
+    def test_unindexed_query_is_reported(self):
+        self.assertNotEqual(plan_problems(Itinerary.objects.order_by("destination")), [])
+
+
+class PurgeSearchHistoryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="archivist")
+
+    def _flight_search(self, age_days):
+        search = FlightSearch.objects.create(
+            user=self.user, origin_airport="JFK", destination_airport="LHR", departure_date=date(2025, 1, 1)
+        )
+        FlightSearch.objects.filter(pk=search.pk).update(created_at=timezone.now() - timedelta(days=age_days))
+        results = FlightResult.objects.bulk_create(
+            FlightResult(search=search, airline="BA", departure_time="9:00", arrival_time="21:00",
+                         duration="7h", price_cents=50_000 + n)
+            for n in range(3)
+        )
+        FlightResultPayload.objects.bulk_create(FlightResultPayload(result=r, data={"n": r.pk}) for r in results)
+        return search
+
+    def _hotel_search(self, age_days):
+        search = HotelSearch.objects.create(user=self.user, location="Paris")
+        HotelSearch.objects.filter(pk=search.pk).update(created_at=timezone.now() - timedelta(days=age_days))
+        result = HotelResult.objects.create(
+            search=search, hotel_name="Opera", price_per_night=Decimal(120), price_display="$120"
+        )
+        HotelResultPayload.objects.create(result=result, data={"name": "Opera"})
+        return search
+
+    def _purge(self, *args):
+        out = StringIO()
+        call_command("purge_search_history", "--days=30", "--batch-size=2", *args, stdout=out)
+        return out.getvalue()
+
+    def test_old_searches_are_deleted_in_batches(self):
+        old = [self._flight_search(age_days=60) for _ in range(3)]
+        recent = self._flight_search(age_days=5)
+        old_hotel, recent_hotel = self._hotel_search(age_days=60), self._hotel_search(age_days=5)
+
+        output = self._purge()
+
+        self.assertFalse(FlightSearch.objects.filter(pk__in=[s.pk for s in old]).exists())
+        self.assertEqual(list(FlightSearch.objects.all()), [recent])
+        self.assertEqual(FlightResult.objects.count(), 3)
+        self.assertEqual(FlightResultPayload.objects.count(), 3)
+        self.assertEqual(list(HotelSearch.objects.all()), [recent_hotel])
+        self.assertFalse(HotelResult.objects.filter(search_id=old_hotel.pk).exists())
+        self.assertIn("Deleted 3 flights.FlightSearch rows", output)
+        self.assertIn("Deleted 9 flights.FlightResult rows", output)
+        self.assertIn("Deleted 1 hotels.HotelResultPayload rows", output)
+        self.assertIn("Deleted 24 rows older than 30 days.", output)
+
+    def test_searches_on_a_trip_keep_results_but_drop_payloads(self):
+        search = self._flight_search(age_days=60)
+        Trip.objects.create(user=self.user, title="London", flight_search=search)
+
+        output = self._purge()
+
+        self.assertEqual(search.results.count(), 3)
+        self.assertFalse(FlightResultPayload.objects.exists())
+        self.assertIn("Deleted 3 flights.FlightResultPayload rows", output)
+
+    def test_dry_run_reports_without_deleting(self):
+        self._flight_search(age_days=60)
+
+        output = self._purge("--dry-run")
+
+        self.assertEqual(FlightResult.objects.count(), 3)
+        self.assertIn("Would delete 1 flights.FlightSearch rows", output)
+        self.assertIn("Would delete 7 rows older than 30 days.", output)
+
+
+class ConnectionBenchmarkTests(SimpleTestCase):
+    def test_requires_postgres(self):
+        with self.assertRaisesMessage(CommandError, "PostgreSQL"):
+            call_command("db_connection_benchmark", "--requests=1")
+
+
+@override_settings(READ_REPLICA_DATABASE="replica")
+class ReplicaRoutingTests(TestCase):
+    """The "replica" test database is separate, so rows show which database served a read."""
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username="reader", password="StrongPass123!")
+        User.objects.using("replica").create(pk=self.user.pk, username="reader")
+        for db, destination in (("default", "Primary City"), ("replica", "Replica City")):
+            Itinerary.objects.using(db).create(
+                user_id=self.user.pk, destination=destination, start_date=date(2025, 1, 1), end_date=date(2025, 1, 3)
+            )
+            Trip.objects.using(db).create(user_id=self.user.pk, title=destination)
+        self.client.login(username="reader", password="StrongPass123!")
+
+    def _destinations(self):
+        return [item["destination"] for item in self.client.get("/api/v1/itineraries/").json()["results"]]
+
+    def test_list_endpoints_read_from_replica(self):
+        self.assertEqual(self._destinations(), ["Replica City"])
+        self.assertEqual([trip["title"] for trip in self.client.get("/api/v1/trips/").json()], ["Replica City"])
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        response = self.client.post("/api/v1/trips/", {"title": "New trip"}, content_type="application/json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_PRIMARY_COOKIE, response.cookies)
+        self.assertEqual(self._destinations(), ["Primary City"])
+        self.assertIn("New trip", [trip["title"] for trip in self.client.get("/api/v1/trips/").json()])
+
+    def test_sticky_window_expires(self):
+        self.client.post("/api/v1/trips/", {"title": "New trip"}, content_type="application/json")
+        del self.client.cookies[PIN_PRIMARY_COOKIE]
+
+        self.assertEqual(self._destinations(), ["Replica City"])
+
+    @override_settings(READ_REPLICA_DATABASE=None)
+    def test_reads_use_primary_without_replica(self):
+        self.assertEqual(self._destinations(), ["Primary City"])
+
+
+class ResultPartitionTests(TestCase):
+    def test_fetched_results_cover_results_written_after_the_search(self):
+        search = HotelSearch.objects.create(location="Paris")
+        HotelResult.objects.create(search=search, hotel_name="Opera", price_per_night=Decimal(120), price_display="$")
+        stale = HotelResult.objects.create(
+            search=search, hotel_name="Stale", price_per_night=Decimal(80), price_display="$"
+        )
+        HotelResult.objects.filter(pk=stale.pk).update(fetched_at=search.created_at - timedelta(days=40))
+
+        self.assertEqual([r.hotel_name for r in search.fetched_results()], ["Opera"])
+
+    def test_month_arithmetic_and_names(self):
+        self.assertEqual(add_months(date(2026, 11, 1), 3), date(2027, 2, 1))
+        self.assertEqual(add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+        self.assertEqual(partition_name("core_flightresult", date(2026, 3, 1)), "core_flightresult_p2026_03")
+        self.assertEqual(default_partition_name("core_flightresult"), "core_flightresult_default")
+
+    def test_command_skips_unpartitioned_tables(self):
+        out = StringIO()
+        call_command("manage_result_partitions", "--retain-months=6", stdout=out)
+        self.assertIn("core_flightresult is not partitioned; skipping.", out.getvalue())
+
+
+class SessionStoreTests(TestCase):
+    """Large values live in blobs; session rows and writes stay small as histories grow."""
+
+    def setUp(self):
+        cache.clear()
+
+    def _turns(self, count):
+        return [{"role": "user", "content": f"turn {n} " + "x" * 200} for n in range(count)]
+
+    def _row_size(self, session_key):
+        return len(Session.objects.get(session_key=session_key).session_data)
+
+    def test_large_values_are_stored_by_reference(self):
+        store = SessionStore()
+        store["flight_chat_history"] = self._turns(40)
+        store["pending_itinerary"] = {"destination": "Lisbon", "generated_plan": "## Day 1\n" + "y" * 5000}
+        store.save()
+
+        raw = SessionStore().decode(Session.objects.get(session_key=store.session_key).session_data)
+        self.assertIn(REF_KEY, raw["flight_chat_history"])
+        self.assertEqual(raw["pending_itinerary"]["destination"], "Lisbon")
+        self.assertIn(REF_KEY, raw["pending_itinerary"]["generated_plan"])
+        self.assertEqual(SessionBlob.objects.count(), 40 // CHUNK_ITEMS + 1 + 1)
+
+        cache.clear()
+        loaded = SessionStore(store.session_key)
+        self.assertEqual(loaded["flight_chat_history"], self._turns(40))
+        self.assertTrue(loaded["pending_itinerary"]["generated_plan"].startswith("## Day 1"))
+
+    def test_appending_writes_one_chunk_and_row_size_stays_flat(self):
+        store = SessionStore()
+        store["flight_chat_history"] = self._turns(CHUNK_ITEMS * 2)
+        store.save()
+        size = self._row_size(store.session_key)
+        blobs = SessionBlob.objects.count()
+
+        for turns in range(CHUNK_ITEMS * 2 + 1, CHUNK_ITEMS * 6):
+            store = SessionStore(store.session_key)
+            store["flight_chat_history"] = store["flight_chat_history"] + self._turns(turns)[-1:]
+            store.save()
+
+        self.assertLessEqual(SessionBlob.objects.count(), blobs + CHUNK_ITEMS * 4 - 1)  # one chunk per append
+        self.assertLess(self._row_size(store.session_key), size * 3)
+        self.assertEqual(SessionStore(store.session_key)["flight_chat_history"], self._turns(CHUNK_ITEMS * 6 - 1))
+
+    def test_unchanged_session_is_not_written(self):
+        store = SessionStore()
+        store["flight_chat_history"] = self._turns(40)
+        store.save()
+
+        store = SessionStore(store.session_key)
+        store["flight_chat_history"] = list(store["flight_chat_history"])
+        self.assertTrue(store.modified)
+        with CaptureQueriesContext(connection) as queries:
+            store.save()
+
+        self.assertEqual(queries.captured_queries, [])
+
+    def test_small_keys_do_not_load_blobs(self):
+        store = SessionStore()
+        store["flight_chat_history"] = self._turns(40)
+        store["_auth_user_id"] = "1"
+        store.save()
+        cache.clear()
+
+        store = SessionStore(store.session_key)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(store["_auth_user_id"], "1")
+
+        self.assertEqual(len(queries.captured_queries), 1)  # the session row only
+
+    def test_cached_store_writes_through_and_reads_from_cache(self):
+        store = CachedSessionStore()
+        store["flight_chat_history"] = self._turns(40)
+        store.save()
+        self.assertTrue(Session.objects.filter(session_key=store.session_key).exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            history = CachedSessionStore(store.session_key)["flight_chat_history"]
+
+        self.assertEqual(history, self._turns(40))
+        self.assertEqual(queries.captured_queries, [])
+
+    def test_clear_expired_removes_unreferenced_blobs(self):
+        store = SessionStore()
+        store["flight_chat_history"] = self._turns(40)
+        store.save()
+        SessionBlob.objects.update(touched_at=timezone.now() - timedelta(days=30) - TOUCH_INTERVAL)
+
+        SessionStore.clear_expired()
+
+        self.assertFalse(SessionBlob.objects.exists())
+
+    @patch("flights.api_views.run_workflow_sync")
+    def test_flight_chat_session_row_stays_small(self, mock_workflow):
+        def reply(query, history):
+            answer = f"Answer to {query}: " + "z" * 400
+            return answer, history + [{"role": "user", "content": query}, {"role": "assistant", "content": answer}]
+
+        mock_workflow.side_effect = reply
+        sizes = []
+        for turn in range(30):
+            self.client.post("/api/v1/flights/chat/", {"query": f"question {turn}"}, content_type="application/json")
+            sizes.append(self._row_size(self.client.session.session_key))
+
+        self.assertLess(sizes[-1], sizes[5] * 2)
+        self.assertEqual(len(self.client.get("/api/v1/flights/chat/").json()["display_history"]), 60)
+
+
+class RecordingHandler(logging.Handler):
+    """Collects formatted messages with the name of the thread that handled them."""
+
+    records: list[tuple[str, str]] = []
+
+    def emit(self, record):
+        self.records.append((threading.current_thread().name, self.format(record)))
+
+
+class LoggingPipelineTests(SimpleTestCase):
+    LOGGER_NAME = "core.tests.pipeline"
+
+    def setUp(self):
+        RecordingHandler.records = []
+        configure_logging({
+            "version": 1,
+            "disable_existing_loggers": False,
+            "handlers": {"recording": {"()": "core.tests.RecordingHandler"}},
+            "loggers": {self.LOGGER_NAME: {"handlers": ["recording"], "level": "INFO", "propagate": False}},
+        })
+        self.logger = logging.getLogger(self.LOGGER_NAME)
+
+    def tearDown(self):
+        configure_logging(settings.LOGGING)
+
+    def test_records_are_written_by_the_listener_thread(self):
+        items = ["first"]
+        self.logger.info("Items %s for %s", items, "Lisbon")
+        items.append("later")
+        self.logger.info("Payload %s", LogPayload({"events": [1, 2]}))
+        stop_listeners()
+
+        threads = {thread for thread, _ in RecordingHandler.records}
+        self.assertNotIn(threading.current_thread().name, threads)
+        self.assertEqual(
+            [message for _, message in RecordingHandler.records],
+            ["Items ['first'] for Lisbon", 'Payload {"events": [1, 2]}'],
+        )
+
+    def test_disabled_level_skips_serialization(self):
+        with patch("core.log.json.dumps") as dumps:
+            self.assertFalse(log_payload(self.logger))
+            self.logger.debug("OpenAI response: %s", LogPayload({"output": "..."}))
+            stop_listeners()
+
+        dumps.assert_not_called()
+        self.assertEqual(RecordingHandler.records, [])
+
+    def test_payloads_are_sampled_and_capped(self):
+        with override_settings(LOG_PAYLOAD_SAMPLE_RATE=0.0):
+            self.assertFalse(log_payload(self.logger, logging.INFO))
+        with override_settings(LOG_PAYLOAD_SAMPLE_RATE=1.0):
+            self.assertTrue(log_payload(self.logger, logging.INFO))
+
+        text = str(LogPayload({"plan": "x" * 100}, max_chars=20))
+        self.assertEqual(text, '{"plan": "xxxxxxxxxx... [92 more chars]')
+
+    def test_full_queue_drops_records_instead_of_blocking(self):
+        handler = NonBlockingQueueHandler(queue.Queue(1))
+        record = logging.LogRecord(self.LOGGER_NAME, logging.INFO, __file__, 1, "message", None, None)
+
+        handler.emit(record)
+        handler.emit(record)
+
+        self.assertEqual(handler.dropped, 1)
@@ -15,3 +15,4 @@ class FlightResultAdmin(admin.ModelAdmin):
     list_display = ("airline", "flight_number", "departure_time", "arrival_time", "price_cents", "search")
     list_filter = ("airline", "stops")
     search_fields = ("airline", "flight_number")
+    readonly_fields = ("raw_data",)
@@ -6,6 +6,9 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from core.conditional import revalidate, version_etag
+from core.db_router import read_from_replica
+
 from .models import FlightSearch, FlightResult
 from .nl_search import FlightSearchError, run_workflow_sync
 
@@ -62,15 +65,25 @@ def flight_chat(request):
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def _search_validators(request, pk: int):
+    # Saved searches and their results are never edited, so creation time identifies the response.
+    created_at = FlightSearch.objects.filter(pk=pk, user=request.user).values_list("created_at", flat=True).first()
+    if created_at is None:
+        return None
+    return version_etag("flights", pk, created_at.isoformat()), created_at
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@read_from_replica
+@revalidate(_search_validators)
 def flight_detail(request, pk: int):
     try:
         search_obj = FlightSearch.objects.get(pk=pk, user=request.user)
     except FlightSearch.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
-    results = list(search_obj.results.values(
+    results = list(search_obj.fetched_results().values(
         "id", "airline", "flight_number", "departure_time", "arrival_time",
         "duration", "stops", "price_cents", "currency", "booking_url",
     ))
@@ -7,6 +7,8 @@ from typing import Any
 
 from django.conf import settings
 
+from core.gazetteer import get_gazetteer
+
 from .ranking import FlightQuery
 
 try:
@@ -100,11 +102,22 @@ def _parse_json(text: str) -> dict | None:
     return None
 
 
+def _airport_code(value: Any) -> str:
+    """Return an IATA code, resolving city names the model left unconverted via the gazetteer."""
+    text = str(value or "").strip()
+    if len(text) == 3 and text.isalpha():
+        return text.upper()
+    city = get_gazetteer().resolve(text)
+    if city and city.airport:
+        return city.airport
+    return text.upper()
+
+
 def _build_query(data: dict) -> FlightQuery | None:
     try:
         return FlightQuery(
-            origin=str(data.get("origin") or "").strip().upper(),
-            destination=str(data.get("destination") or "").strip().upper(),
+            origin=_airport_code(data.get("origin")),
+            destination=_airport_code(data.get("destination")),
             departure_date=str(data.get("departure_date") or "").strip(),
             return_date=data.get("return_date") or None,
             passengers=int(data.get("passengers") or 1),
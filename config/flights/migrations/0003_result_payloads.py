@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def copy_raw_data_to_payloads(apps, schema_editor):
+    db = schema_editor.connection.alias
+    FlightResult = apps.get_model("flights", "FlightResult")
+    FlightResultPayload = apps.get_model("flights", "FlightResultPayload")
+    rows = FlightResult.objects.using(db).exclude(raw_data={}).values_list("pk", "raw_data")
+    batch = []
+    for pk, data in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(FlightResultPayload(result_id=pk, data=data))
+        if len(batch) >= BATCH_SIZE:
+            FlightResultPayload.objects.using(db).bulk_create(batch)
+            batch = []
+    FlightResultPayload.objects.using(db).bulk_create(batch)
+
+
+def copy_payloads_to_raw_data(apps, schema_editor):
+    db = schema_editor.connection.alias
+    FlightResult = apps.get_model("flights", "FlightResult")
+    FlightResultPayload = apps.get_model("flights", "FlightResultPayload")
+    for payload in FlightResultPayload.objects.using(db).iterator(chunk_size=BATCH_SIZE):
+        FlightResult.objects.using(db).filter(pk=payload.result_id).update(raw_data=payload.data)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0002_user_created_and_price_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightResultPayload',
+            fields=[
+                ('result', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='payload', serialize=False, to='flights.flightresult')),
+                ('data', models.JSONField(default=dict)),
+            ],
+        ),
+        migrations.RunPython(copy_raw_data_to_payloads, copy_payloads_to_raw_data),
+        migrations.RemoveField(
+            model_name='flightresult',
+            name='raw_data',
+        ),
+    ]
@@ -1,8 +1,10 @@
 from django.conf import settings
 from django.db import models
 
+from core.partitions import SearchResultsMixin
 
-class FlightSearch(models.Model):
+
+class FlightSearch(SearchResultsMixin, models.Model):
     """Stores a user's flight search query and parsed parameters."""
 
     user = models.ForeignKey(
@@ -24,6 +26,7 @@ class FlightSearch(models.Model):
     class Meta:
         ordering = ["-created_at"]
         db_table = "core_flightsearch"
+        indexes = [models.Index(fields=["user", "-created_at"], name="flightsearch_user_created_idx")]
 
     def __str__(self) -> str:
         route = f"{self.origin_airport} → {self.destination_airport}"
@@ -47,12 +50,12 @@ class FlightResult(models.Model):
     price_cents = models.PositiveIntegerField()
     currency = models.CharField(max_length=3, default="USD")
     booking_url = models.URLField(blank=True)
-    raw_data = models.JSONField(default=dict)
     fetched_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["price_cents"]
         db_table = "core_flightresult"
+        indexes = [models.Index(fields=["search", "price_cents"], name="flightresult_search_price_idx")]
 
     def __str__(self) -> str:
         return f"{self.airline} ${self.price_cents / 100:.0f}"
@@ -60,3 +63,28 @@ class FlightResult(models.Model):
     @property
     def price_display(self) -> str:
         return f"${self.price_cents / 100:,.0f}"
+
+    @property
+    def raw_data(self) -> dict:
+        """Full extracted flight option; loaded on demand from :class:`FlightResultPayload`."""
+        try:
+            return self.payload.data
+        except FlightResultPayload.DoesNotExist:
+            return {}
+
+
+class FlightResultPayload(models.Model):
+    """Raw flight option payload, kept out of the narrow, frequently scanned result table."""
+
+    result = models.OneToOneField(
+        FlightResult,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        # No database FK: the result table is partitioned on PostgreSQL.
+        db_constraint=False,
+        related_name="payload",
+    )
+    data = models.JSONField(default=dict)
+
+    def __str__(self) -> str:
+        return f"Payload for {self.result_id}"
@@ -10,6 +10,8 @@ from agents import Agent, ModelSettings, RunConfig, Runner, TResponseInputItem,
 from pydantic import BaseModel
 from datetime import date
 
+from core.log import LogPayload
+
 LOGGER = logging.getLogger(__name__)
 
 _CABIN_MAP = {
@@ -78,7 +80,8 @@ def search_google_flights(
     if sort_by:
         params["sort_by"] = str(_SORT_MAP.get(sort_by.lower(), 1))
 
-    LOGGER.info("SerpAPI call params: %s", params)
+    # A copy: the SerpAPI client adds the api key to ``params`` before this is formatted.
+    LOGGER.info("SerpAPI call params: %s", LogPayload(dict(params)))
     try:
         client = serpapi.Client(api_key=api_key)
         results = client.search(params)
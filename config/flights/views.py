@@ -78,7 +78,7 @@ def results(request):
 def detail(request, pk: int):
     """Display saved flight search results for authenticated users."""
     search_obj = get_object_or_404(FlightSearch, pk=pk, user=request.user)
-    db_results = search_obj.results.all()
+    db_results = search_obj.fetched_results()
 
     return render(request, "flights/nl_results.html", {
         "search": search_obj,
@@ -22,3 +22,4 @@ class HotelResultAdmin(admin.ModelAdmin):
     list_display = ("hotel_name", "hotel_type", "star_rating", "price_display", "location", "source")
     list_filter = ("star_rating", "hotel_type")
     search_fields = ("hotel_name", "location")
+    readonly_fields = ("raw_data",)
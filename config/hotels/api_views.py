@@ -6,7 +6,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from .models import HotelResult, HotelSearch
+from core.conditional import revalidate, version_etag
+from core.db_router import read_from_replica
+
+from .models import HotelResult, HotelResultPayload, HotelSearch
 from .serializers import HotelListingSerializer, HotelQuerySerializer
 from .services import HotelSearchError, search_hotels_natural
 
@@ -62,8 +65,8 @@ def hotel_search(request):
             star_rating=params.star_rating,
             hotel_type=params.hotel_type,
         )
-        for listing in listings:
-            HotelResult.objects.create(
+        results = HotelResult.objects.bulk_create(
+            HotelResult(
                 search=search_obj,
                 hotel_name=listing.hotel_name,
                 hotel_type=listing.hotel_type,
@@ -76,8 +79,13 @@ def hotel_search(request):
                 check_out=listing.check_out,
                 listing_url=listing.listing_url,
                 source=listing.source,
-                raw_data=listing.raw_data,
             )
+            for listing in listings
+        )
+        HotelResultPayload.objects.bulk_create(
+            HotelResultPayload(result=result, data=listing.raw_data)
+            for result, listing in zip(results, listings)
+        )
         search_id = search_obj.pk
 
     return Response({
@@ -96,15 +104,24 @@ def hotel_search(request):
     })
 
 
+def _search_validators(request, pk: int):
+    created_at = HotelSearch.objects.filter(pk=pk, user=request.user).values_list("created_at", flat=True).first()
+    if created_at is None:
+        return None
+    return version_etag("hotels", pk, created_at.isoformat()), created_at
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@read_from_replica
+@revalidate(_search_validators)
 def hotel_detail(request, pk: int):
     try:
         search_obj = HotelSearch.objects.get(pk=pk, user=request.user)
     except HotelSearch.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
-    results = list(search_obj.results.values(
+    results = list(search_obj.fetched_results().values(
         "id", "hotel_name", "hotel_type", "star_rating", "price_per_night",
         "price_display", "location", "amenities", "check_in", "check_out",
         "listing_url", "source",
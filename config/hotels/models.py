@@ -1,8 +1,10 @@
 from django.conf import settings
 from django.db import models
 
+from core.partitions import SearchResultsMixin
 
-class HotelSearch(models.Model):
+
+class HotelSearch(SearchResultsMixin, models.Model):
     """Stores a user's hotel search query and parsed parameters."""
 
     user = models.ForeignKey(
@@ -26,6 +28,7 @@ class HotelSearch(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["user", "-created_at"], name="hotelsearch_user_created_idx")]
 
     def __str__(self) -> str:
         return f"Hotel: {self.location} ({self.created_at:%Y-%m-%d})"
@@ -50,11 +53,36 @@ class HotelResult(models.Model):
     check_out = models.CharField(max_length=50, blank=True)
     listing_url = models.URLField(max_length=500, blank=True)
     source = models.CharField(max_length=100, blank=True)
-    raw_data = models.JSONField(default=dict)
     fetched_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["price_per_night"]
+        indexes = [models.Index(fields=["search", "price_per_night"], name="hotelresult_search_price_idx")]
 
     def __str__(self) -> str:
         return f"{self.hotel_name} - {self.price_display}"
+
+    @property
+    def raw_data(self) -> dict:
+        """Full extracted hotel listing; loaded on demand from :class:`HotelResultPayload`."""
+        try:
+            return self.payload.data
+        except HotelResultPayload.DoesNotExist:
+            return {}
+
+
+class HotelResultPayload(models.Model):
+    """Raw hotel listing payload, kept out of the narrow, frequently scanned result table."""
+
+    result = models.OneToOneField(
+        HotelResult,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        # No database FK: the result table is partitioned on PostgreSQL.
+        db_constraint=False,
+        related_name="payload",
+    )
+    data = models.JSONField(default=dict)
+
+    def __str__(self) -> str:
+        return f"Payload for {self.result_id}"
@@ -3,28 +3,33 @@ from __future__ import annotations
 import json
 import logging
 import re
-import time
 from dataclasses import dataclass, field
 from datetime import date
-from urllib.parse import urlparse
 
-import requests
-from bs4 import BeautifulSoup
 from django.conf import settings
-from django.core.exceptions import ImproperlyConfigured
 
-LOGGER = logging.getLogger(__name__)
+from core.gazetteer import canonical_location
+from core.listing_search import (
+    GENERIC_NAME_TOKENS,
+    PIPELINE_QUERY_VARIANTS,
+    TARGET_LISTINGS,
+    ListingSearchError,
+    ListingVertical,
+    extract_json_object,
+    get_openai_client,
+    search_listings,
+)
 
-MAX_AGENT_ITERATIONS = 10
-TARGET_LISTINGS = 20
-SCRAPE_MAX_CHARS = 15_000
-SCRAPE_TIMEOUT = 10
-SEARCH_PAUSE = 1.5
+LOGGER = logging.getLogger(__name__)
 
-USER_AGENT = (
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-    "AppleWebKit/537.36 (KHTML, like Gecko) "
-    "Chrome/120.0.0.0 Safari/537.36"
+PREFERRED_DOMAINS = (
+    "booking.com",
+    "hotels.com",
+    "expedia.com",
+    "kayak.com",
+    "trivago.com",
+    "agoda.com",
+    "tripadvisor.com",
 )
 
 
@@ -59,249 +64,119 @@ class HotelListing:
     raw_data: dict = field(default_factory=dict)
 
 
-class HotelSearchError(Exception):
+class HotelSearchError(ListingSearchError):
     """Raised when hotel search fails."""
 
 
 # ---------------------------------------------------------------------------
-# Helpers
+# Listing search vertical
 # ---------------------------------------------------------------------------
 
-def _get_openai_client():
-    api_key = getattr(settings, "OPENAI_API_KEY", None)
-    if not api_key:
-        raise ImproperlyConfigured("OPENAI_API_KEY is not configured.")
-    try:
-        from openai import OpenAI
-    except ImportError as exc:
-        raise HotelSearchError(
-            "OpenAI SDK is not installed. Add 'openai' to your dependencies."
-        ) from exc
-    return OpenAI(api_key=api_key)
-
-
-def _extract_json_object(text: str) -> dict:
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        match = re.search(r"\{[\s\S]*\}", text)
-        if not match:
-            raise ValueError("No JSON object found in response.")
-        return json.loads(match.group(0))
-
-
-def _extract_json_array(text: str) -> list:
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        match = re.search(r"\[[\s\S]*\]", text)
-        if not match:
-            raise ValueError("No JSON array found in response.")
-        return json.loads(match.group(0))
-
-
-# ---------------------------------------------------------------------------
-# Tool definitions for OpenAI function calling
-# ---------------------------------------------------------------------------
-
-TOOLS = [
-    {
-        "type": "function",
-        "function": {
-            "name": "search_google",
-            "description": (
-                "Search Google for hotel listings. Returns a list of top result "
-                "URLs and snippets. Use specific queries including location, dates, "
-                "star rating, and budget to find relevant hotel pages."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The Google search query string",
-                    }
-                },
-                "required": ["query"],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "scrape_page",
-            "description": (
-                "Fetch a web page and return its cleaned text content. Use this to "
-                "read the content of hotel listing pages found via search."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": "The URL to fetch and parse",
-                    }
-                },
-                "required": ["url"],
-            },
-        },
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "extract_hotel_listings",
-            "description": (
-                "Extract structured hotel listing data from raw page text. "
-                "Returns a JSON array of hotel objects with price, name, amenities, "
-                "and links. Use this after scraping a page to get structured data."
-            ),
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "raw_text": {
-                        "type": "string",
-                        "description": "The raw text content from a scraped page",
-                    },
-                    "source_url": {
-                        "type": "string",
-                        "description": "The URL the text was scraped from",
-                    },
-                },
-                "required": ["raw_text", "source_url"],
-            },
-        },
-    },
-]
-
-
-# ---------------------------------------------------------------------------
-# Tool implementations
-# ---------------------------------------------------------------------------
-
-def _tool_search_google(query: str) -> list[dict]:
-    try:
-        from googlesearch import search as gsearch
-    except ImportError as exc:
-        raise HotelSearchError("googlesearch-python is not installed.") from exc
-
-    LOGGER.info("Google search: %s", query)
-    results = []
-    try:
-        for url in gsearch(query, num_results=10):
-            results.append({"url": url, "title": "", "snippet": ""})
-            time.sleep(0.2)
-    except Exception as exc:
-        LOGGER.warning("Google search error: %s", exc)
-        return [{"error": f"Search failed: {exc}"}]
-
-    time.sleep(SEARCH_PAUSE)
-    return results
-
-
-def _tool_scrape_page(url: str) -> str:
-    LOGGER.info("Scraping: %s", url)
-    try:
-        resp = requests.get(
-            url,
-            timeout=SCRAPE_TIMEOUT,
-            headers={"User-Agent": USER_AGENT},
-        )
-        resp.raise_for_status()
-    except requests.RequestException as exc:
-        LOGGER.warning("Scrape failed for %s: %s", url, exc)
-        return f"Error fetching page: {exc}"
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-    for tag in soup(["script", "style", "nav", "footer", "header", "noscript"]):
-        tag.decompose()
-
-    text = soup.get_text(separator="\n", strip=True)
-    return text[:SCRAPE_MAX_CHARS]
+AGENT_PROMPT = (
+    "You are a hotel search agent. Your goal is to find exactly 20 hotel "
+    "listings matching the user's criteria.\n\n"
+    "Strategy:\n"
+    "1. Use search_google to find hotel listings (try sites like Booking.com, "
+    "Hotels.com, Expedia, Kayak, Trivago, Agoda, TripAdvisor, etc.)\n"
+    "2. Use scrape_page to fetch promising result pages\n"
+    "3. Use extract_hotel_listings to pull structured data from the scraped content\n"
+    "4. Keep searching and scraping until you have accumulated 20 listings\n"
+    "5. If a page fails to scrape or yields no results, try the next one\n"
+    "6. Vary your search queries to cover different hotel types, areas, and price ranges\n\n"
+    "Important: Call tools one step at a time. Search first, then scrape results, "
+    "then extract listings. Repeat until you have enough listings."
+)
 
+EXTRACTION_FIELDS = (
+    '- "hotel_name": string (e.g. "The Grand Hotel")\n'
+    '- "hotel_type": string (e.g. "Hotel", "Resort", "Boutique", "Hostel", "Motel")\n'
+    '- "star_rating": integer (1-5) or null if not available\n'
+    '- "price_per_night": number (USD, e.g. 150.0)\n'
+    '- "price_display": string (e.g. "$150/night")\n'
+    '- "location": string (address or neighborhood)\n'
+    '- "amenities": string (comma-separated list, e.g. "WiFi, Pool, Gym, Breakfast")\n'
+    '- "check_in": string (check-in time or date, e.g. "3:00 PM" or "2024-03-28")\n'
+    '- "check_out": string (check-out time or date)\n'
+)
 
-def _tool_extract_hotel_listings(
-    raw_text: str, source_url: str, client, model: str
-) -> list[dict]:
-    domain = urlparse(source_url).netloc
 
-    system_prompt = (
-        "You are a data extraction assistant. Extract hotel listing information "
-        "from the provided text. Return ONLY a JSON array of objects. Each object must have:\n"
-        '- "hotel_name": string (e.g. "The Grand Hotel")\n'
-        '- "hotel_type": string (e.g. "Hotel", "Resort", "Boutique", "Hostel", "Motel")\n'
-        '- "star_rating": integer (1-5) or null if not available\n'
-        '- "price_per_night": number (USD, e.g. 150.0)\n'
-        '- "price_display": string (e.g. "$150/night")\n'
-        '- "location": string (address or neighborhood)\n'
-        '- "amenities": string (comma-separated list, e.g. "WiFi, Pool, Gym, Breakfast")\n'
-        '- "check_in": string (check-in time or date, e.g. "3:00 PM" or "2024-03-28")\n'
-        '- "check_out": string (check-out time or date)\n'
-        '- "listing_url": string (direct link if found in text, otherwise "")\n'
-        f'- "source": "{domain}"\n\n'
-        "If you cannot extract valid listings from the text, return an empty array [].\n"
-        "Return ONLY the JSON array, no other text."
-    )
+def _listing_defaults(item: dict) -> dict:
+    return {
+        "hotel_type": "",
+        "star_rating": None,
+        "location": "",
+        "amenities": "",
+        "check_in": "",
+        "check_out": "",
+        "price_display": f"${item['price_per_night']}/night",
+    }
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            max_tokens=4096,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": raw_text[:SCRAPE_MAX_CHARS]},
-            ],
-        )
-    except Exception as exc:
-        LOGGER.warning("Extract hotel listings failed: %s", exc)
-        return []
 
-    result_text = response.choices[0].message.content or ""
+NAME_STOPWORDS = GENERIC_NAME_TOKENS | {"hotel", "hotels"}
 
-    try:
-        listings = _extract_json_array(result_text)
-    except (ValueError, json.JSONDecodeError):
-        LOGGER.warning("Could not parse extracted hotel listings JSON")
-        return []
-
-    valid = []
-    for item in listings:
-        if not isinstance(item, dict):
-            continue
-        if item.get("hotel_name") and item.get("price_per_night"):
-            item.setdefault("source", domain)
-            item.setdefault("listing_url", source_url)
-            item.setdefault("hotel_type", "")
-            item.setdefault("star_rating", None)
-            item.setdefault("location", "")
-            item.setdefault("amenities", "")
-            item.setdefault("check_in", "")
-            item.setdefault("check_out", "")
-            item.setdefault("price_display", f"${item['price_per_night']}/night")
-            valid.append(item)
-
-    return valid
 
+def _listing_city(item: dict) -> str:
+    """City part of a "street, city, country" address; "" when it can't be told apart."""
+    segments = []
+    for part in (item.get("location") or "").split(","):
+        part = re.sub(r"\S*\d\S*", "", part).strip()  # drop house numbers and postcodes
+        if part:
+            segments.append(part)
+    return segments[-2] if len(segments) >= 3 else ""
 
-# ---------------------------------------------------------------------------
-# Dispatch tool calls
-# ---------------------------------------------------------------------------
 
-def _dispatch_tool(name: str, input_data: dict, client, model: str):
-    if name == "search_google":
-        results = _tool_search_google(input_data["query"])
-        return json.dumps(results)
-    elif name == "scrape_page":
-        return _tool_scrape_page(input_data["url"])
-    elif name == "extract_hotel_listings":
-        listings = _tool_extract_hotel_listings(
-            input_data["raw_text"],
-            input_data["source_url"],
-            client,
-            model,
-        )
-        return json.dumps(listings)
-    else:
-        return json.dumps({"error": f"Unknown tool: {name}"})
+def _build_user_message(params: HotelSearchParams) -> str:
+    parts = [f"Find hotels in {params.location}."]
+    if params.check_in_date:
+        parts.append(f"Check-in: {params.check_in_date}.")
+    if params.check_out_date:
+        parts.append(f"Check-out: {params.check_out_date}.")
+    if params.guests:
+        parts.append(f"Guests: {params.guests}.")
+    if params.max_price_per_night:
+        parts.append(f"Budget: under ${params.max_price_per_night}/night.")
+    if params.star_rating:
+        parts.append(f"Minimum star rating: {params.star_rating} stars.")
+    if params.hotel_type:
+        parts.append(f"Hotel type: {params.hotel_type}.")
+    parts.append(f"Find {TARGET_LISTINGS} hotel listings with prices and details.")
+    return " ".join(parts)
+
+
+def _build_search_queries(params: HotelSearchParams) -> list[str]:
+    """Derive a handful of distinct Google queries from the search params."""
+    dates = " ".join(d for d in (params.check_in_date, params.check_out_date) if d)
+    kind = params.hotel_type or "hotels"
+    stars = f"{params.star_rating} star " if params.star_rating else ""
+    budget = f" under ${params.max_price_per_night:g} per night" if params.max_price_per_night else ""
+
+    variants = [
+        f"{stars}{kind} in {params.location} {dates}{budget}".strip(),
+        f"{params.location} {kind} prices booking.com {dates}".strip(),
+        f"best {stars}{kind} {params.location} deals expedia{budget}",
+        f"cheap {kind} {params.location} hotels.com {dates}".strip(),
+        f"{params.location} {kind} tripadvisor price per night",
+    ]
+    return list(dict.fromkeys(" ".join(v.split()) for v in variants))[:PIPELINE_QUERY_VARIANTS]
+
+
+HOTEL_VERTICAL = ListingVertical(
+    name="hotel",
+    subject="hotel",
+    search_hint="location, dates, star rating, and budget",
+    agent_prompt=AGENT_PROMPT,
+    extraction_fields=EXTRACTION_FIELDS,
+    required_fields=("hotel_name", "price_per_night"),
+    defaults=_listing_defaults,
+    name_field="hotel_name",
+    price_field="price_per_night",
+    block_key=_listing_city,
+    build_user_message=_build_user_message,
+    build_search_queries=_build_search_queries,
+    preferred_domains=PREFERRED_DOMAINS,
+    name_stopwords=NAME_STOPWORDS,
+    error=HotelSearchError,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -310,7 +185,7 @@ def _dispatch_tool(name: str, input_data: dict, client, model: str):
 
 def parse_hotel_query(query: str) -> HotelSearchParams:
     """Use OpenAI to extract structured hotel search params from natural language."""
-    client = _get_openai_client()
+    client = get_openai_client(HotelSearchError)
     model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
     today = date.today().isoformat()
 
@@ -346,7 +221,7 @@ def parse_hotel_query(query: str) -> HotelSearchParams:
     LOGGER.info("Parse response: %s", raw_text)
 
     try:
-        data = _extract_json_object(raw_text)
+        data = extract_json_object(raw_text)
     except (ValueError, json.JSONDecodeError) as exc:
         raise HotelSearchError(
             f"Could not parse hotel search parameters: {exc}"
@@ -374,7 +249,7 @@ def parse_hotel_query(query: str) -> HotelSearchParams:
             star_rating = None
 
     return HotelSearchParams(
-        location=data.get("location", ""),
+        location=canonical_location(data.get("location") or ""),
         check_in_date=data.get("check_in_date", ""),
         check_out_date=data.get("check_out_date", ""),
         guests=guests,
@@ -385,112 +260,17 @@ def parse_hotel_query(query: str) -> HotelSearchParams:
 
 
 # ---------------------------------------------------------------------------
-# Agent loop
+# Search
 # ---------------------------------------------------------------------------
 
 def search_hotels(params: HotelSearchParams) -> list[HotelListing]:
-    """Run the OpenAI agent loop to find hotel listings."""
-    client = _get_openai_client()
-    model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
+    """Find hotel listings with the shared listing search engine."""
+    return _build_listings(search_listings(HOTEL_VERTICAL, params))
 
-    system_prompt = (
-        "You are a hotel search agent. Your goal is to find exactly 20 hotel "
-        "listings matching the user's criteria.\n\n"
-        "Strategy:\n"
-        "1. Use search_google to find hotel listings (try sites like Booking.com, "
-        "Hotels.com, Expedia, Kayak, Trivago, Agoda, TripAdvisor, etc.)\n"
-        "2. Use scrape_page to fetch promising result pages\n"
-        "3. Use extract_hotel_listings to pull structured data from the scraped content\n"
-        "4. Keep searching and scraping until you have accumulated 20 listings\n"
-        "5. If a page fails to scrape or yields no results, try the next one\n"
-        "6. Vary your search queries to cover different hotel types, areas, and price ranges\n\n"
-        "Important: Call tools one step at a time. Search first, then scrape results, "
-        "then extract listings. Repeat until you have enough listings."
-    )
 
-    parts = [f"Find hotels in {params.location}."]
-    if params.check_in_date:
-        parts.append(f"Check-in: {params.check_in_date}.")
-    if params.check_out_date:
-        parts.append(f"Check-out: {params.check_out_date}.")
-    if params.guests:
-        parts.append(f"Guests: {params.guests}.")
-    if params.max_price_per_night:
-        parts.append(f"Budget: under ${params.max_price_per_night}/night.")
-    if params.star_rating:
-        parts.append(f"Minimum star rating: {params.star_rating} stars.")
-    if params.hotel_type:
-        parts.append(f"Hotel type: {params.hotel_type}.")
-    parts.append(f"Find {TARGET_LISTINGS} hotel listings with prices and details.")
-
-    user_message = " ".join(parts)
-    LOGGER.info("Agent user message: %s", user_message)
-
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_message},
-    ]
-    all_listings: list[dict] = []
-
-    for iteration in range(MAX_AGENT_ITERATIONS):
-        LOGGER.info("Agent iteration %d, listings so far: %d", iteration + 1, len(all_listings))
-
-        try:
-            response = client.chat.completions.create(
-                model=model,
-                max_tokens=4096,
-                messages=messages,
-                tools=TOOLS,
-            )
-        except Exception as exc:
-            LOGGER.error("Agent API call failed: %s", exc)
-            break
-
-        message = response.choices[0].message
-        messages.append(message)
-
-        if not message.tool_calls:
-            LOGGER.info("Agent stopped (no tool calls)")
-            break
-
-        for tc in message.tool_calls:
-            input_data = json.loads(tc.function.arguments)
-            LOGGER.info("Tool call: %s(%s)", tc.function.name, json.dumps(input_data)[:200])
-            result_str = _dispatch_tool(tc.function.name, input_data, client, model)
-
-            if tc.function.name == "extract_hotel_listings":
-                try:
-                    extracted = json.loads(result_str)
-                    if isinstance(extracted, list):
-                        all_listings.extend(extracted)
-                        LOGGER.info(
-                            "Extracted %d listings (total: %d)", len(extracted), len(all_listings)
-                        )
-                except (json.JSONDecodeError, TypeError):
-                    pass
-
-            messages.append({
-                "role": "tool",
-                "tool_call_id": tc.id,
-                "content": result_str[:SCRAPE_MAX_CHARS],
-            })
-
-        if len(all_listings) >= TARGET_LISTINGS:
-            LOGGER.info("Reached target of %d listings", TARGET_LISTINGS)
-            break
-
-    # Deduplicate by (hotel_name, location, price_per_night)
-    seen = set()
+def _build_listings(all_listings: list[dict]) -> list[HotelListing]:
     unique: list[HotelListing] = []
     for item in all_listings:
-        key = (
-            item.get("hotel_name", ""),
-            item.get("location", ""),
-            item.get("price_per_night", 0),
-        )
-        if key in seen:
-            continue
-        seen.add(key)
         try:
             star = item.get("star_rating")
             listing = HotelListing(
@@ -0,0 +1,346 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.listing_search import (
+    EARLY_STOP_DRY_EXTRACTS,
+    _compact_extracted_scrape,
+    _enforce_token_budget,
+    _estimate_tokens,
+    _rank_candidate_urls,
+    _run_pipeline,
+    _scrape_with_stats,
+    name_similarity,
+    normalize_tokens,
+    scrape_page,
+    unique_listings,
+)
+from core.models import ScrapeDomainStat
+
+from .models import HotelResult, HotelResultPayload, HotelSearch
+
+from .services import (
+    HOTEL_VERTICAL,
+    PREFERRED_DOMAINS,
+    HotelListing,
+    HotelSearchParams,
+    _build_search_queries,
+    search_hotels,
+)
+
+
+def _assistant(call_id, name, **arguments):
+    return {
+        "role": "assistant",
+        "content": "",
+        "tool_calls": [
+            {
+                "id": call_id,
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)},
+            }
+        ],
+    }
+
+
+def _tool(call_id, content):
+    return {"role": "tool", "tool_call_id": call_id, "content": content}
+
+
+class AgentContextCompactionTests(SimpleTestCase):
+    def setUp(self):
+        self.page = "Hotel Lutetia $450/night\n" * 400
+        self.messages = [
+            {"role": "system", "content": "system"},
+            {"role": "user", "content": "Find hotels in Paris."},
+            _assistant("scrape-1", "scrape_page", url="https://booking.com/paris"),
+            _tool("scrape-1", self.page),
+            _assistant(
+                "extract-1",
+                "extract_hotel_listings",
+                raw_text=self.page,
+                source_url="https://booking.com/paris",
+            ),
+        ]
+
+    def test_extracted_scrape_is_replaced_with_stub(self):
+        before = _estimate_tokens(self.messages)
+        _compact_extracted_scrape(
+            self.messages, "scrape-1", "extract-1", "https://booking.com/paris", 3
+        )
+
+        self.assertEqual(
+            self.messages[3]["content"],
+            "[compacted] Scraped https://booking.com/paris, extracted 3 listings.",
+        )
+        args = json.loads(self.messages[4]["tool_calls"][0]["function"]["arguments"])
+        self.assertTrue(args["raw_text"].startswith("[compacted"))
+        self.assertEqual(args["source_url"], "https://booking.com/paris")
+        self.assertLess(_estimate_tokens(self.messages), before // 10)
+
+    def test_budget_keeps_current_turn_intact(self):
+        self.messages.append(_assistant("scrape-2", "scrape_page", url="https://expedia.com/paris"))
+        self.messages.append(_tool("scrape-2", self.page))
+        current_turn = len(self.messages) - 2
+
+        _enforce_token_budget(self.messages, current_turn, budget=100)
+
+        self.assertTrue(self.messages[3]["content"].startswith("[compacted"))
+        self.assertEqual(self.messages[-1]["content"], self.page)
+        self.assertEqual(self.messages[1]["content"], "Find hotels in Paris.")
+
+    def test_budget_is_noop_when_history_fits(self):
+        _enforce_token_budget(self.messages, len(self.messages), budget=1_000_000)
+        self.assertEqual(self.messages[3]["content"], self.page)
+
+
+class HotelSearchPipelineTests(TestCase):
+    def test_candidate_urls_deduplicated_by_domain_and_ranked(self):
+        results = [
+            {"url": "https://www.somehotelblog.com/paris"},
+            {"url": "https://www.tripadvisor.com/Hotels-Paris"},
+            {"url": "https://www.booking.com/city/fr/paris.html"},
+            {"url": "https://www.booking.com/hotel/fr/lutetia.html"},
+            {"error": "Search failed"},
+        ]
+        self.assertEqual(
+            _rank_candidate_urls(results, PREFERRED_DOMAINS),
+            [
+                "https://www.booking.com/city/fr/paris.html",
+                "https://www.tripadvisor.com/Hotels-Paris",
+                "https://www.somehotelblog.com/paris",
+            ],
+        )
+
+    def test_search_queries_are_distinct(self):
+        params = HotelSearchParams(location="Paris, France", star_rating=4, max_price_per_night=300)
+        queries = _build_search_queries(params)
+        self.assertEqual(len(queries), len(set(queries)))
+        self.assertTrue(all("Paris, France" in q for q in queries))
+
+    @override_settings(OPENAI_API_KEY="test-key", LISTING_SEARCH_MODE="pipeline")
+    @patch("core.listing_search._run_agent_loop")
+    @patch("core.listing_search.extract_listings")
+    @patch("core.listing_search.scrape_page")
+    @patch("core.listing_search.search_google")
+    def test_pipeline_skips_failed_scrapes_without_agent(
+        self, mock_search, mock_scrape, mock_extract, mock_agent
+    ):
+        mock_search.return_value = [
+            {"url": "https://www.booking.com/paris"},
+            {"url": "https://www.expedia.com/paris"},
+        ]
+        mock_scrape.side_effect = lambda url: (
+            "Error fetching page: 403" if "expedia" in url else "Lutetia $450"
+        )
+        mock_extract.return_value = [
+            {"hotel_name": "Lutetia", "price_per_night": 450, "source": "booking.com"}
+        ]
+
+        listings = search_hotels(HotelSearchParams(location="Paris"))
+
+        self.assertEqual([l.hotel_name for l in listings], ["Lutetia"])
+        mock_extract.assert_called_once()
+        mock_agent.assert_not_called()
+
+    @override_settings(OPENAI_API_KEY="test-key", LISTING_SEARCH_MODE="pipeline")
+    @patch("core.listing_search._run_agent_loop", return_value=[])
+    @patch("core.listing_search.search_google", return_value=[])
+    def test_pipeline_falls_back_to_agent_when_empty(self, mock_search, mock_agent):
+        self.assertEqual(search_hotels(HotelSearchParams(location="Paris")), [])
+        mock_agent.assert_called_once()
+
+    @patch("core.listing_search.extract_listings")
+    @patch("core.listing_search.scrape_page", return_value="page text")
+    @patch("core.listing_search.search_google")
+    def test_pipeline_stops_when_extracts_stop_adding_listings(
+        self, mock_search, mock_scrape, mock_extract
+    ):
+        mock_search.return_value = [{"url": f"https://site{i}.com/paris"} for i in range(6)]
+        mock_extract.return_value = [
+            {"hotel_name": "Lutetia", "price_per_night": 450, "location": "Paris"}
+        ]
+
+        items = _run_pipeline(
+            HOTEL_VERTICAL, HotelSearchParams(location="Paris"), client=None, model="test"
+        )
+
+        # One productive extract followed by EARLY_STOP_DRY_EXTRACTS duplicates.
+        self.assertEqual(len(items), 1 + EARLY_STOP_DRY_EXTRACTS)
+
+    def test_scraped_pages_are_cached(self):
+        cache.clear()
+        response = MagicMock(text="<html><body><p>Lutetia $450</p><script>x()</script></body></html>")
+        with patch("core.listing_search._HTTP.get", return_value=response) as mock_get:
+            first = scrape_page("https://www.booking.com/paris")
+            second = scrape_page("https://www.booking.com/paris")
+
+        self.assertEqual(first, "Lutetia $450")
+        self.assertEqual(second, first)
+        mock_get.assert_called_once()
+
+
+class ListingDeduplicationTests(SimpleTestCase):
+    def _hotel(self, name, price, location="", source=""):
+        return {"hotel_name": name, "price_per_night": price, "location": location, "source": source}
+
+    def test_same_property_across_sources_keeps_best_price(self):
+        listings = unique_listings(
+            HOTEL_VERTICAL,
+            [
+                self._hotel("Hotel Lutetia Paris", 480, "45 Bd Raspail, 75006 Paris, France", "booking.com"),
+                self._hotel("Lutétia", 450, source="expedia.com"),
+                self._hotel("The Hôtel Lutetia", 470, "Paris", "hotels.com"),
+                self._hotel("Le Pavillon de la Reine", 390, "Paris"),
+            ],
+            area="Paris, France",
+        )
+
+        self.assertEqual([l["hotel_name"] for l in listings], ["Lutétia", "Le Pavillon de la Reine"])
+        self.assertEqual(listings[0]["price_per_night"], 450)
+        self.assertEqual(listings[0]["source"], "expedia.com")
+        # Blank fields on the cheapest copy are filled in from the duplicates.
+        self.assertEqual(listings[0]["location"], "45 Bd Raspail, 75006 Paris, France")
+
+    def test_distinct_properties_of_one_brand_are_kept(self):
+        listings = unique_listings(
+            HOTEL_VERTICAL,
+            [
+                self._hotel("Hilton Paris Opera", 300),
+                self._hotel("Hilton Garden Inn Paris", 200),
+                self._hotel("Hampton by Hilton Paris", 150),
+            ],
+            area="Paris",
+        )
+        self.assertEqual(len(listings), 3)
+
+    def test_names_differing_in_a_distinguishing_word_do_not_match(self):
+        pairs = [
+            ("Novotel Paris Centre", "Novotel Paris Est"),
+            ("Holiday Inn Express", "Holiday Inn"),
+            ("Marriott", "Marriott Downtown"),
+            ("Ford Mustang Convertible", "Ford Mustang"),
+        ]
+        for first, second in pairs:
+            with self.subTest(first=first, second=second):
+                score = name_similarity(frozenset(normalize_tokens(first)), frozenset(normalize_tokens(second)))
+                self.assertEqual(score, 0.0)
+
+    def test_generic_words_and_misspellings_still_match(self):
+        self.assertEqual(name_similarity(frozenset({"the", "lutetia"}), frozenset({"lutetia"})), 1.0)
+        self.assertGreaterEqual(name_similarity(frozenset({"lutetia"}), frozenset({"lutecia"})), 0.8)
+
+    def test_sub_brands_and_areas_keep_their_own_prices(self):
+        listings = unique_listings(
+            HOTEL_VERTICAL,
+            [
+                self._hotel("Novotel Paris Centre", 180),
+                self._hotel("Novotel Paris Est", 120),
+                self._hotel("Holiday Inn Express Paris", 140),
+                self._hotel("Holiday Inn Paris", 160),
+                self._hotel("Marriott Paris", 300),
+                self._hotel("Marriott Downtown Paris", 250),
+            ],
+            area="Paris",
+        )
+        self.assertEqual(
+            [(l["hotel_name"], l["price_per_night"]) for l in listings],
+            [
+                ("Novotel Paris Centre", 180),
+                ("Novotel Paris Est", 120),
+                ("Holiday Inn Express Paris", 140),
+                ("Holiday Inn Paris", 160),
+                ("Marriott Paris", 300),
+                ("Marriott Downtown Paris", 250),
+            ],
+        )
+
+    def test_listings_in_different_cities_are_not_merged(self):
+        listings = unique_listings(
+            HOTEL_VERTICAL,
+            [
+                self._hotel("Novotel Centre", 120, "1 Rue A, Paris, France"),
+                self._hotel("Novotel Centre", 110, "2 Rue B, Lyon, France"),
+            ],
+        )
+        self.assertEqual(len(listings), 2)
+
+
+class ScrapeDomainStatTests(TestCase):
+    def _record(self, domain, attempts, failures=0, listings=0):
+        for i in range(attempts):
+            ScrapeDomainStat.record_scrape(domain, ok=i >= failures, latency_ms=100)
+        ScrapeDomainStat.record_extract(domain, listings)
+
+    def test_records_success_rate_latency_and_yield(self):
+        self._record("booking.com", attempts=4, failures=1, listings=30)
+        stat = ScrapeDomainStat.objects.get(domain="booking.com")
+        self.assertAlmostEqual(stat.success_rate, 0.75)
+        self.assertEqual(stat.avg_latency_ms, 100)
+        self.assertEqual(stat.listings_per_scrape, 10)
+        self.assertFalse(stat.is_low_yield)
+
+    def test_blocked_domain_is_skipped_by_agent_scrapes(self):
+        self._record("blocked.example", attempts=4, failures=4)
+        self.assertEqual(ScrapeDomainStat.low_yield_domains(["blocked.example"]), {"blocked.example"})
+
+        with patch("core.listing_search.scrape_page") as mock_scrape:
+            result = _scrape_with_stats("https://www.blocked.example/paris")
+
+        self.assertTrue(result.startswith("Skipped"))
+        mock_scrape.assert_not_called()
+
+    def test_low_yield_domain_is_retried_after_window(self):
+        self._record("blocked.example", attempts=4, failures=4)
+        ScrapeDomainStat.objects.filter(domain="blocked.example").update(
+            last_scraped_at=timezone.now() - ScrapeDomainStat.RETRY_AFTER * 2
+        )
+        self.assertEqual(ScrapeDomainStat.low_yield_domains(["blocked.example"]), set())
+
+
+class HotelResultPayloadTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="traveller", password="StrongPass123!")
+        self.client.login(username="traveller", password="StrongPass123!")
+
+    def _listing(self, name):
+        return HotelListing(
+            hotel_name=name, hotel_type="hotel", star_rating=4, price_per_night=120.0,
+            price_display="$120", location="Paris, France", amenities="wifi",
+            check_in="", check_out="", listing_url=f"https://example.com/{name}",
+            source="example.com", raw_data={"name": name, "rooms": list(range(50))},
+        )
+
+    @patch("hotels.api_views.search_hotels_natural")
+    def test_search_stores_raw_data_in_side_table(self, mock_search):
+        mock_search.return_value = (
+            HotelSearchParams(location="Paris, France"),
+            [self._listing("Le Marais"), self._listing("Opera")],
+        )
+        response = self.client.post("/api/v1/hotels/search/", {"query": "Paris hotels"}, content_type="application/json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(HotelResultPayload.objects.count(), 2)
+        result = HotelResult.objects.get(hotel_name="Opera")
+        self.assertEqual(result.raw_data["name"], "Opera")
+
+        with CaptureQueriesContext(connection) as queries:
+            detail = self.client.get(f"/api/v1/hotels/{response.json()['search_id']}/")
+        self.assertEqual(len(detail.json()["results"]), 2)
+        self.assertFalse(any("hotelresultpayload" in q["sql"] for q in queries.captured_queries))
+
+        again = self.client.get(f"/api/v1/hotels/{response.json()['search_id']}/", HTTP_IF_NONE_MATCH=detail["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_raw_data_is_empty_without_payload(self):
+        search = HotelSearch.objects.create(user=self.user, natural_query="Rome", location="Rome, Italy")
+        result = HotelResult.objects.create(
+            search=search, hotel_name="Roma", price_per_night=90, price_display="$90", location="Rome, Italy",
+        )
+        self.assertEqual(result.raw_data, {})
@@ -5,7 +5,7 @@ from django.core.exceptions import ImproperlyConfigured
 from django.shortcuts import get_object_or_404, redirect, render
 
 from .forms import HotelSearchForm
-from .models import HotelResult, HotelSearch
+from .models import HotelResult, HotelResultPayload, HotelSearch
 from .services import HotelSearchError, search_hotels_natural
 
 LOGGER = logging.getLogger(__name__)
@@ -39,8 +39,8 @@ def hotel_search(request):
                         star_rating=params.star_rating,
                         hotel_type=params.hotel_type,
                     )
-                    for listing in listings:
-                        HotelResult.objects.create(
+                    results = HotelResult.objects.bulk_create(
+                        HotelResult(
                             search=search_obj,
                             hotel_name=listing.hotel_name,
                             hotel_type=listing.hotel_type,
@@ -53,8 +53,13 @@ def hotel_search(request):
                             check_out=listing.check_out,
                             listing_url=listing.listing_url,
                             source=listing.source,
-                            raw_data=listing.raw_data,
                         )
+                        for listing in listings
+                    )
+                    HotelResultPayload.objects.bulk_create(
+                        HotelResultPayload(result=result, data=listing.raw_data)
+                        for result, listing in zip(results, listings)
+                    )
                     return redirect("hotels:detail", pk=search_obj.pk)
 
                 return render(request, "hotels/results.html", {
@@ -72,7 +77,7 @@ def hotel_search(request):
 def hotel_results(request, pk: int):
     """Display saved hotel search results."""
     search_obj = get_object_or_404(HotelSearch, pk=pk, user=request.user)
-    results = search_obj.results.all()
+    results = search_obj.fetched_results()
 
     return render(request, "hotels/results.html", {
         "search": search_obj,
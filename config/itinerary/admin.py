@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Itinerary
+from .models import Itinerary, ItineraryEvents
 
 
 @admin.register(Itinerary)
@@ -8,3 +8,9 @@ class ItineraryAdmin(admin.ModelAdmin):
     list_display = ("destination", "user", "start_date", "end_date", "created_at")
     list_filter = ("start_date", "end_date", "created_at")
     search_fields = ("destination", "user__username", "user__email")
+
+
+@admin.register(ItineraryEvents)
+class ItineraryEventsAdmin(admin.ModelAdmin):
+    list_display = ("itinerary", "fetched_at")
+    readonly_fields = ("source_key", "fetched_at")
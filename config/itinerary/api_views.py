@@ -1,16 +1,38 @@
+import json
 import logging
+from concurrent.futures import Future
 from datetime import date
 
 from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 
-from .eventbrite import fetch_events
+from core.conditional import latest, revalidate, version_etag
+from core.db_router import read_from_replica
+
+from .event_cache import cached_events, events_are_current, store_events
+from .eventbrite import PREVIEW_EVENTS_POOL, fetch_events
 from .models import Itinerary
-from .serializers import ItineraryCreateSerializer, ItinerarySerializer, ItineraryUpdateSerializer
-from .services import ItineraryGenerationError, ItineraryRequest, generate_itinerary
+from .serializers import (
+    ItineraryCreateSerializer,
+    ItineraryDaysRegenerateSerializer,
+    ItineraryListSerializer,
+    ItinerarySerializer,
+    ItineraryUpdateSerializer,
+)
+from .services import (
+    ItineraryGenerationError,
+    ItineraryRequest,
+    generate_itinerary,
+    regenerate_days,
+    stream_itinerary,
+)
 
 from trips.models import Trip
 
@@ -18,30 +40,26 @@ LOGGER = logging.getLogger(__name__)
 PENDING_SESSION_KEY = "pending_itinerary"
 
 
+class ItineraryCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "-created_at"
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def itinerary_list(request):
-    qs = Itinerary.objects.filter(user=request.user)
-    return Response(ItinerarySerializer(qs, many=True).data)
-
-
-@api_view(["POST"])
-@permission_classes([AllowAny])
-def itinerary_create(request):
-    serializer = ItineraryCreateSerializer(data=request.data)
-    if not serializer.is_valid():
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    """Newest-first, cursor-paginated summaries (``?cursor=...&page_size=...``)."""
+    qs = Itinerary.objects.filter(user=request.user).only(*ItineraryListSerializer.COLUMNS)
+    paginator = ItineraryCursorPagination()
+    page = paginator.paginate_queryset(qs, request)
+    return paginator.get_paginated_response(ItineraryListSerializer(page, many=True).data)
 
-    data = serializer.validated_data
-    action = data["action"]
-
-    if action == "save" and not request.user.is_authenticated:
-        return Response(
-            {"error": "Please sign in to save itineraries to your account."},
-            status=status.HTTP_401_UNAUTHORIZED,
-        )
 
-    payload = ItineraryRequest(
+def _itinerary_request(data) -> ItineraryRequest:
+    return ItineraryRequest(
         destination=data["destination"],
         start_date=data["start_date"].strftime("%Y-%m-%d"),
         end_date=data["end_date"].strftime("%Y-%m-%d"),
@@ -51,42 +69,43 @@ def itinerary_create(request):
         preference=data["preference"],
     )
 
-    try:
-        prompt, plan = generate_itinerary(payload)
-    except (ImproperlyConfigured, ItineraryGenerationError) as exc:
-        return Response({"error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    should_save = action == "save" or request.user.is_authenticated
+def _save_itinerary(user, data, prompt: str, plan: str) -> Itinerary:
+    itinerary = Itinerary.objects.create(
+        user=user,
+        destination=data["destination"],
+        start_date=data["start_date"],
+        end_date=data["end_date"],
+        interests=data["interests"],
+        activities=data["activities"],
+        food_preferences=data["food_preferences"],
+        preference=data["preference"],
+        prompt=prompt,
+        generated_plan=plan,
+    )
 
-    if should_save and request.user.is_authenticated:
-        itinerary = Itinerary.objects.create(
-            user=request.user,
-            destination=data["destination"],
-            start_date=data["start_date"],
-            end_date=data["end_date"],
-            interests=data["interests"],
-            activities=data["activities"],
-            food_preferences=data["food_preferences"],
-            preference=data["preference"],
-            prompt=prompt,
-            generated_plan=plan,
-        )
+    # Auto-create a Trip linked to this itinerary
+    trip = Trip.objects.create(
+        user=user,
+        title=data["destination"],
+        itinerary=itinerary,
+    )
+    LOGGER.info("Created itinerary %s and trip %s for %s", itinerary.pk, trip.pk, user)
+    return itinerary
 
-        # Auto-create a Trip linked to this itinerary
-        trip = Trip.objects.create(
-            user=request.user,
-            title=data["destination"],
-            itinerary=itinerary,
-        )
-        LOGGER.info("Created itinerary %s and trip %s for %s", itinerary.pk, trip.pk, request.user)
-        return Response(ItinerarySerializer(itinerary).data, status=status.HTTP_201_CREATED)
 
-    # Anonymous preview — store in session
-    events = fetch_events(
+def _start_events_fetch(data) -> Future:
+    """Fetch preview events in the background, overlapping with itinerary generation."""
+    return PREVIEW_EVENTS_POOL.submit(
+        fetch_events,
         data["destination"],
         data["start_date"].strftime("%Y-%m-%d"),
         data["end_date"].strftime("%Y-%m-%d"),
     )
+
+
+def _store_preview(request, data, prompt: str, plan: str, events: list) -> dict:
+    """Stash the preview in the session and return the response body."""
     request.session[PENDING_SESSION_KEY] = {
         "destination": data["destination"],
         "start_date": data["start_date"].strftime("%Y-%m-%d"),
@@ -99,17 +118,132 @@ def itinerary_create(request):
         "generated_plan": plan,
         "events": events,
     }
-    return Response(
-        {
-            "preview": True,
-            "destination": data["destination"],
-            "start_date": data["start_date"].strftime("%Y-%m-%d"),
-            "end_date": data["end_date"].strftime("%Y-%m-%d"),
-            "generated_plan": plan,
-            "events": events,
-        },
-        status=status.HTTP_200_OK,
-    )
+    return {
+        "preview": True,
+        "destination": data["destination"],
+        "start_date": data["start_date"].strftime("%Y-%m-%d"),
+        "end_date": data["end_date"].strftime("%Y-%m-%d"),
+        "generated_plan": plan,
+        "events": events,
+    }
+
+
+def _validate_create(request):
+    """Return (validated data, None) or (None, error response) for a create request."""
+    serializer = ItineraryCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return None, Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    if data["action"] == "save" and not request.user.is_authenticated:
+        return None, Response(
+            {"error": "Please sign in to save itineraries to your account."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    return data, None
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def itinerary_create(request):
+    data, error = _validate_create(request)
+    if error is not None:
+        return error
+
+    should_save = data["action"] == "save" or request.user.is_authenticated
+    # Previews show events too; fetch them while the plan is being generated.
+    events_future = None if request.user.is_authenticated else _start_events_fetch(data)
+
+    try:
+        prompt, plan = generate_itinerary(_itinerary_request(data), fresh=data["fresh"])
+    except (ImproperlyConfigured, ItineraryGenerationError) as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    if should_save and request.user.is_authenticated:
+        itinerary = _save_itinerary(request.user, data, prompt, plan)
+        return Response(ItinerarySerializer(itinerary).data, status=status.HTTP_201_CREATED)
+
+    # Anonymous preview — store in session
+    body = _store_preview(request, data, prompt, plan, events_future.result())
+    return Response(body, status=status.HTTP_200_OK)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets SSE clients (``Accept: text/event-stream``) negotiate; errors become an ``error`` event."""
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return _sse("error", data).encode(self.charset)
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def itinerary_create_stream(request):
+    """
+    Streaming variant of ``itinerary_create`` using Server-Sent Events.
+
+    Sends a ``delta`` event (``{"text": ...}``) for every chunk of generated
+    text, then one ``done`` event with the same body ``itinerary_create``
+    would return, or an ``error`` event. The plan is saved (or stored as the
+    pending preview) only once the stream has completed.
+    """
+    data, error = _validate_create(request)
+    if error is not None:
+        return error
+
+    user = request.user if request.user.is_authenticated else None
+    events_future = None if user is not None else _start_events_fetch(data)
+
+    try:
+        prompt, chunks = stream_itinerary(_itinerary_request(data), fresh=data["fresh"])
+    except (ImproperlyConfigured, ItineraryGenerationError) as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    if user is None:
+        # SessionMiddleware saves the session and sets the cookie before the
+        # body is streamed, so create the session now and save the preview
+        # into it explicitly when the stream ends.
+        if request.session.session_key is None:
+            request.session.save()
+        request.session.modified = True
+
+    def stream():
+        parts: list[str] = []
+        try:
+            for chunk in chunks:
+                parts.append(chunk)
+                yield _sse("delta", {"text": chunk})
+        except ItineraryGenerationError as exc:
+            LOGGER.warning("Itinerary stream failed after %d chunks: %s", len(parts), exc)
+            yield _sse("error", {"error": str(exc)})
+            return
+
+        plan = "".join(parts).strip()
+        if not plan:
+            yield _sse("error", {"error": "Received an empty response from OpenAI."})
+            return
+
+        if user is not None:
+            itinerary = _save_itinerary(user, data, prompt, plan)
+            yield _sse("done", ItinerarySerializer(itinerary).data)
+            return
+
+        body = _store_preview(request, data, prompt, plan, events_future.result())
+        request.session.save()
+        yield _sse("done", body)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # disable proxy buffering (nginx)
+    return response
 
 
 @api_view(["GET"])
@@ -155,6 +289,7 @@ def itinerary_save_pending(request):
         prompt=pending["prompt"],
         generated_plan=pending["generated_plan"],
     )
+    store_events(itinerary, pending.get("events", []))
 
     # Auto-create a Trip linked to this itinerary
     trip = Trip.objects.create(
@@ -167,20 +302,34 @@ def itinerary_save_pending(request):
     return Response(ItinerarySerializer(itinerary).data, status=status.HTTP_201_CREATED)
 
 
+def _itinerary_validators(request, pk: int):
+    itinerary = (
+        Itinerary.objects.filter(pk=pk, user=request.user)
+        .select_related("event_cache")
+        .only("destination", "start_date", "end_date", "updated_at", "event_cache__source_key", "event_cache__fetched_at")
+        .first()
+    )
+    # Let the view run (and queue an events refresh) when the stored events are missing or stale.
+    if itinerary is None or not events_are_current(itinerary):
+        return None
+    fetched_at = itinerary.event_cache.fetched_at
+    return (
+        version_etag("itinerary", pk, itinerary.updated_at.isoformat(), fetched_at.isoformat()),
+        latest(itinerary.updated_at, fetched_at),
+    )
+
+
 @api_view(["GET", "PUT", "DELETE"])
 @permission_classes([IsAuthenticated])
+@revalidate(_itinerary_validators)
 def itinerary_detail(request, pk: int):
     try:
-        itinerary = Itinerary.objects.get(pk=pk, user=request.user)
+        itinerary = Itinerary.objects.select_related("event_cache").get(pk=pk, user=request.user)
     except Itinerary.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
     if request.method == "GET":
-        events = fetch_events(
-            itinerary.destination,
-            itinerary.start_date.strftime("%Y-%m-%d"),
-            itinerary.end_date.strftime("%Y-%m-%d"),
-        )
+        events = cached_events(itinerary)
         return Response({"itinerary": ItinerarySerializer(itinerary).data, "events": events})
 
     if request.method == "PUT":
@@ -206,7 +355,8 @@ def itinerary_detail(request, pk: int):
                 preference=itinerary.preference,
             )
             try:
-                prompt, plan = generate_itinerary(payload)
+                # The user asked for a new plan, so never hand back a cached one.
+                prompt, plan = generate_itinerary(payload, fresh=True)
             except (ImproperlyConfigured, ItineraryGenerationError) as exc:
                 return Response({"error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -222,3 +372,43 @@ def itinerary_detail(request, pk: int):
     # DELETE
     itinerary.delete()
     return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def itinerary_regenerate_days(request, pk: int):
+    """
+    Regenerate only some days of a saved itinerary, e.g. ``{"days": [3]}``.
+
+    Optional ``interests``/``activities``/``food_preferences`` update the
+    itinerary first; ``instructions`` are passed to the model for these days.
+    """
+    try:
+        itinerary = Itinerary.objects.get(pk=pk, user=request.user)
+    except Itinerary.DoesNotExist:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+
+    serializer = ItineraryDaysRegenerateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    unknown = sorted(set(data["days"]) - set(itinerary.day_numbers))
+    if unknown:
+        return Response(
+            {"days": [f"The itinerary has no Day {n} section." for n in unknown]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    for field in ("interests", "activities", "food_preferences"):
+        if field in data:
+            setattr(itinerary, field, data[field])
+
+    try:
+        regenerate_days(itinerary, data["days"], data["instructions"])
+    except (ImproperlyConfigured, ItineraryGenerationError) as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    itinerary.save()
+    LOGGER.info("Regenerated days %s of itinerary %s", data["days"], itinerary.pk)
+    return Response(ItinerarySerializer(itinerary).data)
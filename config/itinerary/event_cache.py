@@ -0,0 +1,144 @@
+"""Persisted event results for saved itineraries.
+
+Detail pages read events from :class:`~itinerary.models.ItineraryEvents` and
+never call OpenAI or Ticketmaster themselves. When the cached row is missing,
+stale, or was fetched for different destination/dates, a refresh is queued on
+a small background pool once the current transaction commits.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .eventbrite import Destination, fetch_destination_events, normalize_destinations
+from .models import Itinerary, ItineraryEvents
+
+LOGGER = logging.getLogger(__name__)
+
+EVENTS_TTL_SECONDS = 6 * 60 * 60
+REFRESH_RETRY_AFTER = 60  # seconds before a refresh that never ran (e.g. rolled back) may be queued again
+
+_REFRESH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="itinerary-events")
+_in_flight: dict[int, float] = {}  # itinerary id -> time the refresh was queued
+_in_flight_lock = threading.Lock()
+
+
+def _ttl() -> timedelta:
+    return timedelta(seconds=getattr(settings, "ITINERARY_EVENTS_TTL", EVENTS_TTL_SECONDS))
+
+
+def _destination_to_dict(destination: Destination) -> dict[str, Any]:
+    return {
+        "city": destination.city,
+        "state": destination.state,
+        "country": destination.country,
+        "start_date": destination.start_date.isoformat(),
+        "end_date": destination.end_date.isoformat(),
+    }
+
+
+def _destination_from_dict(data: dict[str, Any]) -> Destination:
+    return Destination(
+        city=data["city"],
+        state=data.get("state"),
+        country=data["country"],
+        start_date=date.fromisoformat(data["start_date"]),
+        end_date=date.fromisoformat(data["end_date"]),
+    )
+
+
+def cached_events(itinerary: Itinerary) -> list[dict[str, Any]]:
+    """Return the stored events for ``itinerary`` without any outbound I/O.
+
+    Schedules a background refresh when nothing is stored yet, the stored
+    events are older than the TTL, or the destination/dates have changed.
+    Events fetched for other destination/dates are not returned.
+    """
+    try:
+        cache_row = itinerary.event_cache
+    except ItineraryEvents.DoesNotExist:
+        schedule_refresh(itinerary.pk)
+        return []
+
+    if not cache_row.is_current_for(itinerary):
+        schedule_refresh(itinerary.pk)
+        return []
+    if cache_row.is_stale(_ttl()):
+        schedule_refresh(itinerary.pk)
+    return cache_row.events
+
+
+def events_are_current(itinerary: Itinerary) -> bool:
+    """True when :func:`cached_events` would serve stored events without queuing a refresh."""
+    cache_row = getattr(itinerary, "event_cache", None)
+    return cache_row is not None and cache_row.is_current_for(itinerary) and not cache_row.is_stale(_ttl())
+
+
+def store_events(
+    itinerary: Itinerary,
+    events: list[dict[str, Any]],
+    destinations: list[Destination] | None = None,
+) -> ItineraryEvents:
+    """Persist ``events`` (and optionally the normalized destinations) for ``itinerary``."""
+    cache_row, _ = ItineraryEvents.objects.update_or_create(
+        itinerary=itinerary,
+        defaults={
+            "source_key": itinerary.events_source_key,
+            "destinations": [_destination_to_dict(d) for d in destinations or []],
+            "events": events,
+            "fetched_at": timezone.now(),
+        },
+    )
+    return cache_row
+
+
+def refresh_events(itinerary_id: int) -> None:
+    """Normalize destinations (reusing stored ones when still valid) and refetch events."""
+    itinerary = Itinerary.objects.select_related("event_cache").filter(pk=itinerary_id).first()
+    if itinerary is None:
+        return
+
+    destinations: list[Destination] = []
+    cache_row = getattr(itinerary, "event_cache", None)
+    if cache_row is not None and cache_row.is_current_for(itinerary) and cache_row.destinations:
+        destinations = [_destination_from_dict(d) for d in cache_row.destinations]
+    elif getattr(settings, "TICKETMASTER_API_KEY", None):
+        destinations = normalize_destinations(itinerary.destination, itinerary.start_date, itinerary.end_date)
+
+    events = fetch_destination_events(destinations)
+    store_events(itinerary, events, destinations)
+    LOGGER.info("Refreshed %d events for itinerary %s", len(events), itinerary_id)
+
+
+def schedule_refresh(itinerary_id: int) -> None:
+    """Queue a background refresh for ``itinerary_id`` unless one is already running."""
+    now = time.monotonic()
+    with _in_flight_lock:
+        queued_at = _in_flight.get(itinerary_id)
+        if queued_at is not None and now - queued_at < REFRESH_RETRY_AFTER:
+            return
+        _in_flight[itinerary_id] = now
+
+    def submit():
+        _REFRESH_POOL.submit(_refresh_in_background, itinerary_id)
+
+    transaction.on_commit(submit)
+
+
+def _refresh_in_background(itinerary_id: int) -> None:
+    try:
+        refresh_events(itinerary_id)
+    except Exception:
+        LOGGER.exception("Background event refresh failed for itinerary %s", itinerary_id)
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(itinerary_id, None)
+        connections.close_all()
@@ -1,45 +1,32 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import date, timedelta
 from typing import Any, NamedTuple
 
 import requests
 from django.conf import settings
+from django.core.cache import cache
+
+from core.gazetteer import get_gazetteer
+from core.log import LogPayload, log_payload
 
 LOGGER = logging.getLogger(__name__)
 
-COUNTRY_ALIASES = {
-    "UNITED STATES": "US",
-    "USA": "US",
-    "US": "US",
-    "UNITED KINGDOM": "GB",
-    "UK": "GB",
-    "ENGLAND": "GB",
-    "SCOTLAND": "GB",
-    "WALES": "GB",
-    "NORTHERN IRELAND": "GB",
-    "CANADA": "CA",
-    "FRANCE": "FR",
-    "GERMANY": "DE",
-    "SPAIN": "ES",
-    "ITALY": "IT",
-    "PORTUGAL": "PT",
-    "MEXICO": "MX",
-    "AUSTRALIA": "AU",
-    "NEW ZEALAND": "NZ",
-    "JAPAN": "JP",
-    "SINGAPORE": "SG",
-    "BRAZIL": "BR",
-    "IRELAND": "IE",
-    "SWITZERLAND": "CH",
-    "NETHERLANDS": "NL",
-    "BELGIUM": "BE",
-    "SWEDEN": "SE",
-    "NORWAY": "NO",
-}
+TICKETMASTER_TIMEOUT = 8  # seconds per city request
+EVENTS_FETCH_DEADLINE = 10  # seconds for all cities together
+EVENTS_MAX_WORKERS = 6
+DESTINATION_CACHE_TTL = 24 * 60 * 60
+PREVIEW_EVENTS_WORKERS = 4
+
+# Lets the create views fetch a preview's events while its itinerary is still
+# being generated: ``PREVIEW_EVENTS_POOL.submit(fetch_events, ...)``.
+PREVIEW_EVENTS_POOL = ThreadPoolExecutor(max_workers=PREVIEW_EVENTS_WORKERS, thread_name_prefix="preview-events")
 
 
 def fetch_events(destination: str, start_date: str, end_date: str, max_results: int = 5) -> list[dict[str, Any]]:
@@ -48,33 +35,60 @@ def fetch_events(destination: str, start_date: str, end_date: str, max_results:
 
     Returns approximately ``max_results`` events per city (ordered in the same sequence as provided by the user).
     """
-    api_key = getattr(settings, "TICKETMASTER_API_KEY", None)
-    if not api_key:
+    if not getattr(settings, "TICKETMASTER_API_KEY", None):
         return []
 
     start = date.fromisoformat(start_date)
     end = date.fromisoformat(end_date)
-    destinations = _normalize_destinations(destination, start, end)
-    if not destinations:
+    destinations = normalize_destinations(destination, start, end)
+    return fetch_destination_events(destinations, max_results=max_results)
+
+
+def fetch_destination_events(destinations: list[Destination], max_results: int = 5) -> list[dict[str, Any]]:
+    """Fetch events for already-normalized destinations, keeping their order."""
+    api_key = getattr(settings, "TICKETMASTER_API_KEY", None)
+    if not api_key or not destinations:
         return []
 
-    events: list[dict[str, Any]] = []
     LOGGER.info(
         "Fetching Ticketmaster events for %d destinations between %s and %s",
         len(destinations),
-        start,
-        end,
+        destinations[0].start_date,
+        destinations[-1].end_date,
     )
-    for dest in destinations:
-        events.extend(
-            _fetch_city_events(
+    deadline_seconds = getattr(settings, "EVENTS_FETCH_DEADLINE", EVENTS_FETCH_DEADLINE)
+    deadline = time.monotonic() + deadline_seconds
+    timeout = min(TICKETMASTER_TIMEOUT, deadline_seconds)
+
+    # All cities are requested at once and share one deadline; cities that have not
+    # answered by then are skipped so the page still gets the events that did arrive.
+    pool = ThreadPoolExecutor(max_workers=min(EVENTS_MAX_WORKERS, len(destinations)))
+    try:
+        futures = [
+            pool.submit(
+                _fetch_city_events,
                 destination=dest,
                 start=dest.start_date,
                 end=dest.end_date,
                 api_key=api_key,
                 max_results=max_results,
+                timeout=timeout,
             )
-        )
+            for dest in destinations
+        ]
+        done, _ = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    events: list[dict[str, Any]] = []
+    for dest, future in zip(destinations, futures):
+        if future not in done:
+            LOGGER.warning("Ticketmaster request for %s missed the %ss deadline", dest.city, deadline_seconds)
+            continue
+        try:
+            events.extend(future.result())
+        except Exception as exc:
+            LOGGER.warning("Ticketmaster fetch failed for %s: %s", dest.city, exc)
     return events
 
 
@@ -108,18 +122,78 @@ def _extract_duration_days(line: str) -> int | None:
         return None
 
 
-def _normalize_destinations(destination_text: str, trip_start: date, trip_end: date) -> list[Destination]:
+def normalize_destinations(destination_text: str, trip_start: date, trip_end: date) -> list[Destination]:
+    """Split the free-text destination field into dated city stays.
+
+    Results are memoized per (text, trip dates). Unambiguous input such as
+    "Paris, France" is parsed heuristically without calling OpenAI.
+    """
+    key = _destinations_cache_key(destination_text, trip_start, trip_end)
+    cached = cache.get(key)
+    if cached is not None:
+        LOGGER.info("Using cached destinations for %r", destination_text)
+        return cached
+
     heuristic = _heuristic_destinations(destination_text, trip_start, trip_end)
+    if _is_unambiguous(destination_text):
+        LOGGER.info("Destination text %r is unambiguous; skipping OpenAI normalization.", destination_text)
+        cache.set(key, heuristic, DESTINATION_CACHE_TTL)
+        return heuristic
+
+    destinations = _llm_destinations(destination_text, trip_start, trip_end)
+    if destinations is None:
+        # Not cached: the LLM may be available (or succeed) next time.
+        return heuristic
+    cache.set(key, destinations, DESTINATION_CACHE_TTL)
+    return destinations
+
+
+def _destinations_cache_key(destination_text: str, trip_start: date, trip_end: date) -> str:
+    raw = f"{destination_text.strip()}|{trip_start.isoformat()}|{trip_end.isoformat()}"
+    return "itinerary-destinations:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+_MULTI_CITY_PATTERN = re.compile(r"\band\b|&|;|/|->|→|\bthen\b", re.IGNORECASE)
+
+
+def _is_unambiguous(destination_text: str) -> bool:
+    """True when the heuristic parse can be trusted: one "City, [ST,] Country" line, no durations."""
+    lines = [line.strip() for line in destination_text.splitlines() if line.strip()]
+    if len(lines) != 1:
+        return False
+    line = lines[0]
+    if _strip_duration(line) != line or _MULTI_CITY_PATTERN.search(line):
+        return False
+
+    parts = [part.strip() for part in line.split(",")]
+    if len(parts) not in (2, 3) or not all(parts):
+        return False
+    gazetteer = get_gazetteer()
+    # A known city whose qualifiers match exactly one entry ("Chicago, IL", "Vancouver, BC").
+    if len(gazetteer.candidates(line)) == 1:
+        return True
+    # Otherwise only trust an explicit country name ("Annecy, France", "Boulder, CO, USA");
+    # a bare two-letter suffix could be a state or a country.
+    country = gazetteer.country_code(parts[-1])
+    if country is None or (len(parts[-1]) == 2 and parts[-1].upper() not in ("UK", "US")):
+        return False
+    if len(parts) == 3:
+        return country == "US" and gazetteer.admin1_code("US", parts[1]) is not None
+    return True
+
+
+def _llm_destinations(destination_text: str, trip_start: date, trip_end: date) -> list[Destination] | None:
+    """Ask OpenAI to normalize the destination text; ``None`` means fall back to the heuristic."""
     api_key = getattr(settings, "OPENAI_API_KEY", None)
     if not api_key:
         LOGGER.info("OPENAI_API_KEY not configured; using heuristic destination parsing.")
-        return heuristic
+        return None
 
     try:
         from openai import OpenAI
     except ImportError:
         LOGGER.warning("OpenAI SDK not installed; using heuristic destination parsing.")
-        return heuristic
+        return None
 
     model = getattr(settings, "OPENAI_DESTINATION_MODEL", getattr(settings, "OPENAI_MODEL", "gpt-4o-mini"))
     client = OpenAI(api_key=api_key)
@@ -155,21 +229,21 @@ def _normalize_destinations(destination_text: str, trip_start: date, trip_end: d
         )
     except Exception as exc:
         LOGGER.warning("OpenAI normalization request failed: %s. Using heuristic parsing.", exc)
-        return heuristic
+        return None
 
     raw_text = _extract_output_text(response)
-    LOGGER.info("OpenAI normalization raw response: %s", raw_text)
+    LOGGER.info("OpenAI normalization raw response: %s", LogPayload(raw_text))
 
     try:
         segments = _extract_json_array(raw_text)
     except ValueError as exc:
         LOGGER.warning("Unable to parse OpenAI normalization output: %s. Using heuristic parsing.", exc)
-        return heuristic
+        return None
 
     destinations = _segments_to_destinations(segments, trip_start, trip_end)
     if not destinations:
         LOGGER.warning("OpenAI normalization returned no valid destinations; using heuristic parsing.")
-        return heuristic
+        return None
 
     LOGGER.info("OpenAI normalized destinations: %s", destinations)
     return destinations
@@ -194,6 +268,11 @@ def _heuristic_destinations(destination_text: str, trip_start: date, trip_end: d
         parts = [segment.strip() for segment in location_part.split(",") if segment.strip()]
         if not parts:
             continue
+        duration_days = _extract_duration_days(line)
+        place = get_gazetteer().resolve(location_part)
+        if place is not None:
+            segments.append((place.name, place.admin1 or None, place.country, duration_days))
+            continue
         city = parts[0]
         state: str | None = None
         country = "US"
@@ -209,7 +288,6 @@ def _heuristic_destinations(destination_text: str, trip_start: date, trip_end: d
             country = _normalise_country(last, default="US")
             if country != "US":
                 state = None
-        duration_days = _extract_duration_days(line)
         segments.append((city, state, country, duration_days))
 
     if not segments:
@@ -371,10 +449,12 @@ def _normalise_country(value: str, default: str = "US") -> str:
     code = value.strip()
     if not code:
         return default
+    country = get_gazetteer().country_code(code)
+    if country:
+        return country
     if len(code) == 2 and code.isalpha():
         return code.upper()
-    upper = code.upper()
-    return COUNTRY_ALIASES.get(upper, default)
+    return default
 
 
 def _fetch_city_events(
@@ -383,6 +463,7 @@ def _fetch_city_events(
     end: date,
     api_key: str,
     max_results: int,
+    timeout: float = TICKETMASTER_TIMEOUT,
 ) -> list[dict[str, Any]]:
     params = {
         "apikey": api_key,
@@ -393,29 +474,34 @@ def _fetch_city_events(
         "startDateTime": f"{start.isoformat()}T00:00:00Z",
         "endDateTime": f"{end.isoformat()}T23:59:59Z",
     }
-    if destination.country == "US" and destination.state:
-        params["stateCode"] = destination.state
+    state = destination.state
+    if destination.country == "US" and not state:
+        place = get_gazetteer().resolve(f"{destination.city}, US")
+        state = place.admin1 if place else None
+    if destination.country == "US" and state:
+        params["stateCode"] = state
 
     LOGGER.info(
         "Ticketmaster request params for %s: %s",
         destination,
-        json.dumps(params, ensure_ascii=False),
+        LogPayload(params),
     )
 
     try:
-        response = requests.get("https://app.ticketmaster.com/discovery/v2/events.json", params=params, timeout=8)
+        response = requests.get("https://app.ticketmaster.com/discovery/v2/events.json", params=params, timeout=timeout)
         response.raise_for_status()
     except requests.RequestException as exc:
         LOGGER.warning("Ticketmaster API failed for %s: %s", destination.city, exc)
         return []
 
     data = response.json()
-    LOGGER.info(
-        "Ticketmaster raw response for %s (status %s): %s",
-        destination,
-        response.status_code,
-        json.dumps(data, ensure_ascii=False),
-    )
+    if log_payload(LOGGER, logging.INFO):
+        LOGGER.info(
+            "Ticketmaster raw response for %s (status %s): %s",
+            destination,
+            response.status_code,
+            LogPayload(data),
+        )
     tm_events = (data.get("_embedded") or {}).get("events", [])
 
     events: list[dict[str, Any]] = []
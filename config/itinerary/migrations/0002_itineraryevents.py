@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItineraryEvents',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_key', models.CharField(help_text='Itinerary.events_source_key the events were fetched for.', max_length=40)),
+                ('destinations', models.JSONField(blank=True, default=list)),
+                ('events', models.JSONField(blank=True, default=list)),
+                ('fetched_at', models.DateTimeField()),
+                ('itinerary', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='event_cache', to='itinerary.itinerary')),
+            ],
+            options={
+                'verbose_name_plural': 'itinerary events',
+            },
+        ),
+    ]
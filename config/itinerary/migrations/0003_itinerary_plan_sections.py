@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:17
+
+from django.db import migrations, models
+
+from itinerary.utils import split_plan
+
+
+def split_existing_plans(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Itinerary = apps.get_model("itinerary", "Itinerary")
+    for itinerary in Itinerary.objects.using(db).only("pk", "generated_plan").iterator():
+        itinerary.plan_sections = split_plan(itinerary.generated_plan)
+        itinerary.save(using=db, update_fields=["plan_sections"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0002_itineraryevents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itinerary',
+            name='plan_sections',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='generated_plan split into preamble, per-day sections and closing; kept in sync on save.'),
+        ),
+        migrations.RunPython(split_existing_plans, migrations.RunPython.noop),
+    ]
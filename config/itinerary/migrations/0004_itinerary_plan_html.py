@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0003_itinerary_plan_sections'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itinerary',
+            name='plan_html',
+            field=models.TextField(blank=True, editable=False, help_text='generated_plan rendered to HTML.'),
+        ),
+        migrations.AddField(
+            model_name='itinerary',
+            name='plan_html_hash',
+            field=models.CharField(blank=True, editable=False, help_text='sha1 of the rendered generated_plan.', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='itinerary',
+            name='plan_html_renderer',
+            field=models.CharField(blank=True, editable=False, help_text='renderer_version() that produced plan_html.', max_length=32),
+        ),
+    ]
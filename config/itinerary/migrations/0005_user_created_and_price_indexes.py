@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0004_itinerary_plan_html'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itinerary',
+            index=models.Index(fields=['user', '-created_at'], name='itinerary_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itinerary', '0005_user_created_and_price_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itinerary',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
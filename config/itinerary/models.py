@@ -1,7 +1,12 @@
+import hashlib
+from datetime import timedelta
+
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from django.utils.safestring import mark_safe
 
-from .utils import render_markdown
+from .utils import content_hash, render_markdown, renderer_version, split_plan
 
 
 class Itinerary(models.Model):
@@ -19,6 +24,9 @@ class Itinerary(models.Model):
         (STYLE_ADVENTURE, "Adventure & Outdoors"),
     ]
 
+    # Derived from generated_plan in save()
+    _DERIVED_PLAN_FIELDS = ("plan_sections", "plan_html", "plan_html_hash", "plan_html_renderer")
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -41,16 +49,91 @@ class Itinerary(models.Model):
     )
     prompt = models.TextField()
     generated_plan = models.TextField()
+    plan_sections = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="generated_plan split into preamble, per-day sections and closing; kept in sync on save.",
+    )
+    plan_html = models.TextField(blank=True, editable=False, help_text="generated_plan rendered to HTML.")
+    plan_html_hash = models.CharField(max_length=40, blank=True, editable=False, help_text="sha1 of the rendered generated_plan.")
+    plan_html_renderer = models.CharField(max_length=32, blank=True, editable=False, help_text="renderer_version() that produced plan_html.")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
         db_table = "core_itinerary"
+        indexes = [models.Index(fields=["user", "-created_at"], name="itinerary_user_created_idx")]
 
     def __str__(self) -> str:
         return f"{self.destination} ({self.start_date:%b %d} - {self.end_date:%b %d})"
 
+    def save(self, *args, **kwargs):
+        self.plan_sections = split_plan(self.generated_plan)
+        if self.plan_html_hash != content_hash(self.generated_plan) or self.plan_html_renderer != renderer_version():
+            self._render_plan()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            derived = self._DERIVED_PLAN_FIELDS if "generated_plan" in update_fields else ()
+            kwargs["update_fields"] = {*update_fields, *derived, "updated_at"}
+        super().save(*args, **kwargs)
+
+    def _render_plan(self) -> None:
+        self.plan_html = render_markdown(self.generated_plan)
+        self.plan_html_hash = content_hash(self.generated_plan)
+        self.plan_html_renderer = renderer_version()
+
+    @property
+    def day_numbers(self) -> list[int]:
+        return [day["day"] for day in self.plan_sections.get("days", [])]
+
     @property
     def rendered_plan(self) -> str:
-        """Return the itinerary content converted from markdown to HTML."""
-        return render_markdown(self.generated_plan)
+        """
+        Return the itinerary content converted from markdown to HTML.
+
+        Uses the HTML stored at save time; it is only re-rendered (and written
+        back) when it was produced by a different renderer version.
+        """
+        if self.plan_html_renderer != renderer_version():
+            self._render_plan()
+            if self.pk:
+                type(self).objects.filter(pk=self.pk).update(
+                    plan_html=self.plan_html,
+                    plan_html_hash=self.plan_html_hash,
+                    plan_html_renderer=self.plan_html_renderer,
+                )
+        return mark_safe(self.plan_html)
+
+    @property
+    def events_source_key(self) -> str:
+        """Fingerprint of the fields the cached events were fetched for."""
+        raw = f"{self.destination}|{self.start_date}|{self.end_date}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ItineraryEvents(models.Model):
+    """Normalized destinations and Ticketmaster events cached for a saved itinerary."""
+
+    itinerary = models.OneToOneField(
+        Itinerary,
+        on_delete=models.CASCADE,
+        related_name="event_cache",
+    )
+    source_key = models.CharField(max_length=40, help_text="Itinerary.events_source_key the events were fetched for.")
+    destinations = models.JSONField(default=list, blank=True)
+    events = models.JSONField(default=list, blank=True)
+    fetched_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "itinerary events"
+
+    def __str__(self) -> str:
+        return f"Events for itinerary {self.itinerary_id} ({len(self.events)})"
+
+    def is_current_for(self, itinerary: Itinerary) -> bool:
+        return self.source_key == itinerary.events_source_key
+
+    def is_stale(self, ttl: timedelta) -> bool:
+        return timezone.now() - self.fetched_at > ttl
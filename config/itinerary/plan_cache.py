@@ -0,0 +1,158 @@
+"""Reuse of generated itinerary plans across near-identical requests.
+
+Requests are keyed on a canonical form: gazetteer-normalized destination(s),
+trip length, starting month (so plans stay seasonal), style and the sorted
+tokens of the free-text preferences. A cached plan is served for new dates by
+shifting every date inside the original trip window by the same offset. Plans
+that name weekdays are only reused when the offset is a whole number of weeks.
+"""
+from __future__ import annotations
+
+import calendar
+import hashlib
+import json
+import logging
+import re
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.gazetteer import canonical_location, normalize_name
+
+if TYPE_CHECKING:
+    from .services import ItineraryRequest
+
+LOGGER = logging.getLogger(__name__)
+
+PLAN_CACHE_TTL = 7 * 24 * 60 * 60
+
+_DESTINATION_SPLIT = re.compile(r"\n|;|->|→|\bthen\b", re.IGNORECASE)
+_PREFERENCE_STOPWORDS = frozenset(
+    "a an and or the of with for to in on at some lots lot like love loves i we our my me us".split()
+)
+
+_FULL_MONTHS = {name: number for number, name in enumerate(calendar.month_name) if name}
+_SHORT_MONTHS = {name: number for number, name in enumerate(calendar.month_abbr) if name}
+_SHORT_MONTHS["Sept"] = 9
+_MONTH = "|".join(sorted([*_FULL_MONTHS, *_SHORT_MONTHS], key=len, reverse=True))
+_DATE_PATTERN = re.compile(
+    rf"\b(?:(?P<m1>{_MONTH})(?P<p1>\.)?\s+(?P<d1>\d{{1,2}})(?P<s1>st|nd|rd|th)?(?:(?P<c1>,?\s+)(?P<y1>\d{{4}}))?"
+    rf"|(?P<d2>\d{{1,2}})(?P<s2>st|nd|rd|th)?\s+(?P<m2>{_MONTH})(?P<p2>\.)?(?:(?P<c2>,?\s+)(?P<y2>\d{{4}}))?"
+    r"|(?P<iso>\d{4}-\d{2}-\d{2}))\b"
+)
+_WEEKDAY_PATTERN = re.compile(r"\b(?:Mon|Tues|Wednes|Thurs|Fri|Satur|Sun)day\b", re.IGNORECASE)
+
+
+def _ttl() -> int:
+    return getattr(settings, "ITINERARY_PLAN_CACHE_TTL", PLAN_CACHE_TTL)
+
+
+def _tokens(text: str) -> list[str]:
+    return sorted({t for t in normalize_name(text).split() if t not in _PREFERENCE_STOPWORDS})
+
+
+def plan_cache_key(payload: ItineraryRequest) -> str:
+    start = date.fromisoformat(payload.start_date)
+    end = date.fromisoformat(payload.end_date)
+    canonical = {
+        "destination": [
+            normalize_name(canonical_location(part.strip()))
+            for part in _DESTINATION_SPLIT.split(payload.destination)
+            if part.strip()
+        ],
+        "nights": (end - start).days,
+        "month": start.month,
+        "style": payload.preference,
+        "interests": _tokens(payload.interests),
+        "activities": _tokens(payload.activities),
+        "food": _tokens(payload.food_preferences),
+    }
+    digest = hashlib.sha1(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"itinerary:plan:{digest}"
+
+
+def _ordinal(day: int) -> str:
+    if 11 <= day % 100 <= 13:
+        return "th"
+    return {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+
+
+def shift_plan_dates(plan: str, old_start: date, old_end: date, new_start: date) -> str | None:
+    """
+    Move dates in ``plan`` from the trip starting ``old_start`` to ``new_start``.
+
+    Only dates within the original trip (plus a day either side) are changed,
+    keeping their format. Returns ``None`` when the plan can't be moved safely
+    because it refers to weekdays that would no longer match.
+    """
+    offset = new_start - old_start
+    if offset.days % 7 and _WEEKDAY_PATTERN.search(plan):
+        return None
+    window_start, window_end = old_start - timedelta(days=1), old_end + timedelta(days=1)
+
+    def in_window(value: date) -> bool:
+        return window_start <= value <= window_end
+
+    def replace(match: re.Match) -> str:
+        text = match.group(0)
+        if match.group("iso"):
+            try:
+                value = date.fromisoformat(match.group("iso"))
+            except ValueError:
+                return text
+            return (value + offset).isoformat() if in_window(value) else text
+
+        n = "1" if match.group("m1") else "2"
+        month_name, dot, day_text, suffix, separator, year = (
+            match.group(f"{part}{n}") for part in ("m", "p", "d", "s", "c", "y")
+        )
+        month = _FULL_MONTHS.get(month_name) or _SHORT_MONTHS[month_name]
+        try:
+            if year:
+                value = date(int(year), month, int(day_text))
+            else:
+                value = date(old_start.year, month, int(day_text))
+                if value < window_start:
+                    value = date(old_start.year + 1, month, int(day_text))
+        except ValueError:
+            return text
+        if not in_window(value):
+            return text
+
+        moved = value + offset
+        names = calendar.month_name if month_name in _FULL_MONTHS else calendar.month_abbr
+        month_out = names[moved.month] + (dot or "")
+        day_out = f"{moved.day:0{len(day_text)}d}" + (_ordinal(moved.day) if suffix else "")
+        year_out = f"{separator}{moved.year}" if year else ""
+        return f"{month_out} {day_out}{year_out}" if n == "1" else f"{day_out} {month_out}{year_out}"
+
+    return _DATE_PATTERN.sub(replace, plan)
+
+
+def get_cached_plan(payload: ItineraryRequest) -> str | None:
+    """Return a cached plan for an equivalent request, moved to ``payload``'s dates."""
+    entry = cache.get(plan_cache_key(payload))
+    if entry is None:
+        return None
+
+    plan = shift_plan_dates(
+        entry["plan"],
+        date.fromisoformat(entry["start_date"]),
+        date.fromisoformat(entry["end_date"]),
+        date.fromisoformat(payload.start_date),
+    )
+    if plan is None:
+        LOGGER.info("Cached itinerary for %s names weekdays; generating for the new dates", payload.destination)
+        return None
+    LOGGER.info("Serving cached itinerary for %s", payload.destination)
+    return plan
+
+
+def store_plan(payload: ItineraryRequest, plan: str) -> None:
+    cache.set(
+        plan_cache_key(payload),
+        {"plan": plan, "start_date": payload.start_date, "end_date": payload.end_date},
+        _ttl(),
+    )
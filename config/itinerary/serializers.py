@@ -29,6 +29,23 @@ class ItinerarySerializer(serializers.ModelSerializer):
         return dict(Itinerary.STYLE_CHOICES).get(obj.preference, obj.preference)
 
 
+class ItineraryListSerializer(serializers.ModelSerializer):
+    """Lightweight list representation; the plan itself is only served on detail."""
+
+    # Model columns the list needs; pass to QuerySet.only()
+    COLUMNS = ("id", "destination", "start_date", "end_date", "preference", "created_at")
+
+    style_label = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Itinerary
+        fields = ["id", "destination", "start_date", "end_date", "preference", "style_label", "created_at"]
+        read_only_fields = fields
+
+    def get_style_label(self, obj) -> str:
+        return dict(Itinerary.STYLE_CHOICES).get(obj.preference, obj.preference)
+
+
 class ItineraryCreateSerializer(serializers.Serializer):
     destination = serializers.CharField()
     start_date = serializers.DateField()
@@ -41,6 +58,7 @@ class ItineraryCreateSerializer(serializers.Serializer):
         default=Itinerary.STYLE_GENERAL,
     )
     action = serializers.ChoiceField(choices=["preview", "save"], default="preview")
+    fresh = serializers.BooleanField(default=False, help_text="Skip the plan cache and always generate.")
 
     def validate(self, data):
         if data["end_date"] < data["start_date"]:
@@ -71,3 +89,11 @@ class ItineraryUpdateSerializer(serializers.ModelSerializer):
         if start and end and end < start:
             raise serializers.ValidationError({"end_date": "End date must be on or after the start date."})
         return data
+
+
+class ItineraryDaysRegenerateSerializer(serializers.Serializer):
+    days = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+    instructions = serializers.CharField(allow_blank=True, default="")
+    interests = serializers.CharField(allow_blank=True, required=False)
+    activities = serializers.CharField(allow_blank=True, required=False)
+    food_preferences = serializers.CharField(allow_blank=True, required=False)
@@ -2,12 +2,17 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import logging
-import json
+from datetime import timedelta
+from typing import Iterator
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 
+from core.log import LogPayload, log_payload
+
 from .models import Itinerary
+from .plan_cache import get_cached_plan, store_plan
+from .utils import join_plan, split_plan
 
 
 LOGGER = logging.getLogger(__name__)
@@ -122,19 +127,11 @@ def _build_prompt(payload: ItineraryRequest) -> str:
     )
 
 
-def generate_itinerary(payload: ItineraryRequest) -> tuple[str, str]:
-    """
-    Call OpenAI to create an itinerary.
-
-    Returns a tuple of (prompt, itinerary_text).
-    """
+def _openai_client():
     api_key = getattr(settings, "OPENAI_API_KEY", None)
     if not api_key:
         raise ImproperlyConfigured("OPENAI_API_KEY is not configured.")
 
-    model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
-    prompt = _build_prompt(payload)
-
     try:
         from openai import OpenAI
     except ImportError as exc:
@@ -142,48 +139,43 @@ def generate_itinerary(payload: ItineraryRequest) -> tuple[str, str]:
             "OpenAI SDK is not installed. Add 'openai' to your dependencies."
         ) from exc
 
-    client = OpenAI(api_key=api_key)
+    return OpenAI(api_key=api_key)
 
-    try:
-        system_prompt = SYSTEM_PROMPTS.get(
-            payload.preference,
-            SYSTEM_PROMPTS[Itinerary.STYLE_GENERAL],
-        )
 
-        LOGGER.debug(
-            "OpenAI request: %s",
-            json.dumps(
-                {
-                    "model": model,
-                    "input": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": prompt},
-                    ],
-                },
-                ensure_ascii=False,
-            ),
-        )
+def _build_input(payload: ItineraryRequest) -> tuple[str, list[dict[str, str]]]:
+    """Return the user prompt and the full message list sent to OpenAI."""
+    prompt = _build_prompt(payload)
+    system_prompt = SYSTEM_PROMPTS.get(
+        payload.preference,
+        SYSTEM_PROMPTS[Itinerary.STYLE_GENERAL],
+    )
+    return prompt, [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt},
+    ]
 
-        response = client.responses.create(
-            model=model,
-            input=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt},
-            ],
-        )
+
+def _complete(client, model: str, messages: list[dict[str, str]]) -> str:
+    """Send ``messages`` to OpenAI and return the stripped output text."""
+    try:
+        if log_payload(LOGGER):
+            LOGGER.debug("OpenAI request: %s", LogPayload({"model": model, "input": messages}))
+
+        response = client.responses.create(model=model, input=messages)
     except Exception as exc:
         raise ItineraryGenerationError(str(exc)) from exc
 
-    try:
-        if hasattr(response, "model_dump"):
-            response_payload = response.model_dump()
-        elif hasattr(response, "to_dict"):
-            response_payload = response.to_dict()
-        else:
-            response_payload = str(response)
-        LOGGER.debug("OpenAI response: %s", json.dumps(response_payload, ensure_ascii=False))
-    except Exception:
-        LOGGER.debug("OpenAI response (unserializable): %r", response)
+    if log_payload(LOGGER):
+        try:
+            if hasattr(response, "model_dump"):
+                response_payload = response.model_dump()
+            elif hasattr(response, "to_dict"):
+                response_payload = response.to_dict()
+            else:
+                response_payload = str(response)
+            LOGGER.debug("OpenAI response: %s", LogPayload(response_payload))
+        except Exception:
+            LOGGER.debug("OpenAI response (unserializable): %r", response)
 
     itinerary_text = getattr(response, "output_text", None)
     if not itinerary_text:
@@ -198,4 +190,152 @@ def generate_itinerary(payload: ItineraryRequest) -> tuple[str, str]:
     if not itinerary_text:
         raise ItineraryGenerationError("Received an empty response from OpenAI.")
 
-    return prompt, itinerary_text.strip()
+    return itinerary_text.strip()
+
+
+def generate_itinerary(payload: ItineraryRequest, fresh: bool = False) -> tuple[str, str]:
+    """
+    Call OpenAI to create an itinerary.
+
+    An equivalent earlier request's plan is reused (moved to the new dates)
+    unless ``fresh`` is set. Returns a tuple of (prompt, itinerary_text).
+    """
+    prompt, messages = _build_input(payload)
+    if not fresh:
+        cached = get_cached_plan(payload)
+        if cached is not None:
+            return prompt, cached
+
+    client = _openai_client()
+    model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
+    plan = _complete(client, model, messages)
+    store_plan(payload, plan)
+    return prompt, plan
+
+
+def _build_days_prompt(itinerary: Itinerary, day_numbers: list[int], instructions: str) -> str:
+    sections = itinerary.plan_sections
+    days = {day["day"]: day["text"].strip() for day in sections.get("days", [])}
+    wanted = set(day_numbers)
+
+    # Neighbouring days that are kept as they are, so the new days flow into them.
+    context_days = sorted(
+        {n for d in wanted for n in (d - 1, d + 1) if n in days and n not in wanted}
+    )
+    context = "\n\n".join(days[n] for n in context_days) or "(none)"
+    day_list = ", ".join(
+        f"Day {n} ({itinerary.start_date + timedelta(days=n - 1):%A %Y-%m-%d})" for n in sorted(wanted)
+    )
+    first_day = sections["days"][0]["text"]
+    heading = first_day[: len(first_day) - len(first_day.lstrip("#"))] or "##"
+
+    payload = ItineraryRequest(
+        destination=itinerary.destination,
+        start_date=itinerary.start_date.strftime("%Y-%m-%d"),
+        end_date=itinerary.end_date.strftime("%Y-%m-%d"),
+        interests=itinerary.interests,
+        activities=itinerary.activities,
+        food_preferences=itinerary.food_preferences,
+        preference=itinerary.preference,
+    )
+    return (
+        f"{_build_prompt(payload)}\n\n"
+        f"The rest of the itinerary is already planned. Rewrite only {day_list}.\n"
+        f"Start each day with a '{heading} Day N: <theme>' heading and use the same "
+        "Morning / Afternoon / Evening structure. Do not repeat places from the "
+        "neighbouring days below, and keep transitions to them practical. Do not add "
+        "an introduction or a trip summary.\n"
+        + (f"Traveler's notes for these days: {instructions.strip()}\n" if instructions.strip() else "")
+        + f"\nNeighbouring days (unchanged):\n{context}"
+    )
+
+
+def regenerate_days(itinerary: Itinerary, day_numbers: list[int], instructions: str = "") -> str:
+    """
+    Regenerate selected days of a saved itinerary and splice them into its plan.
+
+    Only the requested days are generated; the days around them are sent as
+    context. Returns the new full plan without saving; ``itinerary`` is
+    updated in place.
+    """
+    known = set(itinerary.day_numbers)
+    missing = sorted(set(day_numbers) - known)
+    if missing:
+        raise ItineraryGenerationError(
+            f"The itinerary has no Day {', '.join(map(str, missing))} section to regenerate."
+        )
+
+    client = _openai_client()
+    model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
+    prompt = _build_days_prompt(itinerary, day_numbers, instructions)
+    system_prompt = SYSTEM_PROMPTS.get(itinerary.preference, SYSTEM_PROMPTS[Itinerary.STYLE_GENERAL])
+    text = _complete(
+        client,
+        model,
+        [{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}],
+    )
+
+    generated = {day["day"]: day["text"] for day in split_plan(text)["days"]}
+    not_returned = sorted(set(day_numbers) - set(generated))
+    if not_returned:
+        raise ItineraryGenerationError(
+            f"OpenAI did not return Day {', '.join(map(str, not_returned))}; the itinerary was left unchanged."
+        )
+
+    sections = itinerary.plan_sections
+    sections["days"] = [
+        {"day": day["day"], "text": generated[day["day"]] if day["day"] in day_numbers else day["text"]}
+        for day in sections["days"]
+    ]
+    itinerary.generated_plan = join_plan(sections)
+    itinerary.plan_sections = split_plan(itinerary.generated_plan)
+    return itinerary.generated_plan
+
+
+def stream_itinerary(payload: ItineraryRequest, fresh: bool = False) -> tuple[str, Iterator[str]]:
+    """
+    Like :func:`generate_itinerary`, but stream the text as OpenAI produces it.
+
+    Returns a tuple of (prompt, chunks); a cached plan is a single chunk. The
+    request is sent before returning, so configuration and connection errors
+    are raised here; errors reported mid-stream are raised as
+    ``ItineraryGenerationError`` while iterating.
+    """
+    prompt, messages = _build_input(payload)
+    if not fresh:
+        cached = get_cached_plan(payload)
+        if cached is not None:
+            return prompt, iter([cached])
+
+    client = _openai_client()
+    model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
+
+    try:
+        if log_payload(LOGGER):
+            LOGGER.debug("OpenAI streaming request: %s", LogPayload({"model": model, "input": messages}))
+        stream = client.responses.create(model=model, input=messages, stream=True)
+    except Exception as exc:
+        raise ItineraryGenerationError(str(exc)) from exc
+
+    def chunks() -> Iterator[str]:
+        parts: list[str] = []
+        try:
+            for event in stream:
+                if event.type == "response.output_text.delta":
+                    parts.append(event.delta)
+                    yield event.delta
+                elif event.type == "error":
+                    raise ItineraryGenerationError(getattr(event, "message", "") or "OpenAI stream failed.")
+                elif event.type == "response.failed":
+                    error = getattr(event.response, "error", None)
+                    raise ItineraryGenerationError(getattr(error, "message", "") or "OpenAI stream failed.")
+        except ItineraryGenerationError:
+            raise
+        except Exception as exc:
+            raise ItineraryGenerationError(str(exc)) from exc
+
+        plan = "".join(parts).strip()
+        if plan:
+            store_plan(payload, plan)
+
+    return prompt, chunks()
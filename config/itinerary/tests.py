@@ -1,9 +1,25 @@
+import json
+import threading
+import time
+
+from datetime import date, timedelta
+from types import SimpleNamespace
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.urls import reverse
-from django.test import TestCase
-from unittest.mock import patch
+from django.utils import timezone
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest.mock import MagicMock, patch
 
-from .models import Itinerary
+from . import event_cache
+from .eventbrite import fetch_events, normalize_destinations
+from .models import Itinerary, ItineraryEvents
+from .plan_cache import shift_plan_dates
+from .services import ItineraryGenerationError, ItineraryRequest, generate_itinerary, stream_itinerary
+from .utils import join_plan, render_markdown, split_plan
 
 User = get_user_model()
 
@@ -129,6 +145,34 @@ class ItineraryCreateViewTests(TestCase):
         mock_generate.assert_called_once()
         mock_events.assert_called_once()
 
+    def test_preview_generates_and_fetches_events_concurrently(self):
+        # Each side waits for the other, so running them one after the other would time out.
+        both_running = threading.Barrier(2, timeout=5)
+
+        def generate(payload, fresh=False):
+            both_running.wait()
+            return "Prompt", "Plan body"
+
+        def events(*args):
+            both_running.wait()
+            return [{"name": "Art Expo"}]
+
+        with patch("itinerary.views.generate_itinerary", side_effect=generate), patch(
+            "itinerary.views.fetch_events", side_effect=events
+        ):
+            self.client.post(self.url, {**self._valid_payload(), "action": "preview"})
+        with patch("itinerary.api_views.generate_itinerary", side_effect=generate), patch(
+            "itinerary.api_views.fetch_events", side_effect=events
+        ):
+            response = self.client.post(
+                "/api/v1/itineraries/create/",
+                {**self._valid_payload(), "action": "preview"},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.json()["events"], [{"name": "Art Expo"}])
+        self.assertEqual(self.client.session["pending_itinerary"]["generated_plan"], "Plan body")
+
     @patch("itinerary.views.fetch_events", return_value=[])
     @patch("itinerary.views.generate_itinerary")
     def test_save_requires_login(self, mock_generate, mock_events):
@@ -153,7 +197,8 @@ class ItineraryCreateViewTests(TestCase):
         self.assertRedirects(response, reverse("itinerary:detail", args=[itinerary.pk]))
         self.assertEqual(itinerary.generated_plan, "Saved plan")
         mock_generate.assert_called_once()
-        mock_events.assert_called_once()
+        # The detail page serves stored events and refreshes them in the background.
+        mock_events.assert_not_called()
 
     @patch(
         "itinerary.views.fetch_events",
@@ -183,6 +228,95 @@ class ItineraryCreateViewTests(TestCase):
         self.assertEqual(itinerary.generated_plan, "Plan preview")
 
 
+class ItineraryStreamApiTests(TestCase):
+    url = "/api/v1/itineraries/create/stream/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="streamer", password="StrongPass123!")
+        self.payload = {
+            "destination": "Lisbon",
+            "start_date": "2025-10-01",
+            "end_date": "2025-10-03",
+            "preference": Itinerary.STYLE_GENERAL,
+        }
+
+    def _events(self, response):
+        body = b"".join(response.streaming_content).decode()
+        events = []
+        for block in body.strip().split("\n\n"):
+            name, data = block.split("\n")
+            events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+        return events
+
+    @patch("itinerary.api_views.fetch_events", return_value=[{"name": "Fado night"}])
+    @patch("itinerary.api_views.stream_itinerary", return_value=("Prompt", iter(["Day 1: ", "Alfama"])))
+    def test_anonymous_stream_stores_preview_when_complete(self, mock_stream, mock_events):
+        response = self.client.post(self.url, self.payload, content_type="application/json")
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = self._events(response)
+        self.assertEqual(events[:2], [("delta", {"text": "Day 1: "}), ("delta", {"text": "Alfama"})])
+        self.assertEqual(events[2][0], "done")
+        self.assertEqual(events[2][1]["generated_plan"], "Day 1: Alfama")
+
+        preview = self.client.get("/api/v1/itineraries/preview/").json()
+        self.assertEqual(preview["generated_plan"], "Day 1: Alfama")
+        self.assertEqual(preview["events"], [{"name": "Fado night"}])
+
+    @patch("itinerary.api_views.stream_itinerary", return_value=("Prompt", iter(["Day 1: ", "Belem"])))
+    def test_authenticated_stream_saves_itinerary_at_the_end(self, mock_stream):
+        self.client.login(username="streamer", password="StrongPass123!")
+        response = self.client.post(self.url, self.payload, content_type="application/json")
+        self.assertFalse(Itinerary.objects.exists())
+
+        events = self._events(response)
+        itinerary = Itinerary.objects.get(user=self.user)
+        self.assertEqual(itinerary.generated_plan, "Day 1: Belem")
+        self.assertEqual(events[-1][0], "done")
+        self.assertEqual(events[-1][1]["id"], itinerary.pk)
+
+    @patch("itinerary.api_views.stream_itinerary")
+    def test_failure_mid_stream_sends_error_and_saves_nothing(self, mock_stream):
+        def chunks():
+            yield "Day 1"
+            raise ItineraryGenerationError("rate limited")
+
+        mock_stream.return_value = ("Prompt", chunks())
+        self.client.login(username="streamer", password="StrongPass123!")
+        response = self.client.post(self.url, self.payload, content_type="application/json")
+
+        self.assertEqual(self._events(response)[-1], ("error", {"error": "rate limited"}))
+        self.assertFalse(Itinerary.objects.exists())
+
+    @override_settings(OPENAI_API_KEY="sk-test")
+    @patch("openai.OpenAI")
+    def test_stream_itinerary_yields_text_deltas(self, mock_openai):
+        mock_openai.return_value.responses.create.return_value = [
+            SimpleNamespace(type="response.created"),
+            SimpleNamespace(type="response.output_text.delta", delta="Day 1"),
+            SimpleNamespace(type="response.output_text.delta", delta=": Sintra"),
+            SimpleNamespace(type="response.failed", response=SimpleNamespace(error=SimpleNamespace(message="boom"))),
+        ]
+        prompt, chunks = stream_itinerary(ItineraryRequest("Lisbon", "2025-10-01", "2025-10-03"))
+
+        self.assertIn("Lisbon", prompt)
+        self.assertEqual(next(chunks), "Day 1")
+        self.assertEqual(next(chunks), ": Sintra")
+        with self.assertRaisesMessage(ItineraryGenerationError, "boom"):
+            next(chunks)
+        self.assertTrue(mock_openai.return_value.responses.create.call_args.kwargs["stream"])
+
+    @patch("itinerary.api_views.stream_itinerary")
+    def test_event_stream_clients_get_validation_errors_as_events(self, mock_stream):
+        response = self.client.post(
+            self.url, {"destination": "Lisbon"}, content_type="application/json", HTTP_ACCEPT="text/event-stream"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.content.startswith(b"event: error\n"))
+        mock_stream.assert_not_called()
+
+
 class ItineraryDeleteViewTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(username="traveler", password="StrongPass123!")
@@ -214,3 +348,401 @@ class ItineraryDeleteViewTests(TestCase):
         response = self.client.post(reverse("itinerary:delete", args=[self.itinerary.pk]))
         self.assertRedirects(response, reverse("core:home"))
         self.assertFalse(Itinerary.objects.filter(pk=self.itinerary.pk).exists())
+
+
+@override_settings(OPENAI_API_KEY="sk-test")
+class PlanCacheTests(SimpleTestCase):
+    plan = "## Day 1 (June 1, 2025)\nGelato\n\n## Day 2 (June 2nd)\nMuseums, then 2025-06-02 night market"
+
+    def setUp(self):
+        cache.clear()
+
+    def _request(self, start="2025-06-01", end="2025-06-02", **overrides):
+        fields = {"destination": "Florence, Italy", "interests": "Food and museums", **overrides}
+        return ItineraryRequest(start_date=start, end_date=end, **fields)
+
+    @patch("openai.OpenAI")
+    def test_equivalent_request_is_served_from_cache_with_moved_dates(self, mock_openai):
+        create = mock_openai.return_value.responses.create
+        create.return_value = SimpleNamespace(output_text=self.plan)
+        generate_itinerary(self._request())
+
+        prompt, plan = generate_itinerary(
+            self._request("2025-06-15", "2025-06-16", destination="florence", interests="museums, FOOD")
+        )
+
+        create.assert_called_once()
+        self.assertIn("2025-06-15 to 2025-06-16", prompt)
+        self.assertEqual(
+            plan, "## Day 1 (June 15, 2025)\nGelato\n\n## Day 2 (June 16th)\nMuseums, then 2025-06-16 night market"
+        )
+
+    @patch("openai.OpenAI")
+    def test_fresh_and_different_requests_generate(self, mock_openai):
+        create = mock_openai.return_value.responses.create
+        create.return_value = SimpleNamespace(output_text=self.plan)
+        generate_itinerary(self._request())
+
+        generate_itinerary(self._request(), fresh=True)
+        generate_itinerary(self._request(end="2025-06-03"))  # longer trip
+        generate_itinerary(self._request("2025-12-01", "2025-12-02"))  # different season
+        generate_itinerary(self._request(food_preferences="vegan"))
+
+        self.assertEqual(create.call_count, 5)
+
+    def test_weekday_plans_only_move_by_whole_weeks(self):
+        plan = "Day 1 (June 1): Sunday market"
+        self.assertIsNone(shift_plan_dates(plan, date(2025, 6, 1), date(2025, 6, 2), date(2025, 6, 3)))
+        self.assertEqual(
+            shift_plan_dates(plan, date(2025, 6, 1), date(2025, 6, 2), date(2025, 6, 8)),
+            "Day 1 (June 8): Sunday market",
+        )
+
+
+class StoredPlanHtmlTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="reader", password="StrongPass123!")
+
+    def _create(self, plan="## Day 1\n- Duomo"):
+        return Itinerary.objects.create(
+            user=self.user,
+            destination="Milan",
+            start_date="2025-03-01",
+            end_date="2025-03-02",
+            prompt="Prompt",
+            generated_plan=plan,
+        )
+
+    def test_plan_is_rendered_once_at_save(self):
+        with patch("itinerary.models.render_markdown", wraps=render_markdown) as mock_render:
+            itinerary = self._create()
+            self.assertEqual(mock_render.call_count, 1)
+
+            loaded = Itinerary.objects.get(pk=itinerary.pk)
+            self.assertIn("<li>Duomo</li>", loaded.rendered_plan)
+            loaded.interests = "Design"
+            loaded.save()
+            self.assertEqual(mock_render.call_count, 1)
+
+            loaded.generated_plan = "## Day 1\n- Navigli"
+            loaded.save()
+            self.assertEqual(mock_render.call_count, 2)
+        self.assertIn("Navigli", Itinerary.objects.get(pk=itinerary.pk).plan_html)
+
+    def test_new_renderer_version_rerenders_lazily_and_persists(self):
+        itinerary = self._create()
+        with patch("itinerary.models.renderer_version", return_value="99:test"), patch(
+            "itinerary.models.render_markdown", return_value="<p>new</p>"
+        ) as mock_render:
+            loaded = Itinerary.objects.get(pk=itinerary.pk)
+            self.assertEqual(loaded.rendered_plan, "<p>new</p>")
+            self.assertEqual(Itinerary.objects.get(pk=itinerary.pk).rendered_plan, "<p>new</p>")
+        mock_render.assert_called_once()
+        self.assertEqual(Itinerary.objects.get(pk=itinerary.pk).plan_html_renderer, "99:test")
+
+
+class ItineraryListApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="collector", password="StrongPass123!")
+        for n in range(5):
+            Itinerary.objects.create(
+                user=self.user,
+                destination=f"City {n}",
+                start_date="2025-01-01",
+                end_date="2025-01-02",
+                prompt="Prompt",
+                generated_plan="x" * 20_000,
+            )
+        self.client.login(username="collector", password="StrongPass123!")
+
+    def test_list_is_cursor_paginated_summaries_without_plans(self):
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get("/api/v1/itineraries/", {"page_size": 3}).json()
+
+        self.assertEqual([it["destination"] for it in first["results"]], ["City 4", "City 3", "City 2"])
+        self.assertEqual(
+            set(first["results"][0]),
+            {"id", "destination", "start_date", "end_date", "preference", "style_label", "created_at"},
+        )
+        itinerary_sql = [q["sql"] for q in queries.captured_queries if "core_itinerary" in q["sql"]]
+        self.assertEqual(len(itinerary_sql), 1)
+        self.assertNotIn("generated_plan", itinerary_sql[0])
+
+        second = self.client.get(first["next"]).json()
+        self.assertEqual([it["destination"] for it in second["results"]], ["City 1", "City 0"])
+        self.assertIsNone(second["next"])
+
+
+class PlanSectionsTests(SimpleTestCase):
+    plan = (
+        "# Kyoto getaway\nA short intro.\n\n"
+        "## Day 1: Temples\n### Morning\n- Kiyomizu-dera\n\n"
+        "## Day 2: Food\n- Nishiki Market\n\n"
+        "## Trip highlights\nTemples and tofu."
+    )
+
+    def test_split_plan_finds_days_and_closing(self):
+        sections = split_plan(self.plan)
+        self.assertEqual(sections["preamble"], "# Kyoto getaway\nA short intro.\n\n")
+        self.assertEqual([day["day"] for day in sections["days"]], [1, 2])
+        self.assertIn("### Morning", sections["days"][0]["text"])
+        self.assertEqual(sections["closing"], "## Trip highlights\nTemples and tofu.")
+        self.assertEqual(join_plan(sections), self.plan)
+
+    def test_plan_without_day_headings_is_all_preamble(self):
+        sections = split_plan("Day 1: Louvre\nDay 2: Eiffel Tower")
+        self.assertEqual(sections["days"], [])
+        self.assertEqual(join_plan(sections), "Day 1: Louvre\nDay 2: Eiffel Tower")
+
+
+@override_settings(OPENAI_API_KEY="sk-test")
+class ItineraryRegenerateDaysApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="dayplanner", password="StrongPass123!")
+        self.itinerary = Itinerary.objects.create(
+            user=self.user,
+            destination="Rome",
+            start_date=date(2025, 4, 1),
+            end_date=date(2025, 4, 3),
+            food_preferences="Anything",
+            prompt="Prompt",
+            generated_plan=(
+                "Intro\n\n## Day 1: Ancient Rome\nColosseum\n\n"
+                "## Day 2: Vatican\nSt Peter's\n\n## Day 3: Trastevere\nGelato\n\n## Summary\nCiao"
+            ),
+        )
+        self.url = f"/api/v1/itineraries/{self.itinerary.pk}/days/regenerate/"
+        self.client.login(username="dayplanner", password="StrongPass123!")
+
+    @patch("openai.OpenAI")
+    def test_only_requested_day_is_regenerated_with_neighbours_as_context(self, mock_openai):
+        create = mock_openai.return_value.responses.create
+        create.return_value = SimpleNamespace(output_text="## Day 2: Vegan Vatican\nPlant-based lunch")
+
+        response = self.client.post(
+            self.url, {"days": [2], "food_preferences": "Vegan"}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.itinerary.refresh_from_db()
+        self.assertEqual(
+            self.itinerary.generated_plan,
+            "Intro\n\n## Day 1: Ancient Rome\nColosseum\n\n"
+            "## Day 2: Vegan Vatican\nPlant-based lunch\n\n## Day 3: Trastevere\nGelato\n\n## Summary\nCiao",
+        )
+        self.assertEqual(self.itinerary.food_preferences, "Vegan")
+        self.assertEqual(self.itinerary.plan_sections["days"][1]["text"].split("\n")[0], "## Day 2: Vegan Vatican")
+
+        prompt = create.call_args.kwargs["input"][1]["content"]
+        self.assertIn("Day 2 (Wednesday 2025-04-02)", prompt)
+        self.assertIn("Colosseum", prompt)
+        self.assertIn("Gelato", prompt)
+        self.assertNotIn("St Peter's", prompt)
+        self.assertIn("Vegan", prompt)
+
+    @patch("openai.OpenAI")
+    def test_unknown_day_is_rejected_without_calling_openai(self, mock_openai):
+        response = self.client.post(self.url, {"days": [5]}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        mock_openai.return_value.responses.create.assert_not_called()
+
+    @patch("openai.OpenAI")
+    def test_plan_is_unchanged_when_the_day_is_missing_from_the_response(self, mock_openai):
+        mock_openai.return_value.responses.create.return_value = SimpleNamespace(output_text="Here you go!")
+        original = self.itinerary.generated_plan
+
+        response = self.client.post(self.url, {"days": [1, 3]}, content_type="application/json")
+
+        self.assertEqual(response.status_code, 500)
+        self.itinerary.refresh_from_db()
+        self.assertEqual(self.itinerary.generated_plan, original)
+
+
+@override_settings(TICKETMASTER_API_KEY="tm-key", OPENAI_API_KEY="", EVENTS_FETCH_DEADLINE=0.5)
+class FetchEventsTests(SimpleTestCase):
+    destination = "Chicago, IL, USA\nDenver, CO, USA\nAustin, TX, USA"
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def _fake_fetch(self, delays):
+        def fetch(destination, **kwargs):
+            delay = delays[destination.city]
+            if delay is None:
+                self.release.wait(5)
+            else:
+                time.sleep(delay)
+            return [{"name": f"{destination.city} show", "requested_city": destination.city}]
+
+        return fetch
+
+    def test_events_follow_destination_order(self):
+        delays = {"Chicago": 0.2, "Denver": 0.1, "Austin": 0.0}
+        with patch("itinerary.eventbrite._fetch_city_events", side_effect=self._fake_fetch(delays)):
+            events = fetch_events(self.destination, "2025-05-01", "2025-05-06")
+
+        self.assertEqual([e["requested_city"] for e in events], ["Chicago", "Denver", "Austin"])
+
+    def test_cities_are_fetched_concurrently_and_slow_ones_skipped(self):
+        delays = {"Chicago": 0.1, "Denver": None, "Austin": 0.1}
+        with patch("itinerary.eventbrite._fetch_city_events", side_effect=self._fake_fetch(delays)):
+            started = time.monotonic()
+            events = fetch_events(self.destination, "2025-05-01", "2025-05-06")
+            elapsed = time.monotonic() - started
+
+        self.assertEqual([e["requested_city"] for e in events], ["Chicago", "Austin"])
+        self.assertLess(elapsed, 1.5)
+
+
+class ItineraryEventCacheTests(TestCase):
+    def setUp(self):
+        event_cache._in_flight.clear()
+        self.user = User.objects.create_user(username="eventgoer", password="StrongPass123!")
+        self.itinerary = Itinerary.objects.create(
+            user=self.user,
+            destination="Chicago, IL, USA",
+            start_date="2025-05-01",
+            end_date="2025-05-03",
+            prompt="Prompt",
+            generated_plan="Day 1: Loop",
+        )
+        self.itinerary.refresh_from_db()
+        self.client.login(username="eventgoer", password="StrongPass123!")
+
+    def _get_detail(self):
+        return self.client.get(f"/api/v1/itineraries/{self.itinerary.pk}/")
+
+    @patch("itinerary.event_cache.fetch_destination_events")
+    @patch("itinerary.event_cache.normalize_destinations")
+    def test_detail_get_serves_stored_events_without_fetching(self, mock_normalize, mock_fetch):
+        event_cache.store_events(self.itinerary, [{"name": "Blues night"}])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self._get_detail()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["events"], [{"name": "Blues night"}])
+        self.assertEqual(callbacks, [])
+        mock_normalize.assert_not_called()
+        mock_fetch.assert_not_called()
+
+    @override_settings(TICKETMASTER_API_KEY="tm-key")
+    @patch("itinerary.event_cache.fetch_destination_events", return_value=[{"name": "Cubs game"}])
+    def test_missing_events_are_refreshed_in_background(self, mock_fetch):
+        with patch.object(event_cache._REFRESH_POOL, "submit") as mock_submit:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self._get_detail()
+
+        self.assertEqual(response.json()["events"], [])
+        mock_fetch.assert_not_called()
+        mock_submit.assert_called_once_with(event_cache._refresh_in_background, self.itinerary.pk)
+
+        event_cache.refresh_events(self.itinerary.pk)
+        cached = ItineraryEvents.objects.get(itinerary=self.itinerary)
+        self.assertEqual(cached.events, [{"name": "Cubs game"}])
+        self.assertEqual(cached.destinations[0]["city"], "Chicago")
+        self.assertEqual(self._get_detail().json()["events"], [{"name": "Cubs game"}])
+
+    def test_stale_events_are_served_while_refreshing(self):
+        event_cache.store_events(self.itinerary, [{"name": "Old show"}])
+        ItineraryEvents.objects.update(fetched_at=timezone.now() - timedelta(days=2))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self._get_detail()
+
+        self.assertEqual(response.json()["events"], [{"name": "Old show"}])
+        self.assertEqual(len(callbacks), 1)
+
+    def test_events_for_old_destination_are_not_served(self):
+        event_cache.store_events(self.itinerary, [{"name": "Blues night"}])
+        Itinerary.objects.filter(pk=self.itinerary.pk).update(destination="Denver, CO, USA")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self._get_detail()
+
+        self.assertEqual(response.json()["events"], [])
+        self.assertEqual(len(callbacks), 1)
+
+    def test_unchanged_detail_is_not_modified_until_edited(self):
+        event_cache.store_events(self.itinerary, [{"name": "Blues night"}])
+        etag = self._get_detail()["ETag"]
+
+        response = self.client.get(f"/api/v1/itineraries/{self.itinerary.pk}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.client.put(
+            f"/api/v1/itineraries/{self.itinerary.pk}/", {"interests": "jazz"}, content_type="application/json"
+        )
+        response = self.client.get(f"/api/v1/itineraries/{self.itinerary.pk}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["itinerary"]["interests"], "jazz")
+
+    def test_detail_without_stored_events_is_always_served(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.get(f"/api/v1/itineraries/{self.itinerary.pk}/", HTTP_IF_NONE_MATCH="*")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertEqual(len(callbacks), 1)
+
+
+@override_settings(OPENAI_API_KEY="test-key")
+class NormalizeDestinationsTests(SimpleTestCase):
+    start = date(2025, 5, 1)
+    end = date(2025, 5, 3)
+
+    def setUp(self):
+        cache.clear()
+
+    def _mock_openai(self, mock_openai, payload):
+        client = MagicMock()
+        client.responses.create.return_value = MagicMock(output_text=payload)
+        mock_openai.return_value = client
+        return client
+
+    @patch("openai.OpenAI")
+    def test_unambiguous_destinations_skip_the_llm(self, mock_openai):
+        for text in ("Paris, France", "Chicago, IL, USA", "London, UK"):
+            with self.subTest(text=text):
+                destinations = normalize_destinations(text, self.start, self.end)
+                self.assertEqual(destinations[0].city, text.split(",")[0])
+        mock_openai.assert_not_called()
+
+    @patch("openai.OpenAI")
+    def test_ambiguous_destinations_use_llm_once_per_text_and_dates(self, mock_openai):
+        client = self._mock_openai(
+            mock_openai,
+            '[{"city":"Chicago","state_code":"IL","country_code":"US",'
+            '"start_date":"2025-05-01","end_date":"2025-05-02"},'
+            '{"city":"Denver","state_code":"CO","country_code":"US",'
+            '"start_date":"2025-05-03","end_date":"2025-05-03"}]',
+        )
+        text = "Chicago for 2 days\nDenver"
+
+        first = normalize_destinations(text, self.start, self.end)
+        second = normalize_destinations(text, self.start, self.end)
+
+        self.assertEqual([d.city for d in first], ["Chicago", "Denver"])
+        self.assertEqual(second, first)
+        client.responses.create.assert_called_once()
+
+        normalize_destinations(text, self.start, date(2025, 5, 4))
+        self.assertEqual(client.responses.create.call_count, 2)
+
+    @patch("openai.OpenAI")
+    def test_unknown_city_with_two_letter_suffix_uses_llm(self, mock_openai):
+        client = self._mock_openai(mock_openai, "not json")
+        destinations = normalize_destinations("Springfield, IL", self.start, self.end)
+
+        client.responses.create.assert_called_once()
+        self.assertEqual(destinations[0].city, "Springfield")
+
+    @patch("openai.OpenAI")
+    def test_gazetteer_resolves_state_and_country_offline(self, mock_openai):
+        chicago = normalize_destinations("Chicago, IL", self.start, self.end)[0]
+        vancouver = normalize_destinations("Vancouver, BC", self.start, self.end)[0]
+
+        self.assertEqual((chicago.city, chicago.state, chicago.country), ("Chicago", "IL", "US"))
+        self.assertEqual((vancouver.city, vancouver.state, vancouver.country), ("Vancouver", None, "CA"))
+        mock_openai.assert_not_called()
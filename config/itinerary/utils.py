@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import hashlib
+import re
+from functools import lru_cache
+
 from django.utils.html import escape
 from django.utils.safestring import mark_safe
 
@@ -100,6 +104,24 @@ def _basic_markdown_to_html(text: str) -> str:
     return "".join(html_parts)
 
 
+# Bump when render_markdown's output changes so stored HTML is re-rendered.
+RENDERER_REVISION = 1
+
+
+@lru_cache(maxsize=1)
+def renderer_version() -> str:
+    """Identifies the renderer behind :func:`render_markdown` (revision + backend)."""
+    try:
+        import markdown
+    except ImportError:
+        return f"{RENDERER_REVISION}:basic"
+    return f"{RENDERER_REVISION}:markdown-{markdown.__version__}"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
 def render_markdown(text: str) -> str:
     """Convert markdown text to safe HTML for template rendering."""
     if not text:
@@ -113,3 +135,47 @@ def render_markdown(text: str) -> str:
         html = markdown.markdown(text, extensions=["extra", "sane_lists"])
 
     return mark_safe(html)
+
+
+# "## Day 3: ...", "### Day 3", "**Day 3 - ...**"
+_DAY_HEADING = re.compile(r"^(#{1,4}|\*\*)\s*Day\s+(\d+)\b", re.IGNORECASE | re.MULTILINE)
+_HEADING = re.compile(r"^(#{1,4})\s+\S", re.MULTILINE)
+
+
+def split_plan(text: str) -> dict:
+    """
+    Split a generated plan into ``{"preamble", "days", "closing"}`` sections.
+
+    ``days`` is a list of ``{"day": n, "text": markdown}`` in document order,
+    each starting with its "Day n" heading. ``closing`` is anything after the
+    last day that starts with a non-day heading at the same or a higher level
+    (e.g. "## Trip highlights"). Joining the sections reproduces the plan.
+    """
+    text = text or ""
+    matches = list(_DAY_HEADING.finditer(text))
+    if not matches:
+        return {"preamble": text, "days": [], "closing": ""}
+
+    closing_at = len(text)
+    day_marker = matches[-1].group(1)
+    if day_marker.startswith("#"):
+        for heading in _HEADING.finditer(text, matches[-1].end()):
+            if len(heading.group(1)) <= len(day_marker):
+                closing_at = heading.start()
+                break
+
+    days = []
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else closing_at
+        days.append({"day": int(match.group(2)), "text": text[match.start():end]})
+    return {"preamble": text[: matches[0].start()], "days": days, "closing": text[closing_at:]}
+
+
+def join_plan(sections: dict) -> str:
+    """Inverse of :func:`split_plan`."""
+    parts = [sections.get("preamble", "")]
+    for day in sections.get("days", []):
+        text = day["text"]
+        parts.append(text if text.endswith("\n\n") else text.rstrip("\n") + "\n\n")
+    parts.append(sections.get("closing", ""))
+    return "".join(parts).strip()
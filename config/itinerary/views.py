@@ -6,7 +6,8 @@ from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ImproperlyConfigured
 from django.shortcuts import get_object_or_404, redirect, render
 
-from .eventbrite import fetch_events
+from .event_cache import cached_events, store_events
+from .eventbrite import PREVIEW_EVENTS_POOL, fetch_events
 from .forms import ItineraryForm, ItineraryUpdateForm
 from .models import Itinerary
 from .services import ItineraryGenerationError, ItineraryRequest, generate_itinerary
@@ -20,12 +21,8 @@ LOGGER = logging.getLogger(__name__)
 @login_required
 def itinerary_detail(request, pk: int):
     """Display a generated itinerary."""
-    itinerary = get_object_or_404(Itinerary, pk=pk, user=request.user)
-    events = fetch_events(
-        itinerary.destination,
-        itinerary.start_date.strftime("%Y-%m-%d"),
-        itinerary.end_date.strftime("%Y-%m-%d"),
-    )
+    itinerary = get_object_or_404(Itinerary.objects.select_related("event_cache"), pk=pk, user=request.user)
+    events = cached_events(itinerary)
     return render(request, "itinerary/detail.html", {"itinerary": itinerary, "events": events})
 
 
@@ -62,14 +59,19 @@ def create_itinerary(request):
                 food_preferences=itinerary.food_preferences,
                 preference=itinerary.preference,
             )
+            should_save = action == "save" or (request.user.is_authenticated and action == "preview")
+            is_preview = not (should_save and request.user.is_authenticated)
+            # Previews show events too; fetch them while the plan is being generated.
+            if is_preview:
+                events_future = PREVIEW_EVENTS_POOL.submit(
+                    fetch_events, payload.destination, payload.start_date, payload.end_date
+                )
             try:
-                prompt, plan = generate_itinerary(payload)
+                prompt, plan = generate_itinerary(payload, fresh=bool(request.POST.get("fresh")))
             except (ImproperlyConfigured, ItineraryGenerationError) as exc:
                 form.add_error(None, str(exc))
             else:
-                should_save = action == "save" or (request.user.is_authenticated and action == "preview")
-
-                if should_save and request.user.is_authenticated:
+                if not is_preview:
                     itinerary.user = request.user
                     itinerary.prompt = prompt
                     itinerary.generated_plan = plan
@@ -77,11 +79,7 @@ def create_itinerary(request):
                     messages.success(request, "Itinerary created successfully.")
                     return redirect("itinerary:detail", pk=itinerary.pk)
 
-                events = fetch_events(
-                    itinerary.destination,
-                    itinerary.start_date.strftime("%Y-%m-%d"),
-                    itinerary.end_date.strftime("%Y-%m-%d"),
-                )
+                events = events_future.result()
 
                 request.session[PENDING_SESSION_KEY] = {
                     "destination": itinerary.destination,
@@ -138,7 +136,8 @@ def edit_itinerary(request, pk: int):
                     preference=updated_itinerary.preference,
                 )
                 try:
-                    prompt, plan = generate_itinerary(payload)
+                    # The user asked for a new plan, so never hand back a cached one.
+                    prompt, plan = generate_itinerary(payload, fresh=True)
                 except (ImproperlyConfigured, ItineraryGenerationError) as exc:
                     form.add_error(None, str(exc))
                     return render(
@@ -221,6 +220,7 @@ def save_pending_itinerary(request):
         prompt=pending["prompt"],
         generated_plan=pending["generated_plan"],
     )
+    store_events(itinerary, pending.get("events", []))
     LOGGER.info("Saved pending itinerary for %s: %s", request.user, itinerary.pk)
     request.session.pop(PENDING_SESSION_KEY, None)
     messages.success(request, "Itinerary saved to your trips.")
@@ -1,15 +1,84 @@
+from django.utils.decorators import method_decorator
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import QuerySet
+from rest_framework.response import Response
+from django.db.models import Count, Max, QuerySet
 from typing import TYPE_CHECKING
 
+from core.conditional import latest, revalidate, version_etag
+from core.db_router import read_from_replica
+from itinerary.event_cache import events_are_current
+
 from .models import Trip
-from .serializers import TripSerializer
+from .serializers import TripDashboardSerializer, TripSerializer
+
+# Cheapest results per linked search included in the trip dashboard.
+DASHBOARD_TOP_RESULTS = 5
 
 if TYPE_CHECKING:
     from django.contrib.auth.models import User
 
 
+def _trip_list_validators(request):
+    # Counting the links catches searches or itineraries removed via ON DELETE SET NULL.
+    state = Trip.objects.filter(user=request.user).aggregate(
+        trips=Count("id"),
+        itineraries=Count("itinerary"),
+        flights=Count("flight_search"),
+        hotels=Count("hotel_search"),
+        cars=Count("car_rental_search"),
+        updated_at=Max("updated_at"),
+        itinerary_updated_at=Max("itinerary__updated_at"),
+    )
+    return version_etag("trips", *state.values()), latest(state["updated_at"], state["itinerary_updated_at"])
+
+
+# ON DELETE SET NULL clears these with a queryset update that leaves updated_at alone.
+_LINK_FIELDS = ("itinerary_id", "flight_search_id", "hotel_search_id", "car_rental_search_id")
+
+
+def _trip_validators(request, pk=None):
+    row = (
+        Trip.objects.filter(pk=pk, user=request.user)
+        .values_list("updated_at", "itinerary__updated_at", *_LINK_FIELDS)
+        .first()
+    )
+    if row is None:
+        return None
+    return version_etag("trip", pk, *row), latest(*row[:2])
+
+
+def _trip_dashboard_validators(request, pk=None):
+    trip = (
+        Trip.objects.filter(pk=pk, user=request.user)
+        .select_related("itinerary__event_cache")
+        .only(
+            "updated_at", "flight_search", "hotel_search", "car_rental_search", "itinerary__destination", "itinerary__start_date", "itinerary__end_date",
+            "itinerary__updated_at", "itinerary__event_cache__source_key", "itinerary__event_cache__fetched_at",
+        )
+        .first()
+    )
+    if trip is None:
+        return None
+    links = [getattr(trip, field) for field in _LINK_FIELDS]
+    if trip.itinerary is None:
+        return version_etag("trip-dashboard", pk, trip.updated_at, *links), trip.updated_at
+    # Stale or missing events: let the view run so it queues a refresh.
+    if not events_are_current(trip.itinerary):
+        return None
+    itinerary, fetched_at = trip.itinerary, trip.itinerary.event_cache.fetched_at
+    return (
+        version_etag("trip-dashboard", pk, trip.updated_at, itinerary.updated_at, fetched_at, *links),
+        latest(trip.updated_at, itinerary.updated_at, fetched_at),
+    )
+
+
+@method_decorator(read_from_replica, name="list")
+@method_decorator(read_from_replica, name="dashboard")
+@method_decorator(revalidate(_trip_list_validators), name="list")
+@method_decorator(revalidate(_trip_validators), name="retrieve")
+@method_decorator(revalidate(_trip_dashboard_validators), name="dashboard")
 class TripViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Trip model providing CRUD operations.
@@ -20,12 +89,34 @@ class TripViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self) -> QuerySet[Trip]:
         """Filter trips to only return trips belonging to the current user."""
-        return Trip.objects.filter(user=self.request.user).select_related(
+        queryset = Trip.objects.filter(user=self.request.user).select_related(
             "itinerary",
             "flight_search",
+            "hotel_search",
             "car_rental_search",
         )
+        if self.action == "dashboard":
+            queryset = queryset.select_related("itinerary__event_cache")
+        return queryset
 
     def perform_create(self, serializer) -> None:
         """Set the user to the current authenticated user when creating a trip."""
-        serializer.save(user=self.request.user)
\ No newline at end of file
+        serializer.save(user=self.request.user)
+
+    @action(detail=True, methods=["get"])
+    def dashboard(self, request, pk=None):
+        """
+        Everything the trip page shows in one response: the trip, its itinerary
+        and stored events, and the cheapest results of each linked search.
+        Runs one query for the trip plus one per linked search.
+        """
+        trip = self.get_object()
+        for search, ordering in (
+            (trip.flight_search, "price_cents"),
+            (trip.hotel_search, "price_per_night"),
+            (trip.car_rental_search, "price_per_day"),
+        ):
+            if search is not None:
+                # Bounded to the search's fetch window, so only its month's partition is read.
+                search.top_results = list(search.fetched_results().order_by(ordering)[:DASHBOARD_TOP_RESULTS])
+        return Response(TripDashboardSerializer(trip).data)
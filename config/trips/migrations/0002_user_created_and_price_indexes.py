@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0002_user_created_and_price_indexes'),
+        ('flights', '0002_user_created_and_price_indexes'),
+        ('itinerary', '0005_user_created_and_price_indexes'),
+        ('trips', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['user', '-created_at'], name='trip_user_created_idx'),
+        ),
+    ]
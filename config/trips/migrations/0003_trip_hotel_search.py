@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0004_partition_results_by_month'),
+        ('trips', '0002_user_created_and_price_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='hotel_search',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trips', to='hotels.hotelsearch'),
+        ),
+    ]
@@ -23,14 +23,13 @@ class Trip(models.Model):
         on_delete=models.SET_NULL,
         related_name="trips"
     )
-    # Note: hotel_search field is commented out because hotels app doesn't exist yet
-    # hotel_search = models.ForeignKey(
-    #     "hotels.HotelSearch",
-    #     null=True,
-    #     blank=True,
-    #     on_delete=models.SET_NULL,
-    #     related_name="trips"
-    # )
+    hotel_search = models.ForeignKey(
+        "hotels.HotelSearch",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="trips"
+    )
     car_rental_search = models.ForeignKey(
         "cars.CarRentalSearch",
         null=True,
@@ -43,6 +42,7 @@ class Trip(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["user", "-created_at"], name="trip_user_created_idx")]
 
     def __str__(self):
         return self.title or f"Trip #{self.pk}"
\ No newline at end of file
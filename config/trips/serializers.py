@@ -1,8 +1,10 @@
 from rest_framework import serializers
 from .models import Trip
+from itinerary.event_cache import cached_events
 from itinerary.models import Itinerary
-from flights.models import FlightSearch
-from cars.models import CarRentalSearch
+from flights.models import FlightResult, FlightSearch
+from hotels.models import HotelResult, HotelSearch
+from cars.models import CarRentalResult, CarRentalSearch
 
 
 class ItineraryNestedSerializer(serializers.ModelSerializer):
@@ -21,6 +23,14 @@ class FlightSearchNestedSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "natural_query"]
 
 
+class HotelSearchNestedSerializer(serializers.ModelSerializer):
+    """Read-only nested serializer for HotelSearch"""
+    class Meta:
+        model = HotelSearch
+        fields = ["id", "natural_query", "location"]
+        read_only_fields = ["id", "natural_query", "location"]
+
+
 class CarRentalSearchNestedSerializer(serializers.ModelSerializer):
     """Read-only nested serializer for CarRentalSearch"""
     class Meta:
@@ -33,11 +43,13 @@ class TripSerializer(serializers.ModelSerializer):
     """Full Trip serializer with nested related objects"""
     itinerary = ItineraryNestedSerializer(read_only=True)
     flight_search = FlightSearchNestedSerializer(read_only=True)
+    hotel_search = HotelSearchNestedSerializer(read_only=True)
     car_rental_search = CarRentalSearchNestedSerializer(read_only=True)
 
     # Write-only fields for setting foreign key relationships
     itinerary_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
     flight_search_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
+    hotel_search_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
     car_rental_search_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
 
     class Meta:
@@ -48,9 +60,11 @@ class TripSerializer(serializers.ModelSerializer):
             "user",
             "itinerary",
             "flight_search",
+            "hotel_search",
             "car_rental_search",
             "itinerary_id",
             "flight_search_id",
+            "hotel_search_id",
             "car_rental_search_id",
             "created_at",
             "updated_at",
@@ -61,6 +75,7 @@ class TripSerializer(serializers.ModelSerializer):
         # Extract foreign key IDs
         itinerary_id = validated_data.pop('itinerary_id', None)
         flight_search_id = validated_data.pop('flight_search_id', None)
+        hotel_search_id = validated_data.pop('hotel_search_id', None)
         car_rental_search_id = validated_data.pop('car_rental_search_id', None)
 
         trip = Trip.objects.create(**validated_data)
@@ -70,6 +85,8 @@ class TripSerializer(serializers.ModelSerializer):
             trip.itinerary_id = itinerary_id
         if flight_search_id:
             trip.flight_search_id = flight_search_id
+        if hotel_search_id:
+            trip.hotel_search_id = hotel_search_id
         if car_rental_search_id:
             trip.car_rental_search_id = car_rental_search_id
 
@@ -80,6 +97,7 @@ class TripSerializer(serializers.ModelSerializer):
         # Extract foreign key IDs
         itinerary_id = validated_data.pop('itinerary_id', None)
         flight_search_id = validated_data.pop('flight_search_id', None)
+        hotel_search_id = validated_data.pop('hotel_search_id', None)
         car_rental_search_id = validated_data.pop('car_rental_search_id', None)
 
         # Update regular fields
@@ -91,8 +109,75 @@ class TripSerializer(serializers.ModelSerializer):
             instance.itinerary_id = itinerary_id
         if 'flight_search_id' in self.initial_data:
             instance.flight_search_id = flight_search_id
+        if 'hotel_search_id' in self.initial_data:
+            instance.hotel_search_id = hotel_search_id
         if 'car_rental_search_id' in self.initial_data:
             instance.car_rental_search_id = car_rental_search_id
 
         instance.save()
-        return instance
\ No newline at end of file
+        return instance
+
+class FlightResultSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FlightResult
+        fields = [
+            "id", "airline", "flight_number", "departure_time", "arrival_time",
+            "duration", "stops", "price_cents", "currency", "booking_url",
+        ]
+
+
+class HotelResultSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = HotelResult
+        fields = [
+            "id", "hotel_name", "hotel_type", "star_rating", "price_per_night",
+            "price_display", "location", "listing_url", "source",
+        ]
+
+
+class CarRentalResultSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CarRentalResult
+        fields = [
+            "id", "car_name", "car_type", "price_per_day", "price_display",
+            "rental_company", "location", "listing_url", "source",
+        ]
+
+
+class FlightSearchDashboardSerializer(FlightSearchNestedSerializer):
+    top_results = FlightResultSummarySerializer(many=True, read_only=True)
+
+    class Meta(FlightSearchNestedSerializer.Meta):
+        fields = [*FlightSearchNestedSerializer.Meta.fields, "top_results"]
+
+
+class HotelSearchDashboardSerializer(HotelSearchNestedSerializer):
+    top_results = HotelResultSummarySerializer(many=True, read_only=True)
+
+    class Meta(HotelSearchNestedSerializer.Meta):
+        fields = [*HotelSearchNestedSerializer.Meta.fields, "top_results"]
+
+
+class CarRentalSearchDashboardSerializer(CarRentalSearchNestedSerializer):
+    top_results = CarRentalResultSummarySerializer(many=True, read_only=True)
+
+    class Meta(CarRentalSearchNestedSerializer.Meta):
+        fields = [*CarRentalSearchNestedSerializer.Meta.fields, "top_results"]
+
+
+class TripDashboardSerializer(TripSerializer):
+    """Trip with the cheapest results of each linked search and the itinerary's stored events.
+
+    Expects the searches' ``top_results`` to be attached (see ``TripViewSet.dashboard``) and the itinerary's
+    ``event_cache`` to be selected, so serializing runs no queries.
+    """
+    flight_search = FlightSearchDashboardSerializer(read_only=True)
+    hotel_search = HotelSearchDashboardSerializer(read_only=True)
+    car_rental_search = CarRentalSearchDashboardSerializer(read_only=True)
+    events = serializers.SerializerMethodField()
+
+    class Meta(TripSerializer.Meta):
+        fields = [*TripSerializer.Meta.fields, "events"]
+
+    def get_events(self, trip):
+        return cached_events(trip.itinerary) if trip.itinerary else []
@@ -0,0 +1,192 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from cars.models import CarRentalResult, CarRentalSearch
+from flights.models import FlightResult, FlightSearch
+from hotels.models import HotelResult, HotelSearch
+from itinerary.models import Itinerary, ItineraryEvents
+
+from .api_views import DASHBOARD_TOP_RESULTS
+from .models import Trip
+
+User = get_user_model()
+
+
+class TripApiTestCase(TestCase):
+    """A logged-in user with a trip linking an itinerary (with stored events) and three searches."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="voyager", password="StrongPass123!")
+        self.client.login(username="voyager", password="StrongPass123!")
+        self.itinerary = Itinerary.objects.create(
+            user=self.user,
+            destination="Lisbon",
+            start_date=date(2025, 6, 1),
+            end_date=date(2025, 6, 4),
+            generated_plan="## Day 1\nTram 28",
+        )
+        ItineraryEvents.objects.create(
+            itinerary=self.itinerary,
+            source_key=self.itinerary.events_source_key,
+            events=[{"name": "Fado night", "url": "https://example.com/fado"}],
+            fetched_at=timezone.now(),
+        )
+        self.trip = Trip.objects.create(
+            user=self.user,
+            title="Portugal",
+            itinerary=self.itinerary,
+            flight_search=self._flight_search(results=8),
+            hotel_search=self._hotel_search(results=8),
+            car_rental_search=self._car_search(results=8),
+        )
+
+    def _flight_search(self, results):
+        search = FlightSearch.objects.create(
+            user=self.user, natural_query="NYC to Lisbon", origin_airport="JFK",
+            destination_airport="LIS", departure_date=date(2025, 6, 1),
+        )
+        FlightResult.objects.bulk_create(
+            FlightResult(search=search, airline="TAP", departure_time="9:00", arrival_time="21:00",
+                         duration="7h", price_cents=60_000 - n * 1_000)
+            for n in range(results)
+        )
+        return search
+
+    def _hotel_search(self, results):
+        search = HotelSearch.objects.create(user=self.user, natural_query="Lisbon hotels", location="Lisbon")
+        HotelResult.objects.bulk_create(
+            HotelResult(search=search, hotel_name=f"Hotel {n}", price_per_night=Decimal(200 - n), price_display="$")
+            for n in range(results)
+        )
+        return search
+
+    def _car_search(self, results):
+        search = CarRentalSearch.objects.create(user=self.user, natural_query="Lisbon cars", location="Lisbon")
+        CarRentalResult.objects.bulk_create(
+            CarRentalResult(search=search, car_name=f"Car {n}", car_type="Compact", price_per_day=Decimal(60 - n),
+                            price_display="$", rental_company="Hertz", location="Lisbon")
+            for n in range(results)
+        )
+        return search
+
+    def _dashboard(self, trip):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/v1/trips/{trip.pk}/dashboard/")
+        return response, [q["sql"] for q in queries.captured_queries]
+
+
+class TripDashboardTests(TripApiTestCase):
+    def test_dashboard_returns_trip_results_and_events(self):
+        response, _ = self._dashboard(self.trip)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["title"], "Portugal")
+        self.assertEqual(data["itinerary"]["destination"], "Lisbon")
+        self.assertEqual(data["events"], [{"name": "Fado night", "url": "https://example.com/fado"}])
+        flights = data["flight_search"]["top_results"]
+        self.assertEqual(len(flights), DASHBOARD_TOP_RESULTS)
+        self.assertEqual([f["price_cents"] for f in flights], sorted(f["price_cents"] for f in flights))
+        self.assertEqual(flights[0]["price_cents"], 53_000)
+        self.assertEqual(data["hotel_search"]["top_results"][0]["hotel_name"], "Hotel 7")
+        self.assertEqual(len(data["car_rental_search"]["top_results"]), DASHBOARD_TOP_RESULTS)
+
+    def test_dashboard_query_count_is_fixed(self):
+        _, queries = self._dashboard(self.trip)
+        # Session and user lookups, the ETag validator, the trip with its joined rows, one result query per search.
+        self.assertEqual(len(queries), 2 + 1 + 1 + 3, "\n".join(queries))
+
+        bigger = Trip.objects.create(
+            user=self.user,
+            itinerary=None,
+            flight_search=self._flight_search(results=40),
+            hotel_search=self._hotel_search(results=40),
+            car_rental_search=self._car_search(results=40),
+        )
+        _, queries = self._dashboard(bigger)
+        self.assertEqual(len(queries), 2 + 1 + 1 + 3, "\n".join(queries))
+
+    def test_dashboard_results_are_bounded_to_the_fetch_window(self):
+        _, queries = self._dashboard(self.trip)
+
+        for sql in queries[-3:]:  # the flight, hotel and car result queries
+            self.assertIn('"fetched_at" >=', sql)
+            self.assertIn('"fetched_at" <', sql)
+
+    def test_dashboard_skips_result_queries_for_unlinked_searches(self):
+        trip = Trip.objects.create(user=self.user, title="Empty")
+
+        response, queries = self._dashboard(trip)
+
+        self.assertEqual(response.json()["events"], [])
+        self.assertIsNone(response.json()["hotel_search"])
+        self.assertEqual(len(queries), 2 + 1 + 1, "\n".join(queries))
+
+    def test_other_users_trip_is_not_found(self):
+        other = User.objects.create_user(username="stranger")
+        trip = Trip.objects.create(user=other, title="Private")
+
+        response, _ = self._dashboard(trip)
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TripConditionalGetTests(TripApiTestCase):
+    """Unchanged trips are answered with 304 from a single validator query."""
+
+    def test_unchanged_dashboard_is_not_modified(self):
+        first, _ = self._dashboard(self.trip)
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(f"/api/v1/trips/{self.trip.pk}/dashboard/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(len(queries.captured_queries), 2 + 1)
+
+    def test_edits_change_the_etag(self):
+        etag = self.client.get(f"/api/v1/trips/{self.trip.pk}/")["ETag"]
+        self.client.patch(f"/api/v1/trips/{self.trip.pk}/", {"title": "Lisbon"}, content_type="application/json")
+
+        response = self.client.get(f"/api/v1/trips/{self.trip.pk}/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Lisbon")
+
+    def test_deleting_a_linked_search_changes_the_etags(self):
+        etag = self.client.get(f"/api/v1/trips/{self.trip.pk}/")["ETag"]
+        dashboard_etag = self._dashboard(self.trip)[0]["ETag"]
+
+        self.trip.hotel_search.delete()
+
+        response = self.client.get(f"/api/v1/trips/{self.trip.pk}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()["hotel_search"])
+        dashboard = self.client.get(f"/api/v1/trips/{self.trip.pk}/dashboard/", HTTP_IF_NONE_MATCH=dashboard_etag)
+        self.assertEqual(dashboard.status_code, 200)
+
+    def test_itinerary_edit_changes_trip_list_etag(self):
+        etag = self.client.get("/api/v1/trips/")["ETag"]
+        self.assertEqual(self.client.get("/api/v1/trips/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.itinerary.destination = "Porto"
+        self.itinerary.save()
+
+        self.assertEqual(self.client.get("/api/v1/trips/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_stale_events_bypass_not_modified(self):
+        etag = self._dashboard(self.trip)[0]["ETag"]
+        ItineraryEvents.objects.filter(itinerary=self.itinerary).update(fetched_at=timezone.now() - timedelta(days=2))
+
+        with patch("itinerary.event_cache.schedule_refresh") as mock_refresh:
+            response = self.client.get(f"/api/v1/trips/{self.trip.pk}/dashboard/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        mock_refresh.assert_called_once_with(self.itinerary.pk)
@@ -4,6 +4,8 @@ set -e
 cd /app
 
 python config/manage.py migrate --noinput
+# Monthly result partitions for the coming months (no-op outside PostgreSQL).
+python config/manage.py manage_result_partitions
 python config/manage.py collectstatic --noinput
 
 exec "$@"
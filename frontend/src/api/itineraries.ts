@@ -1,8 +1,10 @@
+import Cookies from 'js-cookie'
 import client from './client'
-import type { Itinerary, ItineraryPreview, PendingItinerary, Event } from '../types'
+import type { Itinerary, ItineraryPreview, ItinerarySummary, Page, PendingItinerary, Event } from '../types'
 
-export async function listItineraries(): Promise<Itinerary[]> {
-  const { data } = await client.get<Itinerary[]>('/itineraries/')
+/** First page of the user's itineraries, or the page at `next` from a previous call. */
+export async function listItineraries(next?: string): Promise<Page<ItinerarySummary>> {
+  const { data } = await client.get<Page<ItinerarySummary>>(next ?? '/itineraries/')
   return data
 }
 
@@ -15,6 +17,8 @@ export interface CreateItineraryInput {
   food_preferences: string
   preference: string
   action: 'preview' | 'save'
+  /** Skip the server's plan cache and always generate a new itinerary */
+  fresh?: boolean
 }
 
 export async function createItinerary(input: CreateItineraryInput): Promise<Itinerary | ItineraryPreview> {
@@ -22,6 +26,64 @@ export async function createItinerary(input: CreateItineraryInput): Promise<Itin
   return data
 }
 
+/**
+ * Same as createItinerary, but reads the server-sent event stream so the plan
+ * can be shown while it is being generated. `onText` receives the text so far.
+ */
+export async function streamItinerary(
+  input: CreateItineraryInput,
+  onText: (text: string) => void,
+): Promise<Itinerary | ItineraryPreview> {
+  const response = await fetch(`${client.defaults.baseURL}/itineraries/create/stream/`, {
+    method: 'POST',
+    credentials: 'include',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+      'X-CSRFToken': Cookies.get('csrftoken') ?? '',
+    },
+    body: JSON.stringify(input),
+  })
+  if (!response.ok) {
+    // Validation (400), anonymous save (401) and setup (500) errors are plain JSON,
+    // shaped like an axios error so field errors reach the form as with createItinerary
+    const data = await response.json().catch(() => ({ error: `Request failed (${response.status}).` }))
+    throw { response: { data } }
+  }
+  if (!response.headers.get('Content-Type')?.startsWith('text/event-stream')) {
+    return response.json()
+  }
+  if (!response.body) {
+    throw { response: { data: { error: 'Streaming is not supported by this browser.' } } }
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffer = ''
+  let text = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += value
+    let boundary: number
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      const event = /^event: (.*)$/m.exec(block)?.[1]
+      const data = JSON.parse(/^data: (.*)$/m.exec(block)?.[1] ?? 'null')
+      if (event === 'delta') {
+        text += data.text
+        onText(text)
+      } else if (event === 'done') {
+        return data
+      } else if (event === 'error') {
+        // Same shape as an axios error so callers can handle both alike
+        throw { response: { data } }
+      }
+    }
+  }
+  throw { response: { data: { error: 'The connection closed before the itinerary was finished.' } } }
+}
+
 export async function getPreview(): Promise<PendingItinerary> {
   const { data } = await client.get<PendingItinerary>('/itineraries/preview/')
   return data
@@ -54,6 +116,16 @@ export async function updateItinerary(pk: number, input: UpdateItineraryInput):
   return data
 }
 
+/** Regenerate only the given days; neighbouring days are kept and used as context. */
+export async function regenerateItineraryDays(
+  pk: number,
+  days: number[],
+  instructions = '',
+): Promise<Itinerary> {
+  const { data } = await client.post<Itinerary>(`/itineraries/${pk}/days/regenerate/`, { days, instructions })
+  return data
+}
+
 export async function deleteItinerary(pk: number): Promise<void> {
   await client.delete(`/itineraries/${pk}/`)
 }
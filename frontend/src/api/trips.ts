@@ -1,5 +1,5 @@
 import client from './client'
-import type { Trip } from '../types'
+import type { Trip, TripDashboard } from '../types'
 
 export async function getTrips(): Promise<Trip[]> {
   const { data } = await client.get<Trip[]>('/trips/')
@@ -11,6 +11,11 @@ export async function getTrip(id: number): Promise<Trip> {
   return data
 }
 
+export async function getTripDashboard(id: number): Promise<TripDashboard> {
+  const { data } = await client.get<TripDashboard>(`/trips/${id}/dashboard/`)
+  return data
+}
+
 export interface UpdateTripInput {
   title?: string
 }
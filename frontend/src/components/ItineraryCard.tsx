@@ -1,13 +1,11 @@
 import { Link } from 'react-router-dom'
-import type { Itinerary } from '../types'
+import type { ItinerarySummary } from '../types'
 
 interface ItineraryCardProps {
-  itinerary: Itinerary
+  itinerary: ItinerarySummary
 }
 
 export default function ItineraryCard({ itinerary }: ItineraryCardProps) {
-  const excerpt = itinerary.generated_plan.slice(0, 180).replace(/[#*_`]/g, '').trim()
-
   return (
     <article className="itinerary-card">
       <div className="itinerary-card-header">
@@ -19,7 +17,6 @@ export default function ItineraryCard({ itinerary }: ItineraryCardProps) {
       <p className="itinerary-card-dates">
         {itinerary.start_date} – {itinerary.end_date}
       </p>
-      {excerpt && <p className="itinerary-card-excerpt">{excerpt}…</p>}
       <div className="itinerary-card-actions">
         <Link to={`/itineraries/${itinerary.id}`} className="btn btn-ghost btn-sm">View</Link>
         <Link to={`/itineraries/${itinerary.id}/edit`} className="btn btn-ghost btn-sm">Edit</Link>
@@ -1,13 +1,16 @@
 interface LoadingOverlayProps {
   message?: string
+  /** Partial output to show while it streams in */
+  preview?: string
 }
 
-export default function LoadingOverlay({ message = 'Generating your itinerary…' }: LoadingOverlayProps) {
+export default function LoadingOverlay({ message = 'Generating your itinerary…', preview }: LoadingOverlayProps) {
   return (
     <div className="loading-overlay" role="status" aria-live="polite">
       <div className="loading-card">
         <div className="compass-ring" aria-hidden="true" />
         <p className="loading-message">{message}</p>
+        {preview && <pre className="loading-preview">{preview}</pre>}
       </div>
     </div>
   )
@@ -3,18 +3,34 @@ import { Link } from 'react-router-dom'
 import { useAuth } from '../hooks/useAuth'
 import { listItineraries } from '../api/itineraries'
 import ItineraryCard from '../components/ItineraryCard'
-import type { Itinerary } from '../types'
+import type { ItinerarySummary } from '../types'
 
 export default function HomePage() {
   const { isAuthenticated, user } = useAuth()
-  const [itineraries, setItineraries] = useState<Itinerary[]>([])
+  const [itineraries, setItineraries] = useState<ItinerarySummary[]>([])
+  const [nextPage, setNextPage] = useState<string | null>(null)
 
   useEffect(() => {
     if (isAuthenticated) {
-      listItineraries().then(setItineraries).catch(() => {})
+      listItineraries()
+        .then((page) => {
+          setItineraries(page.results)
+          setNextPage(page.next)
+        })
+        .catch(() => {})
     }
   }, [isAuthenticated])
 
+  const loadMore = () => {
+    if (!nextPage) return
+    listItineraries(nextPage)
+      .then((page) => {
+        setItineraries((prev) => [...prev, ...page.results])
+        setNextPage(page.next)
+      })
+      .catch(() => {})
+  }
+
   return (
     <>
       <section className="hero fade-up">
@@ -47,11 +63,16 @@ export default function HomePage() {
           </div>
 
           {itineraries.length > 0 ? (
-            <div className="card-grid stagger">
-              {itineraries.map((it) => (
-                <ItineraryCard key={it.id} itinerary={it} />
-              ))}
-            </div>
+            <>
+              <div className="card-grid stagger">
+                {itineraries.map((it) => (
+                  <ItineraryCard key={it.id} itinerary={it} />
+                ))}
+              </div>
+              {nextPage && (
+                <button className="btn-secondary" onClick={loadMore}>Load more</button>
+              )}
+            </>
           ) : (
             <div className="empty-state fade-up">
               <h3>No trips yet</h3>
@@ -1,7 +1,7 @@
 import { useState, useEffect, useRef, type FormEvent } from 'react'
 import { useNavigate, useParams } from 'react-router-dom'
 import { useAuth } from '../hooks/useAuth'
-import { createItinerary, getItinerary, updateItinerary } from '../api/itineraries'
+import { getItinerary, streamItinerary, updateItinerary } from '../api/itineraries'
 import LoadingOverlay from '../components/LoadingOverlay'
 import { STYLE_CHOICES, type TravelStyle } from '../types'
 
@@ -59,6 +59,7 @@ export default function ItineraryFormPage() {
   const [prefsOpen, setPrefsOpen] = useState(false)
 
   const [loading, setLoading] = useState(false)
+  const [streamedPlan, setStreamedPlan] = useState('')
   const [fetchLoading, setFetchLoading] = useState(mode === 'edit')
   const [errors, setErrors] = useState<Record<string, string>>({})
 
@@ -113,10 +114,11 @@ export default function ItineraryFormPage() {
     e.preventDefault()
     setErrors({})
     setLoading(true)
+    setStreamedPlan('')
 
     try {
       if (mode === 'create') {
-        const result = await createItinerary({
+        const result = await streamItinerary({
           destination,
           start_date: startDate,
           end_date: endDate,
@@ -125,7 +127,7 @@ export default function ItineraryFormPage() {
           food_preferences: foodPreferences,
           preference,
           action: isAuthenticated ? 'save' : action,
-        })
+        }, setStreamedPlan)
 
         if ('preview' in result && result.preview) {
           navigate('/itineraries/preview')
@@ -332,7 +334,7 @@ export default function ItineraryFormPage() {
 
   return (
     <>
-      {loading && <LoadingOverlay message="Generating your itinerary…" />}
+      {loading && <LoadingOverlay message="Generating your itinerary…" preview={streamedPlan} />}
 
       <div className="form-page">
         <div className="form-wizard">
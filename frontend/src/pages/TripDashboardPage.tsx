@@ -1,8 +1,10 @@
 import { useEffect, useState } from 'react'
 import { Link, useParams } from 'react-router-dom'
-import { getTrip, updateTrip } from '../api/trips'
+import { getTripDashboard, updateTrip } from '../api/trips'
+import { regenerateItineraryDays } from '../api/itineraries'
+import EventsSection from '../components/EventCard'
 import MarkdownRenderer from '../components/MarkdownRenderer'
-import type { Trip } from '../types'
+import type { TripDashboard } from '../types'
 
 interface DaySection {
   dayNumber: number
@@ -13,17 +15,18 @@ interface DaySection {
 export default function TripDashboardPage() {
   const { id } = useParams<{ id: string }>()
 
-  const [trip, setTrip] = useState<Trip | null>(null)
+  const [trip, setTrip] = useState<TripDashboard | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
   const [editingTitle, setEditingTitle] = useState(false)
   const [titleValue, setTitleValue] = useState('')
   const [dayStates, setDayStates] = useState<Record<number, boolean>>({})
+  const [regeneratingDay, setRegeneratingDay] = useState<number | null>(null)
 
   useEffect(() => {
     if (!id) return
 
-    getTrip(Number(id))
+    getTripDashboard(Number(id))
       .then((tripData) => {
         setTrip(tripData)
         setTitleValue(tripData.title)
@@ -93,7 +96,7 @@ export default function TripDashboardPage() {
 
     try {
       const updatedTrip = await updateTrip(trip.id, { title: titleValue.trim() })
-      setTrip(updatedTrip)
+      setTrip({ ...trip, title: updatedTrip.title })
       setEditingTitle(false)
     } catch {
       setError('Failed to update trip title')
@@ -111,6 +114,19 @@ export default function TripDashboardPage() {
     }
   }
 
+  const handleRegenerateDay = async (dayNumber: number) => {
+    setRegeneratingDay(dayNumber)
+    setError('')
+    try {
+      const itinerary = await regenerateItineraryDays(trip.itinerary.id, [dayNumber])
+      setTrip({ ...trip, itinerary })
+    } catch {
+      setError(`Failed to regenerate day ${dayNumber}`)
+    } finally {
+      setRegeneratingDay(null)
+    }
+  }
+
   const toggleDay = (dayNumber: number) => {
     setDayStates(prev => ({
       ...prev,
@@ -195,6 +211,13 @@ export default function TripDashboardPage() {
                   {dayStates[day.dayNumber] && (
                     <div className="day-card-content">
                       <MarkdownRenderer content={day.content} />
+                      <button
+                        className="btn btn-secondary"
+                        onClick={() => handleRegenerateDay(day.dayNumber)}
+                        disabled={regeneratingDay !== null}
+                      >
+                        {regeneratingDay === day.dayNumber ? 'Regenerating…' : 'Regenerate this day'}
+                      </button>
                     </div>
                   )}
                 </div>
@@ -221,6 +244,14 @@ export default function TripDashboardPage() {
                 <div>
                   <h3 className="module-card-title">Flights attached</h3>
                   <p className="module-card-description">{trip.flight_search.natural_query}</p>
+                  <ul className="top-results">
+                    {trip.flight_search.top_results.map((flight) => (
+                      <li key={flight.id}>
+                        {flight.airline} {flight.flight_number} · {flight.departure_time}–{flight.arrival_time} ·{' '}
+                        {(flight.price_cents / 100).toLocaleString('en-US', { style: 'currency', currency: flight.currency })}
+                      </li>
+                    ))}
+                  </ul>
                 </div>
               </div>
               <Link to="/flights" className="btn btn-secondary">Search Again</Link>
@@ -251,6 +282,13 @@ export default function TripDashboardPage() {
                   <p className="module-card-description">
                     {trip.hotel_search.location} — {trip.hotel_search.natural_query}
                   </p>
+                  <ul className="top-results">
+                    {trip.hotel_search.top_results.map((hotel) => (
+                      <li key={hotel.id}>
+                        {hotel.hotel_name} · {hotel.price_display} / night
+                      </li>
+                    ))}
+                  </ul>
                 </div>
               </div>
               <Link to="/hotels" className="btn btn-secondary">Search Again</Link>
@@ -278,7 +316,14 @@ export default function TripDashboardPage() {
                 <div className="module-card-icon">🚗</div>
                 <div>
                   <h3 className="module-card-title">Car rental attached</h3>
-                  <p className="module-card-description">Car rental options selected</p>
+                  <p className="module-card-description">{trip.car_rental_search.natural_query}</p>
+                  <ul className="top-results">
+                    {trip.car_rental_search.top_results.map((car) => (
+                      <li key={car.id}>
+                        {car.car_name} ({car.rental_company}) · {car.price_display} / day
+                      </li>
+                    ))}
+                  </ul>
                 </div>
               </div>
               <Link to="/cars" className="btn btn-secondary">Search Again</Link>
@@ -296,6 +341,8 @@ export default function TripDashboardPage() {
             </div>
           )}
         </div>
+
+        <EventsSection events={trip.events} />
       </div>
     </div>
   )
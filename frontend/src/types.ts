@@ -17,6 +17,19 @@ export interface Itinerary {
   created_at: string
 }
 
+/** Itinerary as returned by the list endpoint (no plan text) */
+export type ItinerarySummary = Pick<
+  Itinerary,
+  'id' | 'destination' | 'start_date' | 'end_date' | 'preference' | 'style_label' | 'created_at'
+>
+
+/** Cursor-paginated list response */
+export interface Page<T> {
+  next: string | null
+  previous: string | null
+  results: T[]
+}
+
 export interface Event {
   name: string
   url: string
@@ -119,6 +132,8 @@ export interface HotelSearch {
 
 export interface CarRentalSearch {
   id: number
+  natural_query: string
+  location: string
 }
 
 export interface Trip {
@@ -130,3 +145,48 @@ export interface Trip {
   hotel_search: HotelSearch | null
   car_rental_search: CarRentalSearch | null
 }
+
+export interface FlightResultSummary {
+  id: number
+  airline: string
+  flight_number: string
+  departure_time: string
+  arrival_time: string
+  duration: string
+  stops: number
+  price_cents: number
+  currency: string
+  booking_url: string
+}
+
+export interface HotelResultSummary {
+  id: number
+  hotel_name: string
+  hotel_type: string
+  star_rating: number | null
+  price_per_night: string
+  price_display: string
+  location: string
+  listing_url: string
+  source: string
+}
+
+export interface CarRentalResultSummary {
+  id: number
+  car_name: string
+  car_type: string
+  price_per_day: string
+  price_display: string
+  rental_company: string
+  location: string
+  listing_url: string
+  source: string
+}
+
+/** Trip with top results per linked search and stored events, from /trips/:id/dashboard/ */
+export interface TripDashboard extends Trip {
+  flight_search: (FlightSearch & { top_results: FlightResultSummary[] }) | null
+  hotel_search: (HotelSearch & { top_results: HotelResultSummary[] }) | null
+  car_rental_search: (CarRentalSearch & { top_results: CarRentalResultSummary[] }) | null
+  events: Event[]
+}